@@ -5,6 +5,8 @@ loading.
 """
 
 from .dataset import Dataset
+from .dataset_view import DatasetView
+from .prefetched_dataset import PrefetchedDataset
 from .ttv_sets import TTVSets
 
-__all__ = ["Dataset", "TTVSets"]
+__all__ = ["Dataset", "DatasetView", "PrefetchedDataset", "TTVSets"]
@@ -0,0 +1,102 @@
+# vim: ft=python fileencoding=utf-8 sts=4 sw=4 et:
+
+import threading
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+
+class BatchBufferPool:
+    """The BatchBufferPool class keeps a small ring of preallocated (x, y) arrays
+    where processed batches are written, so a new pair of arrays isn't allocated for
+    each batch.
+
+    Buffers are reused in order: the batch returned by a Dataset is only valid until
+    `size` more batches are requested. Consumers that keep the batches for longer
+    (storing them on a list, prefetching many batches ahead...) must not use a pool,
+    or must copy the batches.
+
+    Buffers are sized from the first processed batch, and allocated again if the shape
+    or the dtype of the processed batches change.
+
+    Attributes:
+        size: Number of (x, y) buffers on the ring.
+    """
+
+    def __init__(self, size: int = 2):
+        if size < 1:
+            raise ValueError(f"A buffer pool needs at least 1 buffer, not {size}")
+
+        self.size = size
+
+        self._buffers: List[Tuple["np.ndarray", "np.ndarray"]] = []
+        self._next = 0
+        self._lock = threading.Lock()
+
+    @property
+    def batch_size(self) -> int:
+        """Returns the maximum number of rows the buffers can hold (0 if the buffers
+        aren't allocated yet)."""
+        return len(self._buffers[0][0]) if self._buffers else 0
+
+    def acquire(
+        self, n: int
+    ) -> Tuple[Optional["np.ndarray"], Optional["np.ndarray"]]:
+        """Returns the next pair of buffers on the ring, trimmed to `n` rows, or
+        (None, None) if the buffers aren't allocated yet or can't hold `n` rows."""
+        with self._lock:
+            if not self._buffers or n > self.batch_size:
+                return None, None
+
+            x_buffer, y_buffer = self._buffers[self._next]
+            self._next = (self._next + 1) % self.size
+
+        return x_buffer[:n], y_buffer[:n]
+
+    def fit(self, batch_size: int, x_batch: "np.ndarray", y_batch: "np.ndarray"):
+        """Allocates the buffers (if needed) to hold `batch_size` rows like the rows of
+        `x_batch` and `y_batch`. Batches of Python objects aren't pooled."""
+        if x_batch.dtype == object or y_batch.dtype == object:
+            return
+
+        with self._lock:
+            if self._buffers and self._fits(batch_size, x_batch, y_batch):
+                return
+
+            self._buffers = [
+                (
+                    np.empty((batch_size,) + x_batch.shape[1:], dtype=x_batch.dtype),
+                    np.empty((batch_size,) + y_batch.shape[1:], dtype=y_batch.dtype),
+                )
+                for _ in range(self.size)
+            ]
+            self._next = 0
+
+    def clear(self):
+        """Releases the buffers."""
+        with self._lock:
+            self._buffers = []
+            self._next = 0
+
+    def _fits(
+        self, batch_size: int, x_batch: "np.ndarray", y_batch: "np.ndarray"
+    ) -> bool:
+        x_buffer, y_buffer = self._buffers[0]
+
+        return (
+            len(x_buffer) == batch_size
+            and x_buffer.shape[1:] == x_batch.shape[1:]
+            and y_buffer.shape[1:] == y_batch.shape[1:]
+            and x_buffer.dtype == x_batch.dtype
+            and y_buffer.dtype == y_batch.dtype
+        )
+
+    def __getstate__(self):
+        # Buffers are allocated again after unpickling
+        return {"size": self.size}
+
+    def __setstate__(self, state):
+        self.__init__(state["size"])
+
+    def __str__(self):
+        return f"BatchBufferPool ({self.size} buffers)"
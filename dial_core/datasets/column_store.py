@@ -0,0 +1,201 @@
+# vim: ft=python fileencoding=utf-8 sts=4 sw=4 et:
+
+import mmap
+from typing import Any, Union
+
+import numpy as np
+
+
+class ColumnStore:
+    """The ColumnStore class is the storage used by the Dataset class for its `x` and
+    `y` arrays.
+
+    Rows are stored on a buffer with some spare capacity at the end, which doubles
+    each time it's exhausted. Appending rows is amortized O(1), and inserting/deleting
+    rows on the middle only moves the rows after them, instead of copying the whole
+    array to a new one. The stored rows are always returned as a contiguous array
+    (a view of the buffer, no copies are done).
+
+    Returned arrays are never modified by later insertions or deletions: once the rows
+    have been returned by `data`, the next modification moves them to a new buffer
+    first (copy-on-write). Arrays passed to `set` (memory-mapped arrays, or array-like
+    columns like a PathTable, for example) are also stored as they are, and they're
+    only copied to a new buffer the first time they're modified.
+
+    A column holding a whole memory-mapped file is pickled as the location of the file,
+    and mapped again when unpickled, so worker processes share the same pages of the
+    file instead of receiving a copy of the data.
+    """
+
+    MinCapacity = 16
+
+    def __init__(self, data: Any = None):
+        self.set(np.empty(0) if data is None else data)
+
+    @property
+    def data(self) -> "np.ndarray":
+        """Returns the stored rows."""
+        # The returned view must keep its values, so the buffer isn't reused anymore
+        self._shared = True
+
+        return self._rows()
+
+    def take(self, rows: Union[slice, "np.ndarray"]) -> "np.ndarray":
+        """Returns the stored values of `rows`, as a new array if it would be a view of
+        the buffer (so it isn't modified by later insertions or deletions)."""
+        taken = self._rows()[rows]
+
+        if self._owned and not self._shared and isinstance(rows, slice):
+            return taken.copy()
+
+        return taken
+
+    @property
+    def capacity(self) -> int:
+        """Returns the number of rows that can be stored before growing the buffer."""
+        return len(self._buffer)
+
+    def set(self, data: Any):
+        """Replaces the stored rows with `data`."""
+        self._buffer = data
+        self._length = len(data)
+
+        # Arrays from the caller are never modified, only buffers allocated here
+        self._owned = False
+        self._shared = False
+
+    def insert(self, position: int, values: Any):
+        """Inserts `values` (a list or array of rows) before `position`."""
+        values = np.asarray(values)
+
+        if len(values) == 0:
+            return
+
+        position = self._clamp(position)
+        new_length = self._length + len(values)
+
+        if self._length == 0:
+            dtype, row_shape = values.dtype, values.shape[1:]
+        else:
+            dtype = np.result_type(self._buffer.dtype, values.dtype)
+            row_shape = self._buffer.shape[1:]
+
+        if not self._is_reusable(new_length, dtype):
+            # Only grown if it's full (it's also moved when the rows have been returned)
+            capacity = (
+                2 * self.capacity if new_length > self.capacity else self.capacity
+            )
+            self._reallocate(
+                max(new_length, capacity, self.MinCapacity), dtype, row_shape
+            )
+
+        # Move the following rows to make room for the new ones
+        buffer = self._buffer
+        buffer[position + len(values) : new_length] = buffer[position : self._length]
+        buffer[position : position + len(values)] = values
+
+        self._length = new_length
+
+    def append(self, values: Any):
+        """Inserts `values` (a list or array of rows) at the end."""
+        self.insert(self._length, values)
+
+    def delete(self, start: int, n: int = 1):
+        """Deletes `n` rows from `start` (included)."""
+        start = self._clamp(start)
+        end = min(start + max(n, 0), self._length)
+
+        if end == start:
+            return
+
+        if not self._is_reusable(self._length, self._buffer.dtype):
+            self._reallocate(self.capacity, self._buffer.dtype, self._buffer.shape[1:])
+
+        buffer = self._buffer
+        new_length = self._length - (end - start)
+
+        buffer[start:new_length] = buffer[end : self._length]
+
+        if buffer.dtype == object:
+            # Release the references to the deleted objects
+            buffer[new_length : self._length] = None
+
+        self._length = new_length
+
+        # Give back memory if the buffer is mostly empty
+        if self.capacity > self.MinCapacity and self._length < self.capacity // 4:
+            self._reallocate(
+                max(2 * self._length, self.MinCapacity), buffer.dtype, buffer.shape[1:]
+            )
+
+    def _is_reusable(self, length: int, dtype: "np.dtype") -> bool:
+        """Checks if the current buffer can hold `length` rows of `dtype` in place."""
+        return (
+            self._owned
+            and not self._shared
+            and self._buffer.dtype == dtype
+            and length <= self.capacity
+        )
+
+    def _reallocate(self, capacity: int, dtype: "np.dtype", row_shape: tuple):
+        buffer = np.empty((capacity,) + tuple(row_shape), dtype=dtype)
+
+        if self._length:
+            buffer[: self._length] = self._buffer[: self._length]
+
+        self._buffer = buffer
+        self._owned = True
+        self._shared = False
+
+    def _rows(self) -> Any:
+        if self._length == len(self._buffer):
+            return self._buffer
+
+        return self._buffer[: self._length]
+
+    def _clamp(self, position: int) -> int:
+        if position < 0:
+            position += self._length
+
+        return min(max(position, 0), self._length)
+
+    def __len__(self) -> int:
+        return self._length
+
+    def __reduce__(self):
+        if _is_mapped_file(self._buffer) and self._length == len(self._buffer):
+            buffer = self._buffer
+
+            return (
+                _map_column,
+                (
+                    buffer.filename,
+                    buffer.dtype.str,
+                    buffer.shape,
+                    "F" if np.isfortran(buffer) else "C",
+                    buffer.offset,
+                    "r+" if buffer.mode == "w+" else buffer.mode,
+                ),
+            )
+
+        # Spare capacity isn't pickled
+        return (ColumnStore, (self._rows(),))
+
+
+def _is_mapped_file(data: Any) -> bool:
+    """Checks if `data` is a memory-mapped file as a whole (not a view of one)."""
+    return (
+        isinstance(data, np.memmap)
+        and isinstance(data.base, mmap.mmap)
+        and data.filename is not None
+    )
+
+
+def _map_column(
+    filename: str, dtype: str, shape: tuple, order: str, offset: int, mode: str
+) -> "ColumnStore":
+    return ColumnStore(
+        np.memmap(
+            filename, dtype=dtype, mode=mode, offset=offset, shape=shape, order=order
+        )
+    )
@@ -1,12 +1,14 @@
 # vim: ft=python fileencoding=utf-8 sts=4 sw=4 et:
 
 from enum import Enum
-from typing import TYPE_CHECKING, Any, List, Tuple
+from typing import TYPE_CHECKING, Any, List, Optional, Set, Tuple, Union
 
 import numpy as np
 from tensorflow import keras
 
-from .datatype import Numeric
+from .batch_buffer_pool import BatchBufferPool
+from .column_store import ColumnStore
+from .datatype import Numeric, SampleCache
 
 if TYPE_CHECKING:
     from .datatype import DataType
@@ -20,18 +22,41 @@ class Dataset(keras.utils.Sequence):
     Two Datatypes must also be provided. This classes specify how an specific data is
     stored on memory and how it should be loaded, processed, and returned.
 
+    The `x` and `y` arrays are stored on ColumnStore objects, so rows can be inserted
+    and deleted without copying the whole arrays.
+
     Attributes:
         x: x (input) array.
         y: y (output) array.
         x_type: Datatype of x array.
         y_type: Datatype of y array.
         batch_size: Batch size.
+        shuffle: If True, batches are gathered following a random permutation of the
+            rows, which changes on each epoch. The `x` and `y` arrays aren't modified.
+        seed: Seed of the permutations. The same seed and epoch always produce the
+            same permutation. A random one is chosen if not specified.
+        epoch: Current epoch. Increased on `on_epoch_end`.
+        shuffle_block_size: If greater than 1, blocks of this number of consecutive
+            rows are shuffled instead of single rows, so memory-mapped data is still
+            read mostly sequentially.
+        buffer_pool: If not None, processed batches are written on a ring of
+            preallocated arrays instead of on new ones. Returned batches are only
+            valid until `buffer_pool.size` more batches are requested, so consumers
+            that keep them for longer must copy them (or not use a pool).
+        display_cache: If not None, text rendered for the Display role (see `items`)
+            is kept here by blocks of rows, so scrolling through a table doesn't render
+            the same rows again. Entries are keyed by `version`, so it's only enabled
+            (with `display_cache_bytes`) by callers that call `touch` after modifying
+            the arrays or the datatypes in place.
     """
 
     class Role(Enum):
         Raw = 0
         Display = 1
 
+    # Rows rendered (and cached) at once for the Display role
+    DisplayBlockRows = 64
+
     def __init__(
         self,
         x_data: "np.ndarray" = None,
@@ -39,10 +64,17 @@ class Dataset(keras.utils.Sequence):
         x_type: "DataType" = None,
         y_type: "DataType" = None,
         batch_size: int = 32,
+        shuffle: bool = False,
+        seed: int = None,
+        shuffle_block_size: int = 1,
+        buffer_pool_size: int = 0,
+        display_cache_bytes: int = 0,
     ):
+        self._version = 0
+
         # Data arrays
-        self.x = np.empty(0) if x_data is None else x_data
-        self.y = np.empty(0) if y_data is None else y_data
+        self._x = ColumnStore(x_data)
+        self._y = ColumnStore(y_data)
 
         # Data types
         self.x_type = Numeric() if x_type is None else x_type
@@ -50,32 +82,117 @@ class Dataset(keras.utils.Sequence):
 
         self.batch_size = batch_size
 
+        # Shuffling
+        self.shuffle = shuffle
+        self.seed = int(np.random.randint(2 ** 31)) if seed is None else seed
+        self.epoch = 0
+        self.shuffle_block_size = shuffle_block_size
+
+        self._permutation = np.empty(0, dtype=np.intp)
+        self._permutation_key: tuple = ()
+
+        self.display_cache: Optional["SampleCache"] = (
+            SampleCache(max_bytes=display_cache_bytes)
+            if display_cache_bytes > 0
+            else None
+        )
+        self._display_uncached: Set[Tuple[int, int]] = set()
+
+        # Reusable batch buffers
+        self.buffer_pool: Optional["BatchBufferPool"] = (
+            BatchBufferPool(buffer_pool_size) if buffer_pool_size > 0 else None
+        )
+
+    @property
+    def version(self) -> int:
+        """Returns a number that changes each time the rows or the datatypes of the
+        dataset are replaced. Modifications done in place on the arrays or on the
+        datatypes aren't detected, so `touch` must be called after them."""
+        return self._version
+
+    def touch(self):
+        """Marks the dataset as modified, so any rendered text is discarded."""
+        self._version += 1
+
+    @property
+    def x(self) -> "np.ndarray":
+        """Returns the x (input) array. Later insertions or deletions don't modify the
+        returned array."""
+        return self._x.data
+
+    @x.setter
+    def x(self, x_data: "np.ndarray"):
+        self._x.set(x_data)
+        self.touch()
+
+    @property
+    def y(self) -> "np.ndarray":
+        """Returns the y (output) array. Later insertions or deletions don't modify the
+        returned array."""
+        return self._y.data
+
+    @y.setter
+    def y(self, y_data: "np.ndarray"):
+        self._y.set(y_data)
+        self.touch()
+
+    @property
+    def x_type(self) -> "DataType":
+        """Returns the datatype of the x array."""
+        return self._x_type
+
+    @x_type.setter
+    def x_type(self, x_type: "DataType"):
+        self._x_type = x_type
+        self.touch()
+
+    @property
+    def y_type(self) -> "DataType":
+        """Returns the datatype of the y array."""
+        return self._y_type
+
+    @y_type.setter
+    def y_type(self, y_type: "DataType"):
+        self._y_type = y_type
+        self.touch()
+
     @property
     def input_shape(self):
         """Returns the shape of the `_x` array, or (0,) if not loaded/not defined."""
-        return self.x_type.process(self.x[0]).shape if len(self.x) > 0 else (0,)
+        x_data, _ = self._take(slice(0, 1))
+
+        return self.x_type.process_batch(x_data).shape[1:] if len(x_data) else (0,)
 
     @property
     def output_shape(self):
         """Returns the shape of the `y` array, or (0,) if not loaded/not defined."""
-        return self.y_type.process(self.y[0]).shape if len(self.y) else (0,)
+        _, y_data = self._take(slice(0, 1))
+
+        return self.y_type.process_batch(y_data).shape[1:] if len(y_data) else (0,)
 
     def insert(self, position: int, x: List[Any], y: List[Any]):
         """Inserts x and y elements at the given position.
 
+        Only the rows after `position` are moved, and the arrays grow with some spare
+        capacity, so adding rows one by one doesn't copy the whole dataset each time.
+
         Raises:
             ValueError: If the two lists don't have the same length.
         """
         if len(x) != len(y):
             raise ValueError(f"Can't insert {len(x)} values on x and {len(y)} on y!")
 
-        self.x = np.insert(self.x, position, x, axis=0)
-        self.y = np.insert(self.y, position, y, axis=0)
+        self._x.insert(position, x)
+        self._y.insert(position, y)
+
+        self.touch()
 
     def delete_rows(self, start: int, n: int = 1):
         """Deletes `n` rows at `start` position, including `start`"""
-        self.x = np.delete(self.x, range(start, start + n), axis=0)
-        self.y = np.delete(self.y, range(start, start + n), axis=0)
+        self._x.delete(start, n)
+        self._y.delete(start, n)
+
+        self.touch()
 
     def head(self, n: int = 10, role: "Role" = Role.Raw) -> Tuple[List, List]:
         """Returns the first `n` items on the dataset."""
@@ -86,46 +203,207 @@ class Dataset(keras.utils.Sequence):
     ) -> Tuple["np.array", "np.array"]:
         """Returns the `n` elements between start and end as a tuple of (x, y) items
         Range is EXCLUSIVE [start, end).
+
+        If the dataset has a `display_cache`, text rendered for the Display role is
+        cached, so the returned arrays of text are read-only.
         """
-        x_set, y_set = self._preprocess_data(self.x[start:end], self.y[start:end], role)
+        if role == self.Role.Display:
+            return self._display_items(*slice(start, end).indices(self.row_count()))
+
+        x_set, y_set = self._preprocess_data(*self._take(slice(start, end)), role)
         return x_set, y_set
 
     def row_count(self) -> int:
         """Returns the number of rows on the dataset."""
-        return len(self.x)
+        return len(self._x)
 
     def __len__(self) -> int:
         """Returns the length of the dataset (in batches)."""
-        return int(np.ceil(len(self.x) / float(self.batch_size)))
+        return int(np.ceil(self.row_count() / float(self.batch_size)))
 
     def __getitem__(self, idx: int) -> Tuple["np.array", "np.array"]:
         """Returns the batch of items starting at `idx`."""
+        return self.get_batch(idx)
+
+    def get_batch(
+        self, idx: int, role: "Role" = Role.Raw, use_buffer_pool: bool = True
+    ) -> Tuple["np.array", "np.array"]:
+        """Returns the batch number `idx`, preprocessed for the given `role`.
+
+        If the dataset has a `buffer_pool`, Raw batches are written on its buffers,
+        unless `use_buffer_pool` is False. Batches that must outlive the next
+        `buffer_pool.size` calls should be requested with `use_buffer_pool=False`.
+        """
+        batch_x, batch_y = self._take(self._batch_rows(idx))
+
+        if role == self.Role.Raw and use_buffer_pool and self.buffer_pool is not None:
+            return self._process_into_buffers(batch_x, batch_y)
+
+        return self._preprocess_data(batch_x, batch_y, role)
+
+    def on_epoch_end(self):
+        """Moves to the next epoch (and to the next permutation, if shuffling)."""
+        self.epoch += 1
+
+    def permutation(self) -> "np.ndarray":
+        """Returns the order in which rows are read on the current epoch when
+        shuffling."""
+        key = (self.seed, self.epoch, self.shuffle_block_size, self.row_count())
+
+        if key != self._permutation_key:
+            self._permutation = self._generate_permutation()
+            self._permutation_key = key
+
+        return self._permutation
+
+    def _generate_permutation(self) -> "np.ndarray":
+        rng = np.random.default_rng([self.seed, self.epoch])
+
+        row_count = self.row_count()
+        block_size = max(self.shuffle_block_size, 1)
+
+        if block_size == 1:
+            return rng.permutation(row_count)
+
+        blocks_starts = rng.permutation(-(-row_count // block_size)) * block_size
+        rows = (blocks_starts[:, np.newaxis] + np.arange(block_size)).ravel()
+
+        # The last block may be incomplete
+        return rows[rows < row_count]
+
+    def _batch_rows(self, idx: int) -> Union[slice, "np.ndarray"]:
+        """Returns the rows that belong to the batch `idx`."""
         batch_start = idx * self.batch_size
         batch_end = (idx + 1) * self.batch_size
 
-        batch_x = self.x[batch_start:batch_end]
-        batch_y = self.y[batch_start:batch_end]
+        if self.shuffle:
+            return self.permutation()[batch_start:batch_end]
+
+        return slice(batch_start, batch_end)
 
-        batch_x, batch_y = self._preprocess_data(
-            self.x[batch_start:batch_end], self.y[batch_start:batch_end]
+    def _take(
+        self, rows: Union[slice, "np.ndarray"]
+    ) -> Tuple["np.ndarray", "np.ndarray"]:
+        """Returns the stored (not processed) x and y values of `rows`."""
+        return self._x.take(rows), self._y.take(rows)
+
+    def _display_items(
+        self, start: int, end: int, step: int = 1
+    ) -> Tuple["np.array", "np.array"]:
+        """Returns the rows between `start` and `end` rendered for display.
+
+        If there is a `display_cache`, columns rendered as text are cached by blocks of
+        `DisplayBlockRows` rows, and any range of rows is built from the blocks that
+        cover it. This way, scrolling through a table one row at a time only renders
+        each block once. Columns not rendered as text (images, for example) aren't
+        cached, and only their requested rows are rendered.
+        """
+        if self.display_cache is None or step != 1 or end <= start:
+            return self._preprocess_data(
+                *self._take(slice(start, end, step)), self.Role.Display
+            )
+
+        return (
+            self._display_column(self.display_cache, 0, self.x_type, start, end),
+            self._display_column(self.display_cache, 1, self.y_type, start, end),
         )
 
-        return batch_x, batch_y
+    def _display_column(
+        self,
+        cache: "SampleCache",
+        index: int,
+        datatype: "DataType",
+        start: int,
+        end: int,
+    ) -> "np.array":
+        """Returns the rows between `start` and `end` of the column `index` (0 for x,
+        1 for y) rendered for display, from the blocks on `cache`."""
+        uncached_key = (self.version, index)
+
+        if uncached_key in self._display_uncached:
+            return datatype.display_batch(self._take(slice(start, end))[index])
+
+        first_block = start // self.DisplayBlockRows
+        last_block = (end - 1) // self.DisplayBlockRows
+
+        blocks = []
+        for block in range(first_block, last_block + 1):
+            key = (self.version, index, block)
+            rendered = cache.get(key)
+
+            if rendered is None:
+                block_start = block * self.DisplayBlockRows
+                block_end = min(block_start + self.DisplayBlockRows, self.row_count())
+
+                rendered = datatype.display_batch(
+                    self._take(slice(block_start, block_end))[index]
+                )
+
+                if not (
+                    isinstance(rendered, np.ndarray) and rendered.dtype.kind == "U"
+                ):
+                    # Not text, so it isn't rendered by blocks until the next version
+                    self._display_uncached = {
+                        key for key in self._display_uncached if key[0] == self.version
+                    }
+                    self._display_uncached.add(uncached_key)
+
+                    return datatype.display_batch(self._take(slice(start, end))[index])
+
+                cache.put(key, rendered)
+
+            blocks.append(rendered)
+
+        offset = first_block * self.DisplayBlockRows
+        rows = blocks[0] if len(blocks) == 1 else np.concatenate(blocks)
+
+        return rows[start - offset : end - offset]
 
     def _preprocess_data(
         self, x_data: "np.array", y_data: "np.array", role: "Role" = Role.Raw
     ) -> Tuple["np.array", "np.array"]:
         """ Preprocess the data. For example, if the image is a path to a file, load it
         and return the corresponding array.
+
+        The whole batch is passed at once to the datatypes, so they can process it with
+        vectorized operations instead of element by element.
         """
         if role == self.Role.Raw:
-            x_data = np.array([self.x_type.process(element) for element in x_data])
-            y_data = np.array([self.y_type.process(element) for element in y_data])
+            x_data = self.x_type.process_batch(x_data)
+            y_data = self.y_type.process_batch(y_data)
         elif role == self.Role.Display:
-            x_data = np.array([self.x_type.display(element) for element in x_data])
-            y_data = np.array([self.y_type.display(element) for element in y_data])
+            x_data = self.x_type.display_batch(x_data)
+            y_data = self.y_type.display_batch(y_data)
 
         return (x_data, y_data)
 
+    def _process_into_buffers(
+        self, x_data: "np.array", y_data: "np.array"
+    ) -> Tuple["np.array", "np.array"]:
+        """Processes a batch writing it on the next buffers of `buffer_pool`.
+
+        The first batch (or any batch that can't be written on the current buffers)
+        is processed on new arrays, which are used to size the buffers again.
+        """
+        x_out, y_out = self.buffer_pool.acquire(len(x_data))
+
+        if x_out is not None:
+            try:
+                return (
+                    self.x_type.process_batch(x_data, out=x_out),
+                    self.y_type.process_batch(y_data, out=y_out),
+                )
+
+            except ValueError:
+                # The processed batch doesn't fit the buffers anymore
+                pass
+
+        x_batch = self.x_type.process_batch(x_data)
+        y_batch = self.y_type.process_batch(y_data)
+
+        self.buffer_pool.fit(self.batch_size, x_batch, y_batch)
+
+        return x_batch, y_batch
+
     def __str__(self):
         return f"Dataset (x={self.x_type}, y={self.y_type})"
@@ -0,0 +1,158 @@
+# vim: ft=python fileencoding=utf-8 sts=4 sw=4 et:
+
+from typing import TYPE_CHECKING, Any, List, Sequence, Tuple, Union
+
+import numpy as np
+
+from .dataset import Dataset
+
+if TYPE_CHECKING:
+    from .datatype import DataType
+
+
+class DatasetView(Dataset):
+    """The DatasetView class is a Dataset that shows a subset of the rows of another
+    (parent) Dataset, without copying them.
+
+    The subset can be defined either as a slice or as an array of row indices. Rows are
+    only gathered from the parent when they're requested (a batch, a range of
+    items...), so several views (train/test splits, folds, previews...) can share the
+    same parent storage.
+
+    Datatypes are also shared with the parent dataset. Rows are read-only: replacing
+    the x/y values or inserting/deleting rows raises a TypeError (`materialize` returns
+    an editable copy).
+
+    Attributes:
+        parent: Dataset the rows are read from.
+        rows: Rows of the parent dataset shown by this view (a range or an array).
+    """
+
+    def __init__(
+        self,
+        parent: "Dataset",
+        rows: Union[slice, Sequence[int], "np.ndarray"],
+        batch_size: int = None,
+        shuffle: bool = False,
+        seed: int = None,
+        shuffle_block_size: int = 1,
+        buffer_pool_size: int = 0,
+    ):
+        self.parent = parent
+
+        if isinstance(rows, slice):
+            self.rows: Union[range, "np.ndarray"] = range(
+                *rows.indices(parent.row_count())
+            )
+        else:
+            self.rows = np.asarray(rows, dtype=np.intp)
+
+        super().__init__(
+            x_type=parent.x_type,
+            y_type=parent.y_type,
+            batch_size=parent.batch_size if batch_size is None else batch_size,
+            shuffle=shuffle,
+            seed=seed,
+            shuffle_block_size=shuffle_block_size,
+            buffer_pool_size=buffer_pool_size,
+        )
+
+    @property
+    def version(self) -> int:
+        """Returns the version of the parent dataset, as the view shows its rows."""
+        return self.parent.version
+
+    def touch(self):
+        self.parent.touch()
+
+    @property
+    def x_type(self) -> "DataType":
+        return self.parent.x_type
+
+    @x_type.setter
+    def x_type(self, x_type: "DataType"):
+        self.parent.x_type = x_type
+
+    @property
+    def y_type(self) -> "DataType":
+        return self.parent.y_type
+
+    @y_type.setter
+    def y_type(self, y_type: "DataType"):
+        self.parent.y_type = y_type
+
+    @property
+    def x(self) -> "np.ndarray":
+        """Returns the x values of the view. Only views defined by a slice can return
+        them without copying."""
+        return self._take(slice(None))[0]
+
+    @x.setter
+    def x(self, x_data: "np.ndarray"):
+        raise TypeError("The x values of a DatasetView can't be replaced")
+
+    @property
+    def y(self) -> "np.ndarray":
+        """Returns the y values of the view. Only views defined by a slice can return
+        them without copying."""
+        return self._take(slice(None))[1]
+
+    @y.setter
+    def y(self, y_data: "np.ndarray"):
+        raise TypeError("The y values of a DatasetView can't be replaced")
+
+    def materialize(self) -> "Dataset":
+        """Returns a new Dataset with a copy of the rows of this view."""
+        x_data, y_data = self._take(slice(None))
+
+        return Dataset(
+            np.array(x_data),
+            np.array(y_data),
+            x_type=self.x_type,
+            y_type=self.y_type,
+            batch_size=self.batch_size,
+        )
+
+    def insert(self, position: int, x: List[Any], y: List[Any]):
+        raise TypeError(
+            "Rows can't be inserted on a DatasetView. Use `materialize` first."
+        )
+
+    def delete_rows(self, start: int, n: int = 1):
+        raise TypeError(
+            "Rows can't be deleted from a DatasetView. Use `materialize` first."
+        )
+
+    def row_count(self) -> int:
+        """Returns the number of rows on the view."""
+        return len(self.rows)
+
+    def _take(
+        self, rows: Union[slice, "np.ndarray"]
+    ) -> Tuple["np.ndarray", "np.ndarray"]:
+        """Returns the stored x and y values of `rows`, read from the parent."""
+        return self.parent._take(self._parent_rows(rows))
+
+    def _parent_rows(
+        self, rows: Union[slice, "np.ndarray"]
+    ) -> Union[slice, "np.ndarray"]:
+        """Translates `rows` of this view to rows of the parent dataset. Slices of a
+        slice-defined view are also slices, so they don't need any copy."""
+        if not isinstance(self.rows, range):
+            return self.rows[rows]
+
+        if not isinstance(rows, slice):
+            rows = np.asarray(rows, dtype=np.intp)
+            rows = np.where(rows < 0, rows + len(self.rows), rows)
+
+            return self.rows.start + self.rows.step * rows
+
+        parent_range = self.rows[rows]
+
+        if parent_range.step < 0:
+            return np.array(parent_range, dtype=np.intp)
+
+        return slice(parent_range.start, parent_range.stop, parent_range.step)
+
+    def __str__(self):
+        return f"DatasetView ({self.row_count()} rows of {self.parent})"
@@ -4,17 +4,45 @@
 
 from .categorical import Categorical
 from .datatype import DataType, DataTypeContainer
+from .image_decoder import ImageDecoder, ImageDecodingError
 from .imagearray import ImageArray
 from .imagepath import ImagePath
+from .memmap_cache import MemmapImageCache, PackedImages
 from .numeric import Numeric
 from .numericarray import NumericArray
+from .sample_cache import SampleCache
+from .transformations import (
+    AffineTransformation,
+    Cast,
+    ChannelScale,
+    Clip,
+    Normalize,
+    Reshape,
+    Scale,
+    Transformation,
+    TransformationContainer,
+)
 
 __all__ = [
     "Categorical",
     "DataType",
     "ImageArray",
+    "ImageDecoder",
+    "ImageDecodingError",
     "ImagePath",
+    "MemmapImageCache",
+    "PackedImages",
     "Numeric",
     "NumericArray",
+    "SampleCache",
+    "Transformation",
+    "TransformationContainer",
+    "AffineTransformation",
+    "Cast",
+    "ChannelScale",
+    "Clip",
+    "Normalize",
+    "Reshape",
+    "Scale",
     "DataTypeContainer",
 ]
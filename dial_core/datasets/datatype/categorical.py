@@ -1,12 +1,11 @@
 # vim: ft=python fileencoding=utf-8 sts=4 sw=4 et:
 
-from typing import Callable, List, Union
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Union
 
 import dependency_injector.providers as providers
 import numpy as np
-from tensorflow import keras
 
-from .datatype import DataType, DataTypeContainer
+from .datatype import DataType, DataTypeContainer, _as_batch
 
 
 class Categorical(DataType):
@@ -20,10 +19,19 @@ class Categorical(DataType):
     the `categories` array.
 
     When categories are __processed__, they are transformed to the "one-hot-encoding"
-    format (see `self.process` for more information).
+    format (see `self.process` for more information). A `sparse` Categorical returns
+    them as integer indices instead, for sparse categorical losses (like
+    `sparse_categorical_crossentropy`), so no one-hot arrays are allocated.
 
     Attributes:
-        categories: List of all the categories used by this datatype.
+        categories: List of all the categories used by this datatype. Category names
+            are looked up on a cached dictionary, which is rebuilt when a new list is
+            assigned or the list is modified in place (it's cleared by the list
+            itself). A copy of the assigned list is stored, so modifying the original
+            list doesn't affect the datatype.
+        sparse: If True, processed categories are returned as their index (an integer
+            of `output_dtype`, or int64 if `output_dtype` isn't an integer type)
+            instead of on the one-hot-encoding format.
 
     Examples:
         for categories = ["a", "b", "c"]:
@@ -34,17 +42,46 @@ class Categorical(DataType):
         "c" == [0, 0, 1] == 2 == [2]
     """
 
-    def __init__(self, categories: List[str] = []):
+    def __init__(self, categories: List[str] = [], sparse: bool = False):
         super().__init__()
 
         self.is_editable = True
 
         self.categories = categories
+        self.sparse = sparse
 
         self.transformations: List[Callable] = []
 
-    def process(self, data: int) -> List[int]:
-        """Returns `data` on the one-hot-encoding format.
+    @property
+    def categories(self) -> List[str]:
+        return self._categories
+
+    @categories.setter
+    def categories(self, categories: Sequence[str]):
+        self._categories = _CategoryList(categories, self._clear_cached_categories)
+        self._category_index: Dict[str, int] = {}
+        self._category_names: Optional["np.ndarray"] = None
+
+    def category_index(self, name: str) -> int:
+        """Returns the index of the category `name`.
+
+        Raises:
+            ValueError: If `name` isn't a category.
+        """
+        if not self._category_index:
+            # Like `list.index`, repeated names return their first position
+            for index, category in enumerate(self._categories):
+                self._category_index.setdefault(category, index)
+
+        try:
+            return self._category_index[name]
+
+        except KeyError:
+            raise ValueError(f"{name!r} is not a category of {self.categories}")
+
+    def process(self, data: int) -> "np.ndarray":
+        """Returns `data` on the one-hot-encoding format (or as an index, if the
+        datatype is `sparse`).
 
         `data` must be provided as an interger representing the index of the category,
         and it is transformed to the one-hot-encoding format.
@@ -59,9 +96,51 @@ class Categorical(DataType):
         Raises:
             IndexError: if `data` is out of bounds of the `categories` array.
         """
-        return self._apply_transformations(
-            keras.utils.to_categorical(data, len(self.categories))
-        )
+        if self.sparse:
+            index = self._check_bounds(np.asarray(data, dtype=np.intp).reshape(-1))
+
+            return self._apply_transformations(index.astype(self._index_dtype())[0])
+
+        index = self._check_bounds(np.asarray(data, dtype=np.intp).reshape(-1))
+
+        one_hot = np.zeros(len(self.categories), dtype=self.output_dtype)
+        one_hot[index] = 1
+
+        return self._apply_transformations(one_hot)
+
+    def process_batch(
+        self, data: "np.ndarray", out: "np.ndarray" = None
+    ) -> "np.ndarray":
+        """Returns a batch of categories on the one-hot-encoding format (or a vector of
+        indices, if the datatype is `sparse`).
+
+        The one-hot batch is encoded by setting the position of each category on a
+        zeroed array, so no per-row operations are done.
+
+        Raises:
+            IndexError: if any element of `data` is out of bounds of the `categories`
+                array.
+        """
+        indices = self._check_bounds(np.asarray(data, dtype=np.intp).reshape(len(data)))
+
+        if self.sparse:
+            indices = indices.astype(self._index_dtype())
+
+            return self._write_to(self._apply_transformations_batch(indices), out)
+
+        shape = (len(indices), len(self.categories))
+
+        if self._can_write_directly(out, shape[0] * shape[1]):
+            one_hot = out.reshape(shape)
+            one_hot.fill(0)
+            one_hot[np.arange(len(indices)), indices] = 1
+
+            return out
+
+        one_hot = np.zeros(shape, dtype=self.output_dtype)
+        one_hot[np.arange(len(indices)), indices] = 1
+
+        return self._write_to(self._apply_transformations_batch(one_hot), out)
 
     def display(self, data: int) -> str:
         """Returns `data` as the corresponding name of the category.
@@ -78,6 +157,21 @@ class Categorical(DataType):
         """
         return self.categories[data]
 
+    def display_batch(self, data: "np.ndarray") -> "np.ndarray":
+        """Returns the names of a batch of categories, taken from an array with all the
+        names with a single indexing operation.
+
+        Raises:
+            IndexError: if any element of `data` is out of bounds of the `categories`
+                array.
+        """
+        if self._category_names is None:
+            self._category_names = np.array(self._categories, dtype=str)
+
+        return np.take(
+            self._category_names, np.asarray(data, dtype=np.intp).reshape(len(data))
+        )
+
     def convert_to_expected_format(self, data: Union[str, int, list]) -> int:
         """
         Tries to transform an input value to the value expected to be stored on the
@@ -114,9 +208,9 @@ class Categorical(DataType):
 
             except ValueError:
                 # "foo"
-                data_as_int = self.categories.index(data)
+                data_as_int = self.category_index(data)
 
-        elif isinstance(data, int):
+        elif isinstance(data, (int, np.integer)):
             # 1
             data_as_int = data
 
@@ -135,9 +229,106 @@ class Categorical(DataType):
 
         raise ValueError
 
+    def convert_column(
+        self, data: Union["np.ndarray", Sequence], invalid_value: int = None
+    ) -> "np.ndarray":
+        """Transforms a whole column of values to the format expected to be stored on
+        the dataset (an array of category indices).
+
+        Values are accepted on the same formats as `convert_to_expected_format`, but
+        the column is converted with vectorized operations: a column of one-hot rows is
+        reduced with a single `argmax`, and a column of strings only converts each
+        different string once.
+
+        Args:
+            data: Column of values to convert.
+            invalid_value: If not None, values that can't be converted are returned as
+                `invalid_value` instead of raising an error.
+
+        Raises:
+            ValueError: If any value can't be converted (and `invalid_value` is None).
+        """
+        data = data if isinstance(data, np.ndarray) else _as_batch(list(data))
+
+        if len(data) == 0:
+            return np.empty(0, dtype=np.int64)
+
+        if data.dtype == object:
+            return np.array(
+                [self._convert_or(element, invalid_value) for element in data],
+                dtype=np.int64,
+            )
+
+        if data.dtype.kind in "US":
+            uniques, inverse = np.unique(data, return_inverse=True)
+            converted = np.array(
+                [self._convert_or(str(unique), invalid_value) for unique in uniques],
+                dtype=np.int64,
+            )
+
+            return converted[inverse.reshape(-1)]
+
+        if data.ndim == 2:
+            # [[1], [2]] or one-hot rows
+            data = data[:, 0] if data.shape[1] == 1 else data.argmax(axis=1)
+
+        if data.ndim != 1 or data.dtype.kind not in "iufb":
+            raise ValueError(f"Can't convert an array of {data.dtype} {data.shape}")
+
+        indices = data.astype(np.int64)
+        invalid = (indices != data) | (indices < 0) | (indices >= len(self.categories))
+
+        if invalid.any():
+            if invalid_value is None:
+                raise ValueError(
+                    f"Values {np.unique(data[invalid])[:10].tolist()} are not"
+                    f" categories of {self.categories}"
+                )
+
+            indices[invalid] = invalid_value
+
+        return indices
+
+    def _clear_cached_categories(self):
+        """Clears the cached lookups. Called each time the categories list is replaced
+        or modified in place (like when a category is edited)."""
+        self._category_index = {}
+        self._category_names = None
+
+    def _index_dtype(self) -> "np.dtype":
+        dtype = np.dtype(self.output_dtype)
+
+        return dtype if dtype.kind in "iu" else np.dtype(np.int64)
+
+    def _check_bounds(self, indices: "np.ndarray") -> "np.ndarray":
+        """Returns `indices` if all of them are valid category indices. Negative
+        indices aren't valid either (-1 marks invalid values, see `convert_column`), so
+        they don't wrap around to the last categories.
+
+        Raises:
+            IndexError: if any index is out of bounds of the `categories` array.
+        """
+        if len(indices) and (
+            indices.min() < 0 or indices.max() >= len(self.categories)
+        ):
+            raise IndexError(f"Category index out of bounds of {self.categories}")
+
+        return indices
+
+    def _convert_or(self, data: Union[str, int, list], invalid_value: int) -> int:
+        if invalid_value is None:
+            return self.convert_to_expected_format(data)
+
+        try:
+            return self.convert_to_expected_format(data)
+
+        except (ValueError, TypeError):
+            return invalid_value
+
     def __getstate__(self) -> dict:
         dc = super().__getstate__()
-        dc["categories"] = self.categories
+        dc["categories"] = list(self.categories)
+        dc["sparse"] = self.sparse
 
         return dc
 
@@ -145,9 +336,78 @@ class Categorical(DataType):
         super().__setstate__(new_state)
 
         self.categories = new_state["categories"]
+        self.sparse = new_state.get("sparse", False)
+
+    def __reduce__(self):
+        return (Categorical, (list(self.categories), self.sparse), self.__getstate__())
+
+
+class _CategoryList(list):
+    """List of categories that calls `on_change` each time it's modified, so the
+    lookups cached by a Categorical are cleared only when they're outdated."""
+
+    def __init__(self, categories: Sequence[str], on_change: Callable[[], None]):
+        super().__init__(categories)
+
+        self._on_change = on_change
+
+    def __setitem__(self, *args):
+        super().__setitem__(*args)
+        self._on_change()
+
+    def __delitem__(self, *args):
+        super().__delitem__(*args)
+        self._on_change()
+
+    def __iadd__(self, categories: Iterable[str]) -> "_CategoryList":  # type: ignore
+        super().__iadd__(categories)
+        self._on_change()
+
+        return self
+
+    def __imul__(self, n: int) -> "_CategoryList":  # type: ignore
+        super().__imul__(n)
+        self._on_change()
+
+        return self
+
+    def append(self, *args):
+        super().append(*args)
+        self._on_change()
+
+    def extend(self, *args):
+        super().extend(*args)
+        self._on_change()
+
+    def insert(self, *args):
+        super().insert(*args)
+        self._on_change()
+
+    def pop(self, *args):
+        category = super().pop(*args)
+        self._on_change()
+
+        return category
+
+    def remove(self, *args):
+        super().remove(*args)
+        self._on_change()
+
+    def clear(self):
+        super().clear()
+        self._on_change()
+
+    def sort(self, *args, **kwargs):
+        super().sort(*args, **kwargs)
+        self._on_change()
+
+    def reverse(self):
+        super().reverse()
+        self._on_change()
 
     def __reduce__(self):
-        return (Categorical, (self.categories,), self.__getstate__())
+        # Copied and pickled as a plain list
+        return (list, (list(self),))
 
 
 DataTypeContainer.Categorical = providers.Factory(Categorical)
@@ -1,9 +1,16 @@
 # vim: ft=python fileencoding=utf-8 sts=4 sw=4 et:
 
 from abc import ABCMeta, abstractmethod
-from typing import Any, Callable, List
+from typing import Any, Callable, List, Optional, Sequence
 
 import dependency_injector.containers as containers
+import numpy as np
+
+from dial_core.utils import log
+
+from .transformations import AffineTransformation, Transformation
+
+LOGGER = log.get_logger(__name__)
 
 
 class DataType(metaclass=ABCMeta):
@@ -14,11 +21,24 @@ class DataType(metaclass=ABCMeta):
 
     This class must provide an implementation for `process` and `display` methods. See
     the methods documentation for more information.
+
+    Attributes:
+        output_dtype: dtype of the arrays returned by `process` (float32 by default,
+            which is what Keras uses). Image types keep the pixel values on the range
+            (0-255) if an integer dtype (like uint8) is chosen, so they can be
+            normalized inside the model instead.
+        transformations: Functions applied (in order) to each processed value. The
+            vectorized transformations of the `transformations` module (Normalize,
+            Clip, Cast...) are applied to whole batches at once, while any other
+            callable is applied sample by sample. Only the `Transformation` objects
+            are saved by `to_dict` (and sent to worker processes when pickled).
     """
 
     def __init__(self):
         self.is_editable = False
 
+        self.output_dtype = "float32"
+
         self.transformations: List[Callable] = []
 
     @abstractmethod
@@ -37,6 +57,33 @@ class DataType(metaclass=ABCMeta):
         of the interger.
         """
 
+    def process_batch(
+        self, data: "np.ndarray", out: "np.ndarray" = None
+    ) -> "np.ndarray":
+        """Returns a whole batch of `data` after processing.
+
+        The default implementation just calls `process` for each element, so custom
+        DataTypes keep working without changes. DataTypes that can process the whole
+        batch with a few vectorized operations should override this method.
+
+        If `out` is passed, the processed batch is written on it (and `out` is
+        returned) instead of on a new array.
+
+        Raises:
+            ValueError: If the processed batch doesn't have the same shape as `out`.
+        """
+        batch = _as_batch([self.process(element) for element in data])
+
+        return self._write_to(batch, out)
+
+    def display_batch(self, data: "np.ndarray") -> "np.ndarray":
+        """Returns the display representation of a whole batch of `data`.
+
+        As with `process_batch`, the default implementation calls `display` for each
+        element.
+        """
+        return _as_batch([self.display(element) for element in data])
+
     @abstractmethod
     def convert_to_expected_format(self, data):
         """Transforms the passed data to a format expected to be stored by the dataset.
@@ -74,11 +121,97 @@ class DataType(metaclass=ABCMeta):
 
         return result
 
+    def _write_to(
+        self, batch: "np.ndarray", out: Optional["np.ndarray"]
+    ) -> "np.ndarray":
+        """Returns `batch`, or copies it on `out` if passed.
+
+        Raises:
+            ValueError: If `batch` doesn't have the same shape as `out`.
+        """
+        if out is None:
+            return batch
+
+        if batch.shape != out.shape:
+            raise ValueError(
+                f"A batch of shape {batch.shape} can't be written on an array of shape"
+                f" {out.shape}"
+            )
+
+        np.copyto(out, batch, casting="unsafe")
+
+        return out
+
+    def _can_write_directly(self, out: Optional["np.ndarray"], size: int) -> bool:
+        """Checks if a batch of `size` values can be processed straight on `out`,
+        without any intermediate array."""
+        return (
+            out is not None
+            and not self.transformations
+            and out.size == size
+            and out.dtype == np.dtype(self.output_dtype)
+            and out.flags.c_contiguous
+        )
+
+    def _apply_transformations_batch(self, batch: "np.ndarray") -> "np.ndarray":
+        """Applies the transformations to an already processed batch.
+
+        Batches of elements with different shapes (object arrays) are transformed
+        element by element.
+        """
+        if not self.transformations:
+            return batch
+
+        if batch.dtype == object:
+            return _as_batch(
+                [self._apply_transformations(element) for element in batch]
+            )
+
+        return self._transformations_pipeline()(batch)
+
+    def _transformations_pipeline(self) -> "TransformationPipeline":
+        """Returns the `transformations` compiled on a single pipeline. The pipeline
+        is compiled again only when the list changes."""
+        pipeline = getattr(self, "_pipeline", None)
+
+        if pipeline is None or pipeline.transformations != self.transformations:
+            pipeline = TransformationPipeline(self.transformations)
+            self._pipeline = pipeline
+
+        return pipeline
+
     def __getstate__(self) -> dict:
-        return {"class": str(self)}
+        return {
+            "class": str(self),
+            "output_dtype": self.output_dtype,
+            "transformations": self._transformations_specs(),
+        }
 
     def __setstate__(self, new_state: dict):
-        pass
+        self.output_dtype = new_state.get("output_dtype", "float32")
+
+        self.transformations = [
+            Transformation.create(spec)
+            for spec in new_state.get("transformations", [])
+        ]
+
+    def _transformations_specs(self) -> List[dict]:
+        """Returns the `to_dict` representation of each transformation. Plain
+        callables can't be saved, so they're left out."""
+        specs = []
+
+        for transformation in self.transformations:
+            if isinstance(transformation, Transformation):
+                specs.append(transformation.to_dict())
+            else:
+                LOGGER.warning(
+                    "Transformation %s of %s can't be saved. Use the classes of the"
+                    " `transformations` module instead.",
+                    transformation,
+                    self,
+                )
+
+        return specs
 
     def __reduce__(self):
         return (DataType, (), self.__getstate__())
@@ -87,4 +220,62 @@ class DataType(metaclass=ABCMeta):
         return type(self).__name__
 
 
+def _as_batch(elements: list) -> "np.ndarray":
+    """Stacks `elements` on a single array. If the elements don't share the same shape,
+    an object array with one element per item is returned instead."""
+    try:
+        return np.array(elements)
+
+    except ValueError:
+        batch = np.empty(len(elements), dtype=object)
+        for i, element in enumerate(elements):
+            batch[i] = element
+
+        return batch
+
+
+class TransformationPipeline:
+    """The TransformationPipeline class applies a list of transformations to whole
+    batches.
+
+    Consecutive affine transformations (Scale, Normalize...) are fused into a single
+    multiply-add, and only the first step that changes the values copies the batch
+    (the next ones work in place), so the input batch is never modified. Plain
+    callables can only transform a single sample, so they're called once per sample.
+
+    Attributes:
+        transformations: Transformations the pipeline was compiled from.
+    """
+
+    def __init__(self, transformations: Sequence[Callable]):
+        self.transformations = list(transformations)
+
+        self._steps: List[Callable] = []
+
+        for transformation in self.transformations:
+            previous = self._steps[-1] if self._steps else None
+
+            if isinstance(transformation, AffineTransformation) and isinstance(
+                previous, AffineTransformation
+            ):
+                self._steps[-1] = previous.then(transformation)
+            else:
+                self._steps.append(transformation)
+
+    def __call__(self, batch: "np.ndarray") -> "np.ndarray":
+        owned = False
+
+        for step in self._steps:
+            if isinstance(step, Transformation):
+                result = step.apply_batch(batch, in_place=owned)
+            else:
+                result = _as_batch([step(element) for element in batch])
+
+            # A new array is owned by the pipeline, so it can be modified in place
+            owned = owned or not np.may_share_memory(result, batch)
+            batch = result
+
+        return batch
+
+
 DataTypeContainer = containers.DynamicContainer()
@@ -0,0 +1,307 @@
+# vim: ft=python fileencoding=utf-8 sts=4 sw=4 et:
+
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from typing import Callable, List, Optional, Sequence, Tuple
+
+import numpy as np
+from PIL import Image
+
+try:
+    from multiprocessing import shared_memory
+except ImportError:  # pragma: no cover
+    # Python < 3.8. Decoded images are sent back pickled.
+    shared_memory = None
+
+
+class ImageDecodingError(Exception):
+    """Raised when a batch of images can't be decoded (a file can't be read, the images
+    don't share the same shape, a worker crashed...)."""
+
+
+ResizeModes = ("stretch", "crop", "pad")
+
+Interpolations = {
+    "nearest": Image.NEAREST,
+    "box": Image.BOX,
+    "bilinear": Image.BILINEAR,
+    "hamming": Image.HAMMING,
+    "bicubic": Image.BICUBIC,
+    "lanczos": Image.LANCZOS,
+}
+
+
+def read_image(
+    path: str,
+    target_size: Optional[Tuple[int, int]] = None,
+    resize_mode: str = "stretch",
+    interpolation: str = "bilinear",
+) -> "np.ndarray":
+    """Opens the image file on `path` and returns its content as an array. Images
+    stored as NumPy arrays (.npy files) are also supported.
+
+    If a `target_size` is passed, the image is resized while it's decoded (see
+    `resize_image`).
+    """
+    if str(path).endswith(".npy"):
+        image_array = np.load(path, allow_pickle=False)
+
+        if target_size is None:
+            return image_array
+
+        return np.array(
+            resize_image(
+                Image.fromarray(image_array), target_size, resize_mode, interpolation
+            )
+        )
+
+    with Image.open(path) as image:
+        if target_size is None:
+            return np.array(image)
+
+        return np.array(resize_image(image, target_size, resize_mode, interpolation))
+
+
+def resize_image(
+    image: "Image.Image",
+    target_size: Tuple[int, int],
+    resize_mode: str = "stretch",
+    interpolation: str = "bilinear",
+) -> "Image.Image":
+    """Returns `image` resized to `target_size`.
+
+    JPEG images that haven't been loaded yet are decoded directly to a reduced scale
+    (with `Image.draft`), so the full resolution image is never decoded when it's much
+    bigger than the target size.
+
+    Args:
+        image: Image to resize.
+        target_size: Size of the returned image, as (height, width).
+        resize_mode: How the aspect ratio is handled:
+            * "stretch": The image is scaled to `target_size`, ignoring the aspect
+                ratio.
+            * "crop": The image is scaled to cover `target_size`, keeping its aspect
+                ratio, and the center is cropped.
+            * "pad": The image is scaled to fit inside `target_size`, keeping its aspect
+                ratio, and the borders are filled with zeros.
+        interpolation: Resampling filter ("nearest", "bilinear", "bicubic"...).
+
+    Raises:
+        ValueError: If `resize_mode` or `interpolation` aren't valid.
+    """
+    if resize_mode not in ResizeModes:
+        raise ValueError(f"Invalid resize mode {resize_mode!r} ({ResizeModes})")
+
+    if interpolation not in Interpolations:
+        raise ValueError(
+            f"Invalid interpolation {interpolation!r} ({list(Interpolations)})"
+        )
+
+    height, width = target_size
+    resample = Interpolations[interpolation]
+
+    if image.size == (width, height):
+        return image
+
+    # Scale needed on each axis, relative to the original size
+    scales = (width / image.width, height / image.height)
+
+    if resize_mode == "stretch":
+        image.draft(image.mode, (width, height))
+
+        return image.resize((width, height), resample, reducing_gap=3.0)
+
+    if resize_mode == "crop":
+        scale = max(scales)
+        image.draft(image.mode, _scaled_size(image.size, scale))
+
+        # Centered region of the (maybe reduced) image with the target aspect ratio
+        crop_width = min(image.width, width * image.height / height)
+        crop_height = min(image.height, height * image.width / width)
+        left = (image.width - crop_width) / 2
+        top = (image.height - crop_height) / 2
+
+        return image.resize(
+            (width, height),
+            resample,
+            box=(left, top, left + crop_width, top + crop_height),
+            reducing_gap=3.0,
+        )
+
+    size = _scaled_size(image.size, min(scales))
+    size = (min(size[0], width), min(size[1], height))
+
+    image.draft(image.mode, size)
+    resized = image.resize(size, resample, reducing_gap=3.0)
+
+    padded = Image.new(resized.mode, (width, height))
+    padded.paste(resized, ((width - size[0]) // 2, (height - size[1]) // 2))
+
+    return padded
+
+
+def _scaled_size(size: Tuple[int, int], scale: float) -> Tuple[int, int]:
+    return (max(round(size[0] * scale), 1), max(round(size[1] * scale), 1))
+
+
+def _decode_chunk(
+    shm_name: str,
+    shape: tuple,
+    dtype: str,
+    start: int,
+    paths: List[str],
+    read_function: Callable,
+):
+    """Decodes `paths` on a worker process, writing them on the shared memory block
+    `shm_name` from row `start`."""
+    shm = shared_memory.SharedMemory(name=shm_name)
+
+    try:
+        block = np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+
+        for i, path in enumerate(paths, start):
+            image = read_function(path)
+
+            if image.shape != shape[1:]:
+                raise ValueError(
+                    f"{path} has shape {image.shape}, but {shape[1:]} was expected."
+                )
+
+            block[i] = image
+
+        del block
+
+    finally:
+        shm.close()
+
+
+def _decode_chunk_pickled(paths: List[str], read_function: Callable) -> list:
+    return [read_function(path) for path in paths]
+
+
+class ImageDecoder:
+    """The ImageDecoder class decodes batches of image files on a pool of worker
+    processes, so decoding isn't limited to a single core.
+
+    The workers write the decoded images directly on a shared memory block, instead of
+    pickling the arrays back to the main process. All the images on a batch must share
+    the same shape, and they're returned in the same order as their paths.
+
+    Attributes:
+        workers: Number of worker processes.
+        read_function: Function used to open each image file. Must be pickable.
+    """
+
+    def __init__(self, workers: int = None, read_function: Callable = read_image):
+        self.workers = workers if workers else (os.cpu_count() or 1)
+        self.read_function = read_function
+
+        self._executor: Optional["ProcessPoolExecutor"] = None
+
+    def decode(
+        self, paths: Sequence[str], read_function: Callable = None
+    ) -> "np.ndarray":
+        """Returns the decoded images on `paths` as a single (N, ...) array.
+
+        Args:
+            paths: Paths of the image files.
+            read_function: Function used to open each image file instead of
+                `self.read_function`. Must be pickable.
+
+        Raises:
+            ImageDecodingError: If any image can't be decoded, or a worker crashed.
+        """
+        if len(paths) == 0:
+            return np.empty(0)
+
+        paths = [str(path) for path in paths]
+        read_function = read_function if read_function else self.read_function
+
+        try:
+            if shared_memory is None:  # pragma: no cover
+                return self._decode_pickled(paths, read_function)
+
+            return self._decode_shared(paths, read_function)
+
+        except BrokenProcessPool as err:
+            # The pool can't be used anymore, start a new one on the next batch
+            self._executor = None
+
+            raise ImageDecodingError("A decoding worker stopped unexpectedly.") from err
+
+        except Exception as err:
+            raise ImageDecodingError(str(err)) from err
+
+    def shutdown(self):
+        """Stops the worker processes. They're started again on the next batch."""
+        if self._executor:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+    def _decode_shared(
+        self, paths: List[str], read_function: Callable
+    ) -> "np.ndarray":
+        # The first image defines the shape and dtype of the whole batch
+        first_image = read_function(paths[0])
+        shape = (len(paths),) + first_image.shape
+
+        shm = shared_memory.SharedMemory(
+            create=True, size=max(int(np.prod(shape)) * first_image.itemsize, 1)
+        )
+
+        try:
+            block = np.ndarray(shape, dtype=first_image.dtype, buffer=shm.buf)
+            block[0] = first_image
+
+            futures = [
+                self._get_executor().submit(
+                    _decode_chunk,
+                    shm.name,
+                    shape,
+                    first_image.dtype.str,
+                    start,
+                    chunk,
+                    read_function,
+                )
+                for start, chunk in self._chunks(paths, offset=1)
+            ]
+
+            try:
+                for future in futures:
+                    future.result()
+
+                return block.copy()
+
+            finally:
+                # The block can't be released while some worker is still writing on it
+                wait(futures)
+                del block
+
+        finally:
+            shm.close()
+            shm.unlink()
+
+    def _decode_pickled(
+        self, paths: List[str], read_function: Callable
+    ) -> "np.ndarray":  # pragma: no cover
+        futures = [
+            self._get_executor().submit(_decode_chunk_pickled, chunk, read_function)
+            for _, chunk in self._chunks(paths)
+        ]
+
+        return np.array([image for future in futures for image in future.result()])
+
+    def _chunks(self, paths: List[str], offset: int = 0):
+        """Splits `paths[offset:]` on one contiguous chunk per worker."""
+        chunk_size = max(math.ceil((len(paths) - offset) / self.workers), 1)
+
+        for start in range(offset, len(paths), chunk_size):
+            yield start, paths[start : start + chunk_size]
+
+    def _get_executor(self) -> "ProcessPoolExecutor":
+        if not self._executor:
+            self._executor = ProcessPoolExecutor(max_workers=self.workers)
+
+        return self._executor
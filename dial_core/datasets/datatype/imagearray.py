@@ -8,13 +8,34 @@ import numpy as np
 from .datatype import DataType, DataTypeContainer
 
 
+def normalize_pixels(
+    data: "np.ndarray", dtype: str, out: "np.ndarray" = None
+) -> "np.ndarray":
+    """Returns the pixel values of `data` on the range (0-1), as `dtype`. If `dtype` is
+    an integer type, pixel values are kept on the range (0-255).
+
+    If `out` is passed, the result is written on it instead of on a new array.
+    """
+    dtype = np.dtype(dtype)
+
+    if dtype.kind in "iu":
+        if out is None:
+            return np.asarray(data).astype(dtype, copy=False)
+
+        np.copyto(out, data, casting="unsafe")
+        return out
+
+    return np.divide(data, 255, out=out, dtype=dtype)
+
+
 class ImageArray(DataType):
     """
     The ImageArray class represents an image as amultidimensional array, each one with a
     pixel intensity.
 
     Pixels are stored on memory with values between (0-255), but they're transformed to
-    the range (0-1) after the `process` method.
+    the range (0-1) after the `process` method (unless `output_dtype` is an integer
+    type).
 
     The array will have shape (W, H) for grayscale images, or (W, H, C), where C
     represents the number of color channels (For RGB images it would be 3, for example)
@@ -27,17 +48,44 @@ class ImageArray(DataType):
 
     def process(self, data: "np.ndarray") -> "np.ndarray":
         """Returns `data` with pixel values in the range (0-1)."""
-        data = data / 255.0
+        data = normalize_pixels(data, self.output_dtype)
 
         if len(data.shape) == 2:
             data = np.expand_dims(data, axis=2)
 
         return self._apply_transformations(data)
 
+    def process_batch(
+        self, data: "np.ndarray", out: "np.ndarray" = None
+    ) -> "np.ndarray":
+        """Returns a batch of images with pixel values in the range (0-1).
+
+        The batch is expected as a single block of shape (N, W, H) or (N, W, H, C). If
+        the images don't share the same shape (an object array), each image is
+        processed separately.
+        """
+        if len(data) == 0 or data.dtype == object:
+            return super().process_batch(data, out)
+
+        if self._can_write_directly(out, data.size):
+            normalize_pixels(data, self.output_dtype, out=out.reshape(data.shape))
+            return out
+
+        data = normalize_pixels(data, self.output_dtype)
+
+        if len(data.shape) == 3:
+            data = np.expand_dims(data, axis=3)
+
+        return self._write_to(self._apply_transformations_batch(data), out)
+
     def display(self, data: "np.ndarray") -> "np.ndarray":
         """Returns the data _as it is_, and can be used to paint the image."""
         return data
 
+    def display_batch(self, data: "np.ndarray") -> "np.ndarray":
+        """Returns the batch _as it is_."""
+        return data
+
     def convert_to_expected_format(self, data: "np.ndarray") -> "np.ndarray":
         """This class actually expects data to be passed correctly, as it is hard to
         translate from one format to another.
@@ -1,38 +1,150 @@
 # vim: ft=python fileencoding=utf-8 sts=4 sw=4 et:
 
 import os
-from typing import Callable, List
+from functools import partial
+from typing import TYPE_CHECKING, Callable, List, Optional, Sequence, Tuple
 
 import dependency_injector.providers as providers
-import numpy as np
-from PIL import Image
 
-from .datatype import DataType, DataTypeContainer
+from .datatype import DataType, DataTypeContainer, _as_batch
+from .image_decoder import read_image
+from .imagearray import normalize_pixels
+from .memmap_cache import MemmapImageCache
+
+if TYPE_CHECKING:
+    import numpy as np
+
+    from .image_decoder import ImageDecoder
+    from .memmap_cache import PackedImages
+    from .sample_cache import SampleCache
 
 
 class ImagePath(DataType):
     """ The ImagePath class represents an image as an absolute path to a file that will
-    be loading while training."""
-
-    def __init__(self):
+    be loading while training.
+
+    Attributes:
+        decoder: If set, whole batches of images are decoded in parallel by this
+            ImageDecoder instead of one by one on the calling thread. All the images of
+            a batch must share the same shape.
+        cache: If set, decoded images are stored on this SampleCache, and only loaded
+            again from disk if the file is modified. The cache is used by both `process`
+            and `display`.
+        packed_images: Images stored on a MemmapImageCache. Images found here are
+            returned directly from the memory-mapped file. See `load_memmap_cache`.
+        target_size: If set, images are resized to this (height, width) while they're
+            decoded, so all of them have the same shape. Big JPEG images are decoded
+            directly at a reduced scale.
+        resize_mode: How the aspect ratio is handled when resizing ("stretch", "crop"
+            or "pad"). See `image_decoder.resize_image`.
+        interpolation: Resampling filter used when resizing ("nearest", "bilinear",
+            "bicubic"...).
+    """
+
+    def __init__(
+        self,
+        target_size: Optional[Tuple[int, int]] = None,
+        resize_mode: str = "stretch",
+        interpolation: str = "bilinear",
+    ):
         super().__init__()
 
+        self.target_size = tuple(target_size) if target_size else None
+        self.resize_mode = resize_mode
+        self.interpolation = interpolation
+
+        self.decoder: Optional["ImageDecoder"] = None
+        self.cache: Optional["SampleCache"] = None
+        self.packed_images: Optional["PackedImages"] = None
+
         self.transformations: List[Callable] = []
 
+    @property
+    def read_function(self) -> Callable:
+        """Returns the (pickable) function used to decode each image file."""
+        if self.target_size is None:
+            return read_image
+
+        return partial(
+            read_image,
+            target_size=self.target_size,
+            resize_mode=self.resize_mode,
+            interpolation=self.interpolation,
+        )
+
     def process(self, data: str) -> "np.ndarray":
         """Returns `data` as an array with pixel values in the range (0-1)."""
         image_array = self.display(data)
 
-        image_array = image_array / 255.0
+        image_array = normalize_pixels(image_array, self.output_dtype)
 
         return self._apply_transformations(image_array)
 
+    def process_batch(
+        self, data: "np.ndarray", out: "np.ndarray" = None
+    ) -> "np.ndarray":
+        """Returns a batch of images with pixel values in the range (0-1)."""
+        if self.decoder is None or len(data) == 0:
+            return super().process_batch(data, out)
+
+        images = self.display_batch(data)
+
+        if images.dtype != object and self._can_write_directly(out, images.size):
+            normalize_pixels(images, self.output_dtype, out=out.reshape(images.shape))
+            return out
+
+        return self._write_to(
+            self._apply_transformations_batch(
+                normalize_pixels(images, self.output_dtype)
+            ),
+            out,
+        )
+
     def display(self, data: "np.ndarray") -> "np.ndarray":
         """Returns the loaded data _as it is_. Can be used to paint the image."""
-        image = Image.open(data)
-        image_array = np.array(image)
+        if self.packed_images is not None:
+            image = self.packed_images.get(data)
+
+            if image is not None:
+                return image
+
+        if self.cache is None:
+            return self.read_function(data)
+
+        return self.cache.get_or_load(
+            self._cache_key(data), lambda: self.read_function(data)
+        )
+
+    def display_batch(self, data: "np.ndarray") -> "np.ndarray":
+        """Returns the loaded batch of images _as they are_.
+
+        Raises:
+            ImageDecodingError: If the batch is decoded by `decoder` and any image can't
+                be decoded.
+        """
+        if self.decoder is None or self.packed_images is not None or len(data) == 0:
+            return super().display_batch(data)
+
+        if self.cache is None:
+            return self.decoder.decode(data, self.read_function)
 
-        return image_array
+        # Only the images that aren't cached are sent to the decoder
+        keys = [self._cache_key(path) for path in data]
+        images = [self.cache.get(key) for key in keys]
+
+        missing = [i for i, image in enumerate(images) if image is None]
+
+        if missing:
+            decoded = self.decoder.decode(
+                [data[i] for i in missing], self.read_function
+            )
+
+            for i, image in zip(missing, decoded):
+                # Copy each image, or the cache would keep the whole batch alive
+                images[i] = image.copy()
+                self.cache.put(keys[i], images[i])
+
+        return _as_batch(images)
 
     def convert_to_expected_format(self, image: "str") -> "np.ndarray":
         """This class actually expects data to be passed correctly, as it is hard to
@@ -40,8 +152,62 @@ class ImagePath(DataType):
         """
         return os.path.abspath(image)
 
+    def load_memmap_cache(
+        self, paths: Sequence[str], cache_dir: str, workers: int = None
+    ) -> "PackedImages":
+        """Loads the images of `paths` from a MemmapImageCache stored on `cache_dir`,
+        building it first if it doesn't exist or is outdated.
+
+        Following calls to `process` and `display` will read the images from the
+        cache instead of decoding the files again. Images are stored already resized,
+        so each `target_size` (and resize options) has its own cache. Only the last
+        built cache is kept on each directory (see MemmapImageCache).
+        """
+        if self.target_size is not None:
+            height, width = self.target_size
+            cache_dir = os.path.join(
+                cache_dir, f"{height}x{width}-{self.resize_mode}-{self.interpolation}"
+            )
+
+        memmap_cache = MemmapImageCache(cache_dir)
+
+        if not memmap_cache.is_built(paths):
+            memmap_cache.build(paths, read_function=self.read_function, workers=workers)
+
+        self.packed_images = memmap_cache.open(paths)
+
+        return self.packed_images
+
+    def _cache_key(self, path: str) -> tuple:
+        """Images are cached by path and modification time, so modified files are
+        loaded again. Images resized with different options don't share entries."""
+        return (
+            path,
+            os.stat(path).st_mtime_ns,
+            self.target_size,
+            self.resize_mode,
+            self.interpolation,
+        )
+
+    def __getstate__(self) -> dict:
+        dc = super().__getstate__()
+        dc["target_size"] = list(self.target_size) if self.target_size else None
+        dc["resize_mode"] = self.resize_mode
+        dc["interpolation"] = self.interpolation
+
+        return dc
+
+    def __setstate__(self, new_state: dict):
+        super().__setstate__(new_state)
+
+        target_size = new_state.get("target_size")
+
+        self.target_size = tuple(target_size) if target_size else None
+        self.resize_mode = new_state.get("resize_mode", "stretch")
+        self.interpolation = new_state.get("interpolation", "bilinear")
+
     def __reduce__(self):
-        return (ImagePath, (), super().__getstate__())
+        return (ImagePath, (), self.__getstate__())
 
 
 DataTypeContainer.ImagePath = providers.Factory(ImagePath)
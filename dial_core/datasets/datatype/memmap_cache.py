@@ -0,0 +1,207 @@
+# vim: ft=python fileencoding=utf-8 sts=4 sw=4 et:
+
+import hashlib
+import os
+import re
+import shutil
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Dict, Optional, Sequence
+
+import numpy as np
+
+from .image_decoder import read_image
+
+# Names of the cache directories (SHA-1 fingerprints)
+_FingerprintRegex = re.compile(r"[0-9a-f]{40}")
+
+
+class PackedImages:
+    """The PackedImages class gives access to the images stored on a
+    MemmapImageCache.
+
+    All the images are stored on a single uint8 memory-mapped file, so returned images
+    are read-only views of that file (no copies are done).
+
+    Attributes:
+        data: uint8 memory-mapped array with the bytes of all the images.
+        offsets: Start (and end) position of each image on `data`.
+        shapes: Shape of each image.
+        dtypes: dtype of each image.
+    """
+
+    def __init__(self, data: "np.ndarray", index: dict):
+        self.data = data
+
+        self.offsets = index["offsets"]
+        self.shapes = index["shapes"]
+        self.dtypes = index["dtypes"]
+
+        self._rows: Dict[str, int] = {
+            path: row for row, path in enumerate(index["paths"].tolist())
+        }
+
+    def get(self, path: str) -> Optional["np.ndarray"]:
+        """Returns the image of the file `path`, or None if it isn't stored."""
+        row = self._rows.get(path)
+
+        return self[row] if row is not None else None
+
+    def __getitem__(self, row: int) -> "np.ndarray":
+        start, end = self.offsets[row], self.offsets[row + 1]
+        shape = tuple(dim for dim in self.shapes[row] if dim >= 0)
+
+        return self.data[start:end].view(self.dtypes[row]).reshape(shape)
+
+    def __contains__(self, path: str) -> bool:
+        return path in self._rows
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+
+class MemmapImageCache:
+    """The MemmapImageCache class stores decoded images on disk, packed on a single
+    memory-mapped file, so they don't have to be decoded again on later runs.
+
+    Each cache is identified by a fingerprint of its file list (paths, modification
+    times and sizes). If any file changes, the fingerprint changes too and the old cache
+    isn't used anymore. Only the last built cache is kept on `cache_dir` (the others
+    are removed after a build), so sets of images that are used at the same time
+    (train and test sets, for example) must be stored on different directories.
+
+    Caches are built on a temporary directory and then renamed to their final
+    location, so several processes can build the same cache at the same time: only one
+    of them is kept, and readers never see a partially written cache.
+
+    Attributes:
+        cache_dir: Directory where the caches are stored.
+    """
+
+    DataFilename = "data.bin"
+    IndexFilename = "index.npz"
+
+    def __init__(self, cache_dir: str):
+        self.cache_dir = cache_dir
+
+    @staticmethod
+    def fingerprint(paths: Sequence[str]) -> str:
+        """Returns an identifier for the current state of the files on `paths`."""
+        sha = hashlib.sha1()
+
+        for path in paths:
+            stat = os.stat(path)
+            sha.update(f"{path}|{stat.st_mtime_ns}|{stat.st_size}\n".encode("utf-8"))
+
+        return sha.hexdigest()
+
+    def is_built(self, paths: Sequence[str]) -> bool:
+        """Checks if there is an up-to-date cache for `paths`."""
+        return os.path.exists(
+            os.path.join(self._fingerprint_dir(paths), self.IndexFilename)
+        )
+
+    def build(
+        self,
+        paths: Sequence[str],
+        read_function: Callable = read_image,
+        workers: int = None,
+    ):
+        """Decodes all the images on `paths` and stores them on the cache.
+
+        Args:
+            paths: Paths of the image files.
+            read_function: Function used to decode each file. Must be pickable if
+                `workers` is greater than 1.
+            workers: Number of processes used for decoding the images.
+        """
+        paths = [str(path) for path in paths]
+        final_dir = self._fingerprint_dir(paths)
+
+        os.makedirs(self.cache_dir, exist_ok=True)
+        build_dir = tempfile.mkdtemp(dir=self.cache_dir, prefix=".building-")
+
+        try:
+            self._write(build_dir, paths, read_function, workers)
+
+            try:
+                os.rename(build_dir, final_dir)
+
+            except OSError:
+                # Another process built the same cache first
+                if not os.path.exists(os.path.join(final_dir, self.IndexFilename)):
+                    raise
+
+        finally:
+            shutil.rmtree(build_dir, ignore_errors=True)
+
+        self._remove_outdated(final_dir)
+
+    def open(self, paths: Sequence[str]) -> Optional["PackedImages"]:
+        """Returns the cached images of `paths`, or None if the cache isn't built (or
+        is outdated)."""
+        fingerprint_dir = self._fingerprint_dir([str(path) for path in paths])
+        index_path = os.path.join(fingerprint_dir, self.IndexFilename)
+
+        if not os.path.exists(index_path):
+            return None
+
+        with np.load(index_path) as index_file:
+            index = {key: index_file[key] for key in index_file.files}
+
+        data_path = os.path.join(fingerprint_dir, self.DataFilename)
+        data = (
+            np.memmap(data_path, dtype=np.uint8, mode="r")
+            if os.path.getsize(data_path) > 0
+            else np.empty(0, dtype=np.uint8)
+        )
+
+        return PackedImages(data, index)
+
+    def _write(
+        self, build_dir: str, paths: list, read_function: Callable, workers: int
+    ):
+        offsets = np.zeros(len(paths) + 1, dtype=np.int64)
+        shapes = np.full((len(paths), 4), -1, dtype=np.int64)
+        dtypes = []
+
+        with open(os.path.join(build_dir, self.DataFilename), "wb") as data_file:
+            for row, image in enumerate(self._decode(paths, read_function, workers)):
+                image = np.ascontiguousarray(image)
+
+                data_file.write(image.tobytes())
+
+                offsets[row + 1] = offsets[row] + image.nbytes
+                shapes[row, : image.ndim] = image.shape
+                dtypes.append(image.dtype.str)
+
+        np.savez(
+            os.path.join(build_dir, self.IndexFilename),
+            paths=np.array(paths, dtype=str),
+            offsets=offsets,
+            shapes=shapes,
+            dtypes=np.array(dtypes, dtype=str),
+        )
+
+    def _decode(self, paths: list, read_function: Callable, workers: int):
+        if not workers or workers <= 1:
+            yield from (read_function(path) for path in paths)
+            return
+
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            chunksize = max(len(paths) // (workers * 4), 1)
+            yield from executor.map(read_function, paths, chunksize=chunksize)
+
+    def _remove_outdated(self, final_dir: str):
+        """Removes the caches of `cache_dir` other than `final_dir`. Processes that
+        still have an outdated cache open keep reading it until they close it."""
+        for entry in os.scandir(self.cache_dir):
+            if (
+                entry.is_dir()
+                and entry.path != final_dir
+                and _FingerprintRegex.fullmatch(entry.name)
+            ):
+                shutil.rmtree(entry.path, ignore_errors=True)
+
+    def _fingerprint_dir(self, paths: Sequence[str]) -> str:
+        return os.path.join(self.cache_dir, self.fingerprint(paths))
@@ -3,28 +3,60 @@
 from typing import Any, Callable, List
 
 import dependency_injector.providers as providers
+import numpy as np
 
 from .datatype import DataType, DataTypeContainer
 
 
+def format_numbers(data: "np.ndarray") -> "np.ndarray":
+    """Returns each number of `data` as a string (like `str`), converting the whole
+    array at once."""
+    return np.asarray(data).astype(str)
+
+
 class Numeric(DataType):
     """
     The Numeric class just represents a single interger.
     """
 
     def __init__(self):
+        super().__init__()
+
         self.is_editable = True
 
         self.transformations: List[Callable] = []
 
-    def process(self, data: int) -> int:
-        """Returns the number. It doesn't need any processing."""
-        return self._apply_transformations(data)
+    def process(self, data: int) -> "np.number":
+        """Returns the number as `output_dtype`. It doesn't need any processing."""
+        return self._apply_transformations(np.dtype(self.output_dtype).type(data))
+
+    def process_batch(
+        self, data: "np.ndarray", out: "np.ndarray" = None
+    ) -> "np.ndarray":
+        """Returns the numbers as an array of `output_dtype`."""
+        data = np.asarray(data)
+
+        if self._can_write_directly(out, data.size):
+            np.copyto(out.reshape(data.shape), data, casting="unsafe")
+            return out
+
+        return self._write_to(
+            self._apply_transformations_batch(data.astype(self.output_dtype)), out
+        )
 
     def display(self, data: int) -> str:
         """Returns the interger as a string."""
         return str(data)
 
+    def display_batch(self, data: "np.ndarray") -> "np.ndarray":
+        """Returns the numbers as an array of strings."""
+        data = np.asarray(data)
+
+        if data.dtype == object:
+            return super().display_batch(data)
+
+        return format_numbers(data)
+
     def convert_to_expected_format(self, data: Any) -> int:
         """Transforms `data` to an interger.
 
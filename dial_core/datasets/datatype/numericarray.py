@@ -17,8 +17,26 @@ class NumericArray(DataType):
         self.transformations: List[Callable] = []
 
     def process(self, data: "np.ndarray") -> "np.ndarray":
-        """Returns the data as it is. Doesn't need any processing."""
-        return self._apply_transformations(data)
+        """Returns the data as `output_dtype`. Doesn't need any processing."""
+        return self._apply_transformations(np.asarray(data, dtype=self.output_dtype))
+
+    def process_batch(
+        self, data: "np.ndarray", out: "np.ndarray" = None
+    ) -> "np.ndarray":
+        """Returns the batch as `output_dtype`. Doesn't need any processing."""
+        if len(data) == 0 or data.dtype == object:
+            return super().process_batch(data, out)
+
+        if self._can_write_directly(out, data.size):
+            np.copyto(out.reshape(data.shape), data, casting="unsafe")
+            return out
+
+        return self._write_to(
+            self._apply_transformations_batch(
+                np.asarray(data, dtype=self.output_dtype)
+            ),
+            out,
+        )
 
     def display(self, data: "np.ndarray") -> str:
         """Returns `data` as a string representation."""
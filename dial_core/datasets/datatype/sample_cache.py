@@ -0,0 +1,117 @@
+# vim: ft=python fileencoding=utf-8 sts=4 sw=4 et:
+
+import threading
+from collections import OrderedDict
+from typing import Callable, Hashable, Optional
+
+import numpy as np
+
+
+class SampleCache:
+    """The SampleCache class keeps decoded samples (images loaded from a file, for
+    example) on memory, so they don't have to be loaded again on the next epoch.
+
+    The cache has a maximum size in bytes. When it's full, the least recently used
+    samples are evicted. Cached samples are returned as read-only arrays, because the
+    same array is shared by everyone reading that sample.
+
+    A single SampleCache can be safely shared between threads and DataTypes.
+
+    Attributes:
+        max_bytes: Maximum number of bytes used by the cached samples.
+        hits: Number of times a sample was found on the cache.
+        misses: Number of times a sample wasn't found on the cache.
+        evictions: Number of samples removed to make room for new ones.
+    """
+
+    def __init__(self, max_bytes: int = 1024 ** 3):
+        self.max_bytes = max_bytes
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        self._samples: "OrderedDict[Hashable, np.ndarray]" = OrderedDict()
+        self._nbytes = 0
+
+        self._lock = threading.Lock()
+
+    @property
+    def nbytes(self) -> int:
+        """Returns the number of bytes used by the cached samples."""
+        return self._nbytes
+
+    def get(self, key: Hashable) -> Optional["np.ndarray"]:
+        """Returns the sample stored with `key`, or None if it isn't cached."""
+        with self._lock:
+            sample = self._samples.get(key)
+
+            if sample is None:
+                self.misses += 1
+                return None
+
+            self._samples.move_to_end(key)
+            self.hits += 1
+
+            return sample
+
+    def put(self, key: Hashable, sample: "np.ndarray"):
+        """Stores `sample` with `key`, evicting the least recently used samples if
+        there isn't enough room for it. Samples bigger than `max_bytes` aren't
+        stored."""
+        sample = np.asarray(sample)
+
+        if sample.nbytes > self.max_bytes:
+            return
+
+        sample.flags.writeable = False
+
+        with self._lock:
+            if key in self._samples:
+                self._nbytes -= self._samples.pop(key).nbytes
+
+            while self._samples and self._nbytes + sample.nbytes > self.max_bytes:
+                _, evicted_sample = self._samples.popitem(last=False)
+                self._nbytes -= evicted_sample.nbytes
+                self.evictions += 1
+
+            self._samples[key] = sample
+            self._nbytes += sample.nbytes
+
+    def get_or_load(
+        self, key: Hashable, load_function: Callable[[], "np.ndarray"]
+    ) -> "np.ndarray":
+        """Returns the sample stored with `key`. If it isn't cached, it's loaded by
+        calling `load_function` and stored."""
+        sample = self.get(key)
+
+        if sample is None:
+            sample = load_function()
+            self.put(key, sample)
+
+        return sample
+
+    def clear(self):
+        """Removes all the samples from the cache. Counters aren't reset."""
+        with self._lock:
+            self._samples.clear()
+            self._nbytes = 0
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._samples
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+    def __getstate__(self):
+        # Cached samples aren't pickled (sent to worker processes, for example)
+        return {"max_bytes": self.max_bytes}
+
+    def __setstate__(self, state):
+        self.__init__(state["max_bytes"])
+
+    def __str__(self) -> str:
+        return (
+            f"SampleCache ({self._nbytes}/{self.max_bytes} bytes, hits={self.hits}, "
+            f"misses={self.misses}, evictions={self.evictions})"
+        )
@@ -0,0 +1,250 @@
+# vim: ft=python fileencoding=utf-8 sts=4 sw=4 et:
+
+"""Vectorized transformations for the `DataType.transformations` list.
+
+Each transformation works on whole batches at once (the first axis of the batch
+indexes the samples), so a DataType can apply them with a few NumPy operations instead
+of a Python loop over the samples. They're also callables that transform a single
+sample, so they can be mixed with plain functions on the same list.
+
+Transformations are described by their class name and their parameters (see
+`Transformation.to_dict`), so they can be saved on dataset descriptions and sent to
+worker processes, unlike plain functions. The available classes are registered on
+`TransformationContainer`.
+"""
+
+from abc import ABCMeta, abstractmethod
+from typing import Any, Dict, Sequence, Tuple, Union
+
+import dependency_injector.containers as containers
+import dependency_injector.providers as providers
+import numpy as np
+
+Number = Union[int, float]
+
+
+class Transformation(metaclass=ABCMeta):
+    """Abstract class for the vectorized transformations."""
+
+    @abstractmethod
+    def apply_batch(self, batch: "np.ndarray", in_place: bool = False) -> "np.ndarray":
+        """Returns the transformed `batch`.
+
+        Args:
+            batch: Array with one sample on each row.
+            in_place: If True, `batch` can be overwritten with the result (it isn't
+                used anymore by the caller).
+        """
+
+    def __call__(self, sample: Union[Number, "np.ndarray"]) -> "np.ndarray":
+        """Returns a single transformed sample."""
+        return self.apply_batch(np.asarray(sample)[np.newaxis])[0]
+
+    @abstractmethod
+    def parameters(self) -> Dict[str, Any]:
+        """Returns the arguments needed to create this same transformation again. They
+        must be JSON serializable."""
+
+    def to_dict(self) -> Dict[str, Any]:
+        return self.__getstate__()
+
+    @classmethod
+    def create(cls, dc: dict) -> "Transformation":
+        """Returns a new transformation from its `to_dict` representation.
+
+        Raises:
+            ValueError: If the transformation class isn't registered on
+                `TransformationContainer`.
+        """
+        parameters = dict(dc)
+        class_name = parameters.pop("class", None)
+
+        try:
+            factory = getattr(TransformationContainer, class_name)
+
+        except (AttributeError, TypeError):
+            raise ValueError(f"Unknown transformation {class_name!r}")
+
+        return factory(**parameters)
+
+    def __getstate__(self) -> Dict[str, Any]:
+        return {"class": type(self).__name__, **self.parameters()}
+
+    def __setstate__(self, new_state: Dict[str, Any]):
+        self.__init__(**{k: v for k, v in new_state.items() if k != "class"})
+
+    def __eq__(self, other: Any) -> bool:
+        return type(self) is type(other) and self.to_dict() == other.to_dict()
+
+    def __hash__(self) -> int:
+        return hash(type(self).__name__)
+
+    def __repr__(self) -> str:
+        parameters = ", ".join(f"{k}={v!r}" for k, v in self.parameters().items())
+
+        return f"{type(self).__name__}({parameters})"
+
+
+class AffineTransformation(Transformation):
+    """Transforms each value `x` to `x * multiplier + offset`.
+
+    `multiplier` and `offset` are broadcasted with the samples from the last axis, so a
+    sequence of values applies a different value to each channel. Consecutive affine
+    transformations are fused into a single one by the DataTypes.
+
+    Integer batches are converted to floating point values.
+
+    Attributes:
+        multiplier: Value (or values) each element is multiplied by.
+        offset: Value (or values) added to each element after the multiplication.
+    """
+
+    def __init__(
+        self,
+        multiplier: Union[Number, Sequence[Number]] = 1.0,
+        offset: Union[Number, Sequence[Number]] = 0.0,
+    ):
+        self.multiplier = np.asarray(multiplier, dtype=np.float64)
+        self.offset = np.asarray(offset, dtype=np.float64)
+
+    def then(self, other: "AffineTransformation") -> "AffineTransformation":
+        """Returns a single transformation equivalent to applying this transformation
+        and then `other`."""
+        return AffineTransformation(
+            self.multiplier * other.multiplier,
+            self.offset * other.multiplier + other.offset,
+        )
+
+    def apply_batch(self, batch: "np.ndarray", in_place: bool = False) -> "np.ndarray":
+        batch = np.asarray(batch)
+
+        dtype = (
+            batch.dtype
+            if batch.dtype.kind == "f"
+            else np.result_type(batch.dtype, np.float32)
+        )
+        out = batch if in_place and batch.dtype == dtype else None
+
+        if np.all(self.multiplier == 1):
+            result = batch.astype(dtype) if out is None else out
+        else:
+            result = np.multiply(
+                batch, self.multiplier, out=out, dtype=dtype, casting="same_kind"
+            )
+
+        if np.any(self.offset != 0):
+            np.add(result, self.offset, out=result, casting="same_kind")
+
+        return result
+
+    def parameters(self) -> Dict[str, Any]:
+        return {"multiplier": self.multiplier.tolist(), "offset": self.offset.tolist()}
+
+
+class Scale(AffineTransformation):
+    """Multiplies each value by `factor`, and then adds `offset`.
+
+    Examples:
+        Scale(1 / 255) moves pixel values from (0-255) to (0-1).
+    """
+
+    def __init__(self, factor: Number, offset: Number = 0.0):
+        super().__init__(factor, offset)
+
+    def parameters(self) -> Dict[str, Any]:
+        return {"factor": self.multiplier.tolist(), "offset": self.offset.tolist()}
+
+
+class Normalize(AffineTransformation):
+    """Subtracts `mean` from each value, and then divides it by `std`.
+
+    Both `mean` and `std` can be a sequence with a different value for each channel
+    (last axis of the samples).
+    """
+
+    def __init__(
+        self,
+        mean: Union[Number, Sequence[Number]] = 0.0,
+        std: Union[Number, Sequence[Number]] = 1.0,
+    ):
+        self.mean = np.asarray(mean, dtype=np.float64)
+        self.std = np.asarray(std, dtype=np.float64)
+
+        super().__init__(1 / self.std, -self.mean / self.std)
+
+    def parameters(self) -> Dict[str, Any]:
+        return {"mean": self.mean.tolist(), "std": self.std.tolist()}
+
+
+class ChannelScale(AffineTransformation):
+    """Multiplies each channel (last axis of the samples) by its own scale.
+
+    Examples:
+        ChannelScale([0.299, 0.587, 0.114]) weights the channels of RGB images.
+    """
+
+    def __init__(
+        self,
+        scales: Sequence[Number],
+        offsets: Union[Number, Sequence[Number]] = 0.0,
+    ):
+        super().__init__(scales, offsets)
+
+    def parameters(self) -> Dict[str, Any]:
+        return {"scales": self.multiplier.tolist(), "offsets": self.offset.tolist()}
+
+
+class Clip(Transformation):
+    """Limits the values to the range [`min_value`, `max_value`]. Any of the limits
+    can be None."""
+
+    def __init__(self, min_value: Number = None, max_value: Number = None):
+        self.min_value = min_value
+        self.max_value = max_value
+
+    def apply_batch(self, batch: "np.ndarray", in_place: bool = False) -> "np.ndarray":
+        if self.min_value is None and self.max_value is None:
+            return batch
+
+        return np.clip(
+            batch, self.min_value, self.max_value, out=batch if in_place else None
+        )
+
+    def parameters(self) -> Dict[str, Any]:
+        return {"min_value": self.min_value, "max_value": self.max_value}
+
+
+class Reshape(Transformation):
+    """Changes the shape of each sample. One of the dimensions can be -1."""
+
+    def __init__(self, shape: Sequence[int]):
+        self.shape: Tuple[int, ...] = tuple(shape)
+
+    def apply_batch(self, batch: "np.ndarray", in_place: bool = False) -> "np.ndarray":
+        return np.reshape(batch, (len(batch),) + self.shape)
+
+    def parameters(self) -> Dict[str, Any]:
+        return {"shape": list(self.shape)}
+
+
+class Cast(Transformation):
+    """Converts the values to `dtype`."""
+
+    def __init__(self, dtype: str):
+        self.dtype = np.dtype(dtype).name
+
+    def apply_batch(self, batch: "np.ndarray", in_place: bool = False) -> "np.ndarray":
+        return np.asarray(batch).astype(self.dtype, copy=False)
+
+    def parameters(self) -> Dict[str, Any]:
+        return {"dtype": self.dtype}
+
+
+TransformationContainer = containers.DynamicContainer()
+TransformationContainer.AffineTransformation = providers.Factory(AffineTransformation)
+TransformationContainer.Scale = providers.Factory(Scale)
+TransformationContainer.Normalize = providers.Factory(Normalize)
+TransformationContainer.ChannelScale = providers.Factory(ChannelScale)
+TransformationContainer.Clip = providers.Factory(Clip)
+TransformationContainer.Reshape = providers.Factory(Reshape)
+TransformationContainer.Cast = providers.Factory(Cast)
@@ -3,13 +3,19 @@
 import dependency_injector.containers as containers
 import dependency_injector.providers as providers
 
+from .chunked_array import ChunkedArray
 from .dataset_io import (
     CategoricalImgDatasetIO,
+    ChunkedDatasetIO,
     DatasetIO,
     DatasetIORegistry,
+    NpyDatasetIO,
     NpzDatasetIO,
+    ShardedRecordDatasetIO,
     TxtDatasetIO,
 )
+from .image_writer import ImageWriter
+from .record_shards import RecordArray
 from .ttv_sets_io import TTVSetsIO
 from .ttv_sets_loader import (
     BostonHousingLoader,
@@ -28,9 +34,15 @@ PredefinedTTVSetsContainer.BostonHousing = providers.Factory(BostonHousingLoader
 __all__ = [
     "DatasetIO",
     "NpzDatasetIO",
+    "NpyDatasetIO",
+    "ChunkedDatasetIO",
+    "ChunkedArray",
+    "ShardedRecordDatasetIO",
+    "RecordArray",
     "TxtDatasetIO",
     "CategoricalImgDatasetIO",
     "DatasetIORegistry",
+    "ImageWriter",
     "TTVSetsIO",
     "TTVSetsIO",
     "BostonHousingLoader",
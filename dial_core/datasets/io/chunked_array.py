@@ -0,0 +1,330 @@
+# vim: ft=python fileencoding=utf-8 sts=4 sw=4 et:
+
+"""Compressed arrays stored as independent chunks of rows, with random access.
+
+File layout:
+    magic | compressed chunk 0 | compressed chunk 1 | ... | header | header size
+
+The header (JSON) stores the dtype, the shape, the number of rows of each chunk, the
+compression and the offset table of the chunks, so any chunk can be read and
+decompressed without reading the rest of the file.
+"""
+
+import json
+import lzma
+import mmap
+import os
+import struct
+import zlib
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Deque, Dict, Iterable, List, Sequence, Union
+
+import numpy as np
+
+from dial_core.datasets.datatype import SampleCache
+
+Magic = b"DIALCHK1"
+
+Compressions = ("zlib", "lzma", "none")
+
+_Footer = struct.Struct("<Q")
+
+
+def _compress(data: bytes, compression: str, level: int) -> bytes:
+    if compression == "zlib":
+        return zlib.compress(data, level)
+
+    if compression == "lzma":
+        return lzma.compress(data, preset=level)
+
+    return data
+
+
+def _decompress(data: bytes, compression: str) -> bytes:
+    if compression == "zlib":
+        return zlib.decompress(data)
+
+    if compression == "lzma":
+        return lzma.decompress(data)
+
+    return data
+
+
+def write_chunked(
+    path: str,
+    array: "np.ndarray",
+    chunk_rows: int = 1024,
+    compression: str = "zlib",
+    level: int = 6,
+    workers: int = None,
+):
+    """Writes `array` on `path`, compressing each chunk of `chunk_rows` rows
+    separately. Chunks are compressed in parallel threads (zlib and lzma release the
+    GIL), and only a few of them are kept on memory at the same time.
+
+    The array is written on a temporary file which replaces `path` when it's
+    complete, so arrays already opened from `path` keep reading the previous file.
+
+    Raises:
+        ValueError: If `compression` isn't valid, or `array` has Python objects.
+    """
+    if compression not in Compressions:
+        raise ValueError(f"Invalid compression {compression!r} ({Compressions})")
+
+    if array.dtype.hasobject:
+        raise ValueError("Arrays of Python objects can't be stored on chunks")
+
+    chunk_rows = max(int(chunk_rows), 1)
+    workers = workers if workers else (os.cpu_count() or 1)
+
+    def compress_chunk(start: int) -> bytes:
+        chunk = np.ascontiguousarray(array[start : start + chunk_rows])
+
+        return _compress(chunk.tobytes(), compression, level)
+
+    offsets = [len(Magic)]
+    temp_path = f"{path}.{os.getpid()}.tmp"
+
+    with open(temp_path, "wb") as chunked_file, ThreadPoolExecutor(workers) as executor:
+        chunked_file.write(Magic)
+
+        pending: Deque["Future"] = deque()
+
+        def write_next():
+            compressed_chunk = pending.popleft().result()
+
+            chunked_file.write(compressed_chunk)
+            offsets.append(offsets[-1] + len(compressed_chunk))
+
+        for start in range(0, len(array), chunk_rows):
+            if len(pending) >= 2 * workers:
+                write_next()
+
+            pending.append(executor.submit(compress_chunk, start))
+
+        while pending:
+            write_next()
+
+        header = json.dumps(
+            {
+                "dtype": array.dtype.str,
+                "shape": list(array.shape),
+                "chunk_rows": chunk_rows,
+                "compression": compression,
+                "offsets": offsets,
+            }
+        ).encode("utf-8")
+
+        chunked_file.write(header)
+        chunked_file.write(_Footer.pack(len(header)))
+
+    os.replace(temp_path, path)
+
+
+class ChunkedArray:
+    """The ChunkedArray class is a read-only, array-like view of an array stored by
+    `write_chunked`.
+
+    Only the chunks holding the accessed rows are read and decompressed (in parallel,
+    if there are several). The last decompressed chunks are kept on a SampleCache, so
+    consecutive batches read from the same chunk don't decompress it again.
+
+    Indexing works like on a NumPy array. Rows returned from a single chunk are
+    read-only views of the cached chunk.
+
+    Attributes:
+        path: Path of the file.
+        cache: Cache of decompressed chunks.
+        workers: Maximum number of threads used to decompress chunks.
+    """
+
+    DefaultCacheBytes = 256 * 1024 ** 2
+
+    def __init__(
+        self, path: str, cache_bytes: int = DefaultCacheBytes, workers: int = None
+    ):
+        """Opens the array stored on `path`.
+
+        Raises:
+            ValueError: If the file isn't a chunked array.
+        """
+        self.path = path
+        self.cache = SampleCache(max_bytes=cache_bytes)
+        self.workers = workers if workers else min(os.cpu_count() or 1, 8)
+
+        self._executor = None
+
+        # The file is mapped now, so the array keeps reading the same file (matching
+        # its offsets) even if it's replaced by a new one
+        with open(path, "rb") as chunked_file:
+            self._buffer = mmap.mmap(chunked_file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        if self._buffer[: len(Magic)] != Magic:
+            raise ValueError(f"{path} isn't a chunked array file")
+
+        (header_size,) = _Footer.unpack_from(
+            self._buffer, len(self._buffer) - _Footer.size
+        )
+        header_start = len(self._buffer) - _Footer.size - header_size
+        header = json.loads(
+            self._buffer[header_start : header_start + header_size].decode("utf-8")
+        )
+
+        self.dtype = np.dtype(header["dtype"])
+        self.shape = tuple(header["shape"])
+        self.chunk_rows: int = header["chunk_rows"]
+        self.compression: str = header["compression"]
+
+        self._offsets: List[int] = header["offsets"]
+
+    @property
+    def ndim(self) -> int:
+        return len(self.shape)
+
+    @property
+    def chunk_count(self) -> int:
+        return len(self._offsets) - 1
+
+    @property
+    def compressed_nbytes(self) -> int:
+        """Returns the size of the compressed chunks."""
+        return self._offsets[-1] - self._offsets[0]
+
+    def chunk(self, index: int) -> "np.ndarray":
+        """Returns the (read-only) rows of the chunk number `index`."""
+        return self._chunks([index])[index]
+
+    def tolist(self) -> list:
+        return self[:].tolist()
+
+    def _chunks(self, indices: Iterable[int]) -> Dict[int, "np.ndarray"]:
+        """Returns the chunks `indices`, decompressing the ones that aren't cached."""
+        chunks = {index: self.cache.get((self.path, index)) for index in indices}
+        missing = [index for index, chunk in chunks.items() if chunk is None]
+
+        if len(missing) == 1:
+            chunks[missing[0]] = self._load_chunk(missing[0])
+
+        elif missing:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(self.workers)
+
+            chunks.update(zip(missing, self._executor.map(self._load_chunk, missing)))
+
+        return chunks
+
+    def _load_chunk(self, index: int) -> "np.ndarray":
+        start, end = self._offsets[index], self._offsets[index + 1]
+
+        data = _decompress(self._buffer[start:end], self.compression)
+
+        chunk = np.frombuffer(data, dtype=self.dtype).reshape((-1,) + self.shape[1:])
+
+        self.cache.put((self.path, index), chunk)
+
+        return chunk
+
+    def _take(self, rows: "np.ndarray") -> "np.ndarray":
+        chunk_indices = rows // self.chunk_rows
+        unique_indices = np.unique(chunk_indices)
+
+        chunks = self._chunks(unique_indices.tolist())
+
+        if len(unique_indices) == 1:
+            return chunks[int(unique_indices[0])][rows % self.chunk_rows]
+
+        taken = np.empty((len(rows),) + self.shape[1:], dtype=self.dtype)
+
+        for index in unique_indices.tolist():
+            selected = chunk_indices == index
+            taken[selected] = chunks[index][rows[selected] % self.chunk_rows]
+
+        return taken
+
+    def _slice(self, start: int, stop: int) -> "np.ndarray":
+        if stop <= start:
+            return np.empty((0,) + self.shape[1:], dtype=self.dtype)
+
+        first, last = start // self.chunk_rows, (stop - 1) // self.chunk_rows
+        chunks = self._chunks(range(first, last + 1))
+
+        parts = [
+            chunks[index][
+                max(start - index * self.chunk_rows, 0) : stop - index * self.chunk_rows
+            ]
+            for index in range(first, last + 1)
+        ]
+
+        return parts[0] if len(parts) == 1 else np.concatenate(parts)
+
+    def __getitem__(
+        self, key: Union[int, slice, Sequence[int], "np.ndarray", tuple]
+    ) -> "np.ndarray":
+        if isinstance(key, tuple):
+            return self[key[0]][(slice(None),) + key[1:]]
+
+        if isinstance(key, (int, np.integer)):
+            if not -len(self) <= key < len(self):
+                raise IndexError(f"Index {key} out of bounds for {len(self)} rows")
+
+            row = int(key) % len(self)
+
+            return self.chunk(row // self.chunk_rows)[row % self.chunk_rows]
+
+        if isinstance(key, slice):
+            start, stop, step = key.indices(len(self))
+
+            if step == 1:
+                return self._slice(start, stop)
+
+            return self._take(np.arange(start, stop, step))
+
+        key = np.asarray(key)
+
+        if key.dtype == bool:
+            if key.shape != (len(self),):
+                raise IndexError(f"Boolean index of shape {key.shape} for {self.shape}")
+
+            return self._take(np.flatnonzero(key))
+
+        rows = key.astype(np.int64, copy=False).reshape(-1)
+
+        if len(rows) and (rows.min() < -len(self) or rows.max() >= len(self)):
+            raise IndexError(f"Index out of bounds for an array of {len(self)} rows")
+
+        rows = np.where(rows < 0, rows + len(self), rows)
+
+        if len(rows) == 0:
+            return np.empty((0,) + self.shape[1:], dtype=self.dtype)
+
+        return self._take(rows).reshape(key.shape + self.shape[1:])
+
+    def __array__(self, dtype=None, copy=None) -> "np.ndarray":
+        array = self[:]
+
+        return array if dtype is None else array.astype(dtype)
+
+    def __iter__(self):
+        for index in range(self.chunk_count):
+            yield from self.chunk(index)
+
+    def __len__(self) -> int:
+        return self.shape[0] if self.shape else 0
+
+    def __getstate__(self) -> dict:
+        # Decompressed chunks (and threads) aren't pickled
+        return {
+            "path": self.path,
+            "cache_bytes": self.cache.max_bytes,
+            "workers": self.workers,
+        }
+
+    def __setstate__(self, state: dict):
+        self.__init__(state["path"], state["cache_bytes"], state["workers"])
+
+    def __repr__(self) -> str:
+        return (
+            f"ChunkedArray({self.path!r}, shape={self.shape}, dtype={self.dtype}, "
+            f"{self.chunk_count} {self.compression} chunks)"
+        )
@@ -3,34 +3,49 @@
 import json
 import os
 import re
+from concurrent.futures import ThreadPoolExecutor
 from enum import Enum
-from typing import Any, Optional
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
 import dependency_injector.containers as containers
 import dependency_injector.providers as providers
 import numpy as np
-from PIL import Image
 
 from dial_core.datasets import Dataset
 from dial_core.datasets.datatype import Categorical, DataType
 from dial_core.utils import log
 
+from .chunked_array import ChunkedArray, write_chunked
+from .folder_manifest import FolderManifest
+from .image_writer import ImageWriter
+from .record_shards import RecordArray, write_records
+from .text_array import read_text, write_text
+
 LOGGER = log.get_logger(__name__)
 
 
 class DatasetIO:
     """The TTVSetsIOFormat provides an interface for defining different formats in which
-    a dataset could be stored on the file system."""
+    a dataset could be stored on the file system.
+
+    The datatypes described on the dataset description are only built once, and the
+    same instances are returned until their description changes (through
+    `set_description`, `set_x_type`/`set_y_type`, or by loading a new description
+    file). Each loaded dataset gets its own datatypes instead, built once per load, so
+    modifying them doesn't affect other datasets or the following loads.
+    """
 
     Label = "DatasetIO"
 
     def __init__(self):
+        self._datatypes: Dict[str, Optional["DataType"]] = {}
+
         self._dataset_description = {"x_type": {}, "y_type": {}}
 
         self._overrriden = {}
 
     def get_x_type(self) -> "DataType":
-        return DataType.create(self._dataset_description["x_type"])
+        return self._get_datatype("x_type")
 
     def set_x_type(self, x_type: "DataType") -> "DatasetIO":
         self._set_attribute("x_type", x_type.to_dict())
@@ -38,7 +53,7 @@ class DatasetIO:
         return self
 
     def get_y_type(self) -> "DataType":
-        return DataType.create(self._dataset_description["y_type"])
+        return self._get_datatype("y_type")
 
     def set_y_type(self, y_type: "DataType") -> "DatasetIO":
         self._set_attribute("y_type", y_type.to_dict())
@@ -50,6 +65,7 @@ class DatasetIO:
 
     def set_description(self, dataset_description: dict) -> "DatasetIO":
         self._dataset_description = dataset_description
+        self._datatypes.clear()
 
         return self
 
@@ -91,8 +107,8 @@ class DatasetIO:
         Returns:
             The loaded dataset.
         """
-        x_type = self.get_x_type()
-        y_type = self.get_y_type()
+        x_type = self._load_datatype("x_type")
+        y_type = self._load_datatype("y_type")
 
         # Dataset data (x, y) must be filled by subclasses overriding this method
         return Dataset(x_type=x_type, y_type=y_type)
@@ -112,14 +128,33 @@ class DatasetIO:
             self._dataset_description.update(self._overrriden)
             self._overrriden = {}
 
+        self._datatypes.clear()
+
         parent_dir = os.path.dirname(description_file_path)
 
         return self.load(parent_dir)
 
+    def _get_datatype(self, attribute: str) -> Optional["DataType"]:
+        """Returns the datatype described by `attribute`, building it only if the
+        description changed since the last call."""
+        if attribute not in self._datatypes:
+            self._datatypes[attribute] = DataType.create(
+                self._dataset_description[attribute]
+            )
+
+        return self._datatypes[attribute]
+
+    def _load_datatype(self, attribute: str) -> Optional["DataType"]:
+        """Returns a new datatype described by `attribute`, owned by a loaded
+        dataset."""
+        return DataType.create(self._dataset_description[attribute])
+
     def _set_attribute(self, attribute: str, value: Any):
         self._dataset_description[attribute] = value
         self._overrriden[attribute] = value
 
+        self._datatypes.pop(attribute, None)
+
     def __str__(self) -> str:
         return self.Label
 
@@ -153,13 +188,20 @@ class NpzDatasetIO(DatasetIO):
             name: Name of the output file/folder.
             dataset_desc: dataset_description dictionary (Data types, relative path...)
             dataset: Dataset to save.
+
+        Raises:
+            ValueError: If any of the arrays holds Python objects that aren't strings.
         """
         super().save(parent_dir, dataset)
 
-        np.savez(
-            os.path.join(parent_dir, self.get_filename()), x=dataset.x, y=dataset.y,
+        # Columns of objects (like a PathTable of image paths) can't be loaded back
+        x, y = (
+            _as_storable_array(column, data) if data.dtype == object else data
+            for column, data in (("x", dataset.x), ("y", dataset.y))
         )
 
+        np.savez(os.path.join(parent_dir, self.get_filename()), x=x, y=y)
+
         return self._dataset_description
 
     def load(self, parent_dir: str) -> Optional["Dataset"]:
@@ -182,16 +224,393 @@ class NpzDatasetIO(DatasetIO):
         return dataset
 
 
+class NpyDatasetIO(DatasetIO):
+    """The NpyDatasetIO class stores the `x` and `y` arrays of a dataset on two
+    uncompressed .npy files, which are memory-mapped when loaded.
+
+    Loading a dataset doesn't read its data: pages are read from disk only when the
+    rows are accessed, and are shared (through the page cache) by every process that
+    maps the same file. Datasets loaded this way are sent to worker processes as the
+    location of their files, not as a copy of their data (see `ColumnStore`).
+
+    The shape and dtype of each array are stored on the dataset description, and
+    checked when the files are loaded.
+
+    Attributes:
+        mmap_mode: Mode used to map the files (see `np.load`). On the default mode
+            ("r") the arrays are read-only, and they're copied to memory the first
+            time the dataset rows are modified.
+    """
+
+    Label = "Npy Format (Memory-Mapped)"
+
+    def __init__(self):
+        super().__init__()
+
+        self.mmap_mode = "r"
+
+        self.set_x_filename("x.npy")
+        self.set_y_filename("y.npy")
+
+    def get_x_filename(self) -> str:
+        return self._dataset_description["x_filename"]
+
+    def set_x_filename(self, x_filename: str) -> "NpyDatasetIO":
+        self._set_attribute("x_filename", x_filename)
+
+        return self
+
+    def get_y_filename(self) -> str:
+        return self._dataset_description["y_filename"]
+
+    def set_y_filename(self, y_filename: str) -> "NpyDatasetIO":
+        self._set_attribute("y_filename", y_filename)
+
+        return self
+
+    def save(
+        self, parent_dir: str, dataset: "Dataset",
+    ):
+        """Writes the `x` and `y` arrays of the dataset on `parent_dir`.
+
+        Raises:
+            ValueError: If any of the arrays holds Python objects that aren't strings,
+                as they can't be memory-mapped.
+        """
+        super().save(parent_dir, dataset)
+
+        for column, data in (("x", dataset.x), ("y", dataset.y)):
+            array = _as_storable_array(column, data)
+
+            self._set_attribute(f"{column}_shape", list(array.shape))
+            self._set_attribute(f"{column}_dtype", array.dtype.str)
+
+            # Written on a new file, so any array still mapping the old one (the
+            # dataset being saved, for example) remains valid
+            filepath = os.path.join(
+                parent_dir, self._dataset_description[f"{column}_filename"]
+            )
+            temp_filepath = f"{filepath}.{os.getpid()}.tmp"
+
+            with open(temp_filepath, "wb") as npy_file:
+                np.save(npy_file, array, allow_pickle=False)
+
+            os.replace(temp_filepath, filepath)
+
+        return self._dataset_description
+
+    def load(self, parent_dir: str) -> "Dataset":
+        """Maps the `x` and `y` files of the dataset. No data is read.
+
+        Raises:
+            ValueError: If an array doesn't have the shape or dtype written on the
+                dataset description.
+        """
+        dataset = super().load(parent_dir)
+
+        dataset.x = self._map_column("x", parent_dir)
+        dataset.y = self._map_column("y", parent_dir)
+
+        return dataset
+
+    def _map_column(self, column: str, parent_dir: str) -> "np.ndarray":
+        filepath = os.path.join(
+            parent_dir, self._dataset_description[f"{column}_filename"]
+        )
+
+        array = np.load(filepath, mmap_mode=self.mmap_mode, allow_pickle=False)
+
+        _check_array(
+            filepath,
+            array,
+            self._dataset_description.get(f"{column}_shape"),
+            self._dataset_description.get(f"{column}_dtype"),
+        )
+
+        return array
+
+
+class ChunkedDatasetIO(DatasetIO):
+    """The ChunkedDatasetIO class stores the `x` and `y` arrays of a dataset
+    compressed, on chunks of rows that can be read independently (see
+    `chunked_array.write_chunked`).
+
+    Loaded arrays are ChunkedArray objects: only the chunks of the accessed rows are
+    decompressed, and the last decompressed chunks are cached, so reading consecutive
+    batches only decompresses each chunk once.
+
+    The compression ("zlib", "lzma" or "none"), its level, the number of rows of each
+    chunk, and the shape and dtype of each array are stored on the dataset
+    description.
+
+    Attributes:
+        workers: Number of threads used to compress and decompress chunks.
+        cache_bytes: Maximum size of the decompressed chunks cached by each array.
+    """
+
+    Label = "Chunked Compressed Format"
+
+    def __init__(self):
+        super().__init__()
+
+        self.workers: Optional[int] = None
+        self.cache_bytes = ChunkedArray.DefaultCacheBytes
+
+        self.set_x_filename("x.chunks")
+        self.set_y_filename("y.chunks")
+        self.set_compression("zlib")
+        self.set_compression_level(6)
+        self.set_chunk_rows(1024)
+
+    def get_x_filename(self) -> str:
+        return self._dataset_description["x_filename"]
+
+    def set_x_filename(self, x_filename: str) -> "ChunkedDatasetIO":
+        self._set_attribute("x_filename", x_filename)
+
+        return self
+
+    def get_y_filename(self) -> str:
+        return self._dataset_description["y_filename"]
+
+    def set_y_filename(self, y_filename: str) -> "ChunkedDatasetIO":
+        self._set_attribute("y_filename", y_filename)
+
+        return self
+
+    def get_compression(self) -> str:
+        return self._dataset_description["compression"]
+
+    def set_compression(self, compression: str) -> "ChunkedDatasetIO":
+        """Sets the compression of the chunks: "zlib", "lzma" (smaller files, but
+        slower to decompress) or "none"."""
+        self._set_attribute("compression", compression)
+
+        return self
+
+    def get_compression_level(self) -> int:
+        return self._dataset_description["compression_level"]
+
+    def set_compression_level(self, compression_level: int) -> "ChunkedDatasetIO":
+        self._set_attribute("compression_level", compression_level)
+
+        return self
+
+    def get_chunk_rows(self) -> int:
+        return self._dataset_description["chunk_rows"]
+
+    def set_chunk_rows(self, chunk_rows: int) -> "ChunkedDatasetIO":
+        """Sets the number of rows of each chunk. Bigger chunks compress better, but
+        more data must be decompressed to read a single row."""
+        self._set_attribute("chunk_rows", chunk_rows)
+
+        return self
+
+    def save(
+        self, parent_dir: str, dataset: "Dataset",
+    ):
+        """Writes the `x` and `y` arrays of the dataset on `parent_dir`.
+
+        Raises:
+            ValueError: If any of the arrays holds Python objects that aren't strings,
+                or the compression isn't valid.
+        """
+        super().save(parent_dir, dataset)
+
+        for column, data in (("x", dataset.x), ("y", dataset.y)):
+            array = _as_storable_array(column, data)
+
+            self._set_attribute(f"{column}_shape", list(array.shape))
+            self._set_attribute(f"{column}_dtype", array.dtype.str)
+
+            write_chunked(
+                os.path.join(
+                    parent_dir, self._dataset_description[f"{column}_filename"]
+                ),
+                array,
+                chunk_rows=self.get_chunk_rows(),
+                compression=self.get_compression(),
+                level=self.get_compression_level(),
+                workers=self.workers,
+            )
+
+        return self._dataset_description
+
+    def load(self, parent_dir: str) -> "Dataset":
+        """Opens the `x` and `y` files of the dataset. Only their offset tables are
+        read.
+
+        Raises:
+            ValueError: If an array doesn't have the shape or dtype written on the
+                dataset description.
+        """
+        dataset = super().load(parent_dir)
+
+        for column in ("x", "y"):
+            filepath = os.path.join(
+                parent_dir, self._dataset_description[f"{column}_filename"]
+            )
+
+            array = ChunkedArray(filepath, self.cache_bytes, self.workers)
+
+            _check_array(
+                filepath,
+                array,
+                self._dataset_description.get(f"{column}_shape"),
+                self._dataset_description.get(f"{column}_dtype"),
+            )
+
+            setattr(dataset, column, array)
+
+        return dataset
+
+
+class ShardedRecordDatasetIO(DatasetIO):
+    """The ShardedRecordDatasetIO class stores each sample of the `x` and `y` arrays
+    of a dataset as a record, on a few shard files per array (see
+    `record_shards.write_records`).
+
+    Samples can have any shape and dtype, so datasets of images of mixed
+    resolutions (or of encoded files) are stored on a few big files instead of one
+    file per image. Each shard is written by its own worker process.
+
+    Loaded arrays are RecordArray objects: any row is read from the memory-mapped
+    shards with a single lookup on the index of the records, and iterating them
+    reads the shards sequentially.
+
+    The number of shards, the prefix of the shard files of each array, and the shape
+    and dtype of each array are stored on the dataset description.
+
+    Attributes:
+        workers: Number of processes used to write the shards. Chosen from the number
+            of cores by default.
+    """
+
+    Label = "Sharded Records Format"
+
+    def __init__(self):
+        super().__init__()
+
+        self.workers: Optional[int] = None
+
+        self.set_x_prefix("x")
+        self.set_y_prefix("y")
+        self.set_shards(8)
+
+    def get_x_prefix(self) -> str:
+        return self._dataset_description["x_prefix"]
+
+    def set_x_prefix(self, x_prefix: str) -> "ShardedRecordDatasetIO":
+        self._set_attribute("x_prefix", x_prefix)
+
+        return self
+
+    def get_y_prefix(self) -> str:
+        return self._dataset_description["y_prefix"]
+
+    def set_y_prefix(self, y_prefix: str) -> "ShardedRecordDatasetIO":
+        self._set_attribute("y_prefix", y_prefix)
+
+        return self
+
+    def get_shards(self) -> int:
+        return self._dataset_description["shards"]
+
+    def set_shards(self, shards: int) -> "ShardedRecordDatasetIO":
+        """Sets the number of shard files of each array. Shards are written in
+        parallel, so there should be at least as many shards as workers."""
+        self._set_attribute("shards", shards)
+
+        return self
+
+    def save(
+        self, parent_dir: str, dataset: "Dataset",
+    ):
+        """Writes the samples of the `x` and `y` arrays of the dataset on
+        `parent_dir`.
+
+        Raises:
+            ValueError: If any sample holds Python objects that aren't arrays, bytes
+                or strings.
+        """
+        super().save(parent_dir, dataset)
+
+        for column, data in (("x", dataset.x), ("y", dataset.y)):
+            try:
+                data = _as_storable_array(column, data)
+
+            except ValueError:
+                # Samples of different shapes, stored as they are
+                data = _as_object_array(data)
+
+            self._set_attribute(f"{column}_shape", list(data.shape))
+            self._set_attribute(f"{column}_dtype", data.dtype.str)
+
+            write_records(
+                parent_dir,
+                self._dataset_description[f"{column}_prefix"],
+                data,
+                shards=self.get_shards(),
+                workers=self.workers,
+            )
+
+        return self._dataset_description
+
+    def load(self, parent_dir: str) -> "Dataset":
+        """Opens the records of the `x` and `y` arrays of the dataset. Only their
+        indices are read.
+
+        Raises:
+            ValueError: If an array doesn't have the shape or dtype written on the
+                dataset description.
+        """
+        dataset = super().load(parent_dir)
+
+        for column in ("x", "y"):
+            array = RecordArray(
+                parent_dir, self._dataset_description[f"{column}_prefix"]
+            )
+
+            _check_array(
+                os.path.join(parent_dir, array.prefix),
+                array,
+                self._dataset_description.get(f"{column}_shape"),
+                self._dataset_description.get(f"{column}_dtype"),
+            )
+
+            setattr(dataset, column, array)
+
+        return dataset
+
+
 class TxtDatasetIO(DatasetIO):
-    """The TxtFormat class stores datasets on plain readable .txt files."""
+    """The TxtFormat class stores datasets on plain readable .txt files.
+
+    Each row of the arrays is written on a line (samples with more than one dimension
+    are flattened). The shape and dtype of each array are stored on the dataset
+    description, so arrays of any number of dimensions are loaded back as they were.
+    Files without them on the description (written by other tools, for example) are
+    loaded as float arrays of (lines, values per line).
+
+    Big files are parsed and written on a pool of processes (see `text_array`).
+
+    Attributes:
+        workers: Number of processes used for parsing and formatting big files.
+            Chosen from the number of cores by default.
+        chunk_rows: Number of rows formatted at once when writing the files.
+    """
 
     Label = "Txt Format"
 
     def __init__(self):
         super().__init__()
 
+        self.workers: Optional[int] = None
+        self.chunk_rows = 65536
+
         self.set_x_filename("x_output.txt")
         self.set_y_filename("y_output.txt")
+        self.set_delimiter(" ")
 
     def get_x_filename(self) -> "TxtDatasetIO":
         return self._dataset_description["x_filename"]
@@ -209,6 +628,16 @@ class TxtDatasetIO(DatasetIO):
 
         return self
 
+    def get_delimiter(self) -> str:
+        return self._dataset_description.get("delimiter", " ")
+
+    def set_delimiter(self, delimiter: str) -> "TxtDatasetIO":
+        """Sets the separator of the values of each line ("," for CSV files, for
+        example). Spaces and tabs are always accepted when loading."""
+        self._set_attribute("delimiter", delimiter)
+
+        return self
+
     def save(
         self, parent_dir: str, dataset: "Dataset",
     ):
@@ -219,28 +648,79 @@ class TxtDatasetIO(DatasetIO):
             name: Name of the output file/folder.
             dataset_desc: dataset_description dictionary (Data types, relative path...)
             dataset: Dataset to save.
+
+        Raises:
+            ValueError: If any of the arrays isn't numeric.
         """
         super().save(parent_dir, dataset)
 
-        np.savetxt(os.path.join(parent_dir, self.get_x_filename()), dataset.x)
-        np.savetxt(os.path.join(parent_dir, self.get_y_filename()), dataset.y)
+        for column, data in (("x", dataset.x), ("y", dataset.y)):
+            self._set_attribute(f"{column}_shape", list(data.shape))
+            self._set_attribute(f"{column}_dtype", np.dtype(data.dtype).str)
+
+            write_text(
+                os.path.join(
+                    parent_dir, self._dataset_description[f"{column}_filename"]
+                ),
+                data,
+                delimiter=self.get_delimiter(),
+                chunk_rows=self.chunk_rows,
+                workers=self.workers,
+            )
 
         return self._dataset_description
 
     def load(self, parent_dir: str) -> "Dataset":
-        """"""
+        """Loads the dataset files on `parent_dir`.
+
+        Raises:
+            ValueError: If a file can't be parsed, or its values don't fit on the shape
+                written on the dataset description.
+        """
         dataset = super().load(parent_dir)
 
-        dataset.x = np.loadtxt(os.path.join(parent_dir, self.get_x_filename()))
-        dataset.y = np.loadtxt(os.path.join(parent_dir, self.get_y_filename()))
+        for column in ("x", "y"):
+            array = read_text(
+                os.path.join(
+                    parent_dir, self._dataset_description[f"{column}_filename"]
+                ),
+                shape=self._dataset_description.get(f"{column}_shape"),
+                dtype=self._dataset_description.get(f"{column}_dtype", np.float64),
+                delimiter=self.get_delimiter(),
+                workers=self.workers,
+            )
+
+            setattr(dataset, column, array)
 
         return dataset
 
 
 class CategoricalImgDatasetIO(DatasetIO):
+    """The CategoricalImgDatasetIO class stores datasets of categorized images as image
+    files, with the category of each image on its folder or its filename.
+
+    Images are encoded and written on a pool of worker processes (see `ImageWriter`).
+    The file format ("png", "jpeg" or "npy") and its compression options are stored on
+    the dataset description.
+
+    Datasets are loaded without opening any image (see `load`).
+
+    Attributes:
+        workers: Number of processes used for writing the images, and of threads used
+            for scanning the category folders. Chosen from the number of cores by
+            default.
+        progress_callback: If set, it's called as `progress_callback(written, total)`
+            while the images are written.
+        use_manifest: If True (the default), the files found when loading a dataset
+            are recorded on a manifest, so following loads only scan the modified
+            directories.
+    """
 
     Label = "Categorical Images Format"
 
+    # Directory of the manifests stored inside the dataset directory
+    ManifestDirname = ".manifest"
+
     class Organization(Enum):
         CategoryOnFolders = 0
         CategoryOnFilename = 1
@@ -248,8 +728,17 @@ class CategoricalImgDatasetIO(DatasetIO):
     def __init__(self):
         super().__init__()
 
+        self.workers: Optional[int] = None
+        self.progress_callback: Optional[Callable[[int, int], None]] = None
+        self.use_manifest = True
+
+        self._description_file_path: Optional[str] = None
+
         self.set_organization(self.Organization.CategoryOnFolders)
         self.set_filename_category_regex(r"")
+        self.set_image_format("png")
+        self.set_png_compress_level(6)
+        self.set_jpeg_quality(90)
 
     def get_organization(self) -> "Organization":
         return self.Organization[self._dataset_description["organization"]]
@@ -267,114 +756,374 @@ class CategoricalImgDatasetIO(DatasetIO):
 
         return self
 
+    def get_image_format(self) -> str:
+        return self._dataset_description.get("image_format", "png")
+
+    def set_image_format(self, image_format: str):
+        """Sets the format of the saved images: "png", "jpeg" or "npy" (raw arrays,
+        the fastest to write and read)."""
+        self._set_attribute("image_format", image_format)
+
+        return self
+
+    def get_png_compress_level(self) -> int:
+        return self._dataset_description.get("png_compress_level", 6)
+
+    def set_png_compress_level(self, png_compress_level: int):
+        """Sets the zlib compression level (0-9) of PNG images. Level 1 is several
+        times faster to encode than the default level (6)."""
+        self._set_attribute("png_compress_level", png_compress_level)
+
+        return self
+
+    def get_jpeg_quality(self) -> int:
+        return self._dataset_description.get("jpeg_quality", 90)
+
+    def set_jpeg_quality(self, jpeg_quality: int):
+        self._set_attribute("jpeg_quality", jpeg_quality)
+
+        return self
+
     def save(self, parent_dir: str, dataset: "Dataset"):
         super().save(parent_dir, dataset)
 
+        image_writer = ImageWriter(
+            image_format=self.get_image_format(),
+            png_compress_level=self.get_png_compress_level(),
+            jpeg_quality=self.get_jpeg_quality(),
+            workers=self.workers,
+        )
+
         num_zeros = len(str(len(dataset)))
+        filenames = [
+            f"{str(i).zfill(num_zeros)}{image_writer.extension}"
+            for i in range(dataset.row_count())
+        ]
 
         if self.get_organization() == self.Organization.CategoryOnFolders:
             # Create a folder for each category
             for category_idx in range(len(dataset.y_type.categories)):
                 os.makedirs(os.path.join(parent_dir, str(category_idx)), exist_ok=True)
 
-            for i, (x, y) in enumerate(zip(dataset.x, dataset.y)):
-                im = Image.fromarray(x)
-                im.save(
-                    os.path.join(parent_dir, str(y), f"{str(i).zfill(num_zeros)}.png",)
-                )
+            paths = [
+                os.path.join(parent_dir, str(y), filename)
+                for y, filename in zip(dataset.y.tolist(), filenames)
+            ]
 
         elif self.get_organization() == self.Organization.CategoryOnFilename:
-            for i, (x, y) in enumerate(zip(dataset.x, dataset.y)):
-                im = Image.fromarray(x)
-                im.save(
-                    os.path.join(
-                        parent_dir, f"{str(y)}__{str(i).zfill(num_zeros)}.png",
-                    )
-                )
+            paths = [
+                os.path.join(parent_dir, f"{str(y)}__{filename}")
+                for y, filename in zip(dataset.y.tolist(), filenames)
+            ]
 
         else:
             raise ValueError(f"Invalid organization value: {self.get_organization()}")
 
+        image_writer.write(paths, dataset.x, self.progress_callback)
+
         return self._dataset_description
 
     def load(self, dataset_dir: str) -> "Dataset":
-        category_extractor_regex = re.compile(self.get_filename_category_regex())
+        """Loads the paths of the images on `dataset_dir`, and their categories.
+
+        Only the directory entries are read (the category folders are scanned
+        concurrently), and no image is opened: the loaded `x` column is a PathTable of
+        absolute paths, and images are loaded by the `x_type` datatype when the
+        dataset rows are accessed. Files are loaded sorted by name.
 
+        The files found are recorded on a FolderManifest (see `manifest_path`). On
+        the following loads, only the directories modified since then are scanned
+        again.
+        """
         dataset = super().load(dataset_dir)
 
+        if not dataset_dir:
+            dataset.x = np.array([])
+            dataset.y = np.array([])
+
+            return dataset
+
+        dataset_dir = os.path.abspath(dataset_dir)
+        organization = self.get_organization()
+
+        manifest_path = self.manifest_path(dataset_dir)
+
+        if self.use_manifest:
+            try:
+                # Created before reading the modification time of the dataset
+                # directory, in case it's inside it
+                os.makedirs(os.path.dirname(manifest_path), exist_ok=True)
+
+            except OSError:
+                pass  # Read-only datasets are warned about when saving the manifest
+
+        manifest = FolderManifest.load(manifest_path) if self.use_manifest else None
+        root_mtime = FolderManifest.directory_mtime(dataset_dir)
+
+        if organization == self.Organization.CategoryOnFolders:
+            if manifest is not None and manifest.is_unchanged_root(root_mtime):
+                category_dirs = manifest.directories
+            else:
+                category_dirs = [
+                    directory
+                    for directory in _list_entries(dataset_dir, directories=True)
+                    if directory != self.ManifestDirname
+                ]
+
         # Get categories if not defined
         if self.get_y_type() is None or len(self.get_y_type().categories) == 0:
             categorical_datatype = Categorical()
 
-            if self.get_organization() == self.Organization.CategoryOnFolders:
-                categorical_datatype.categories = os.listdir(dataset_dir)
+            if organization == self.Organization.CategoryOnFolders:
+                categorical_datatype.categories = category_dirs
 
             self.set_y_type(categorical_datatype)
 
-        print("Categories", self.get_y_type().categories)
+        y_type = self._load_datatype("y_type")
+        dataset.y_type = y_type
 
-        # Load files
-        x = []
-        y = []
+        LOGGER.info("Categories %s", y_type.categories)
 
-        if not dataset_dir:
-            dataset.x = np.array(x)
-            dataset.y = np.array(y)
+        manifest_key = json.dumps(
+            {
+                "organization": organization.name,
+                "filename_category_regex": self.get_filename_category_regex(),
+                "categories": y_type.categories,
+            }
+        )
 
-            return dataset
+        if manifest is not None and manifest.key != manifest_key:
+            manifest = None
 
-        if self.get_organization() == self.Organization.CategoryOnFolders:
-            for category_dir in os.listdir(dataset_dir):
-                category_dir_full_path = os.path.join(dataset_dir, category_dir)
+        new_manifest = FolderManifest(manifest_key, root_mtime)
+
+        if organization == self.Organization.CategoryOnFolders:
+            scanned = self._scan_category_folders(
+                dataset_dir, category_dirs, y_type, manifest, new_manifest
+            )
 
-                if not os.path.isdir(category_dir_full_path):
-                    continue
+        elif organization == self.Organization.CategoryOnFilename:
+            scanned = manifest is None or not manifest.is_unchanged("", root_mtime)
 
-                category_data = self.get_y_type().convert_to_expected_format(
-                    category_dir
+            if scanned:
+                new_manifest.add_files(
+                    "", root_mtime, *self._scan_filenames(dataset_dir, y_type)
                 )
+            else:
+                new_manifest.add_from(manifest, "")
 
-                for image_filename in os.listdir(category_dir_full_path):
-                    image_full_path = os.path.join(
-                        category_dir_full_path, image_filename
-                    )
+        else:
+            raise ValueError(f"Invalid organization value: {organization}")
 
-                    x.append(dataset.x_type.convert_to_expected_format(image_full_path))
-                    y.append(category_data)
+        dataset.x = new_manifest.path_table(dataset_dir)
+        dataset.y = new_manifest.labels()
 
-        elif self.get_organization() == self.Organization.CategoryOnFilename:
-            for image_filename in os.listdir(os.path.join(dataset_dir)):
-                try:
-                    category_name = category_extractor_regex.match(
-                        image_filename
-                    ).group(1)
+        # Only write the manifest again if anything was scanned
+        if self.use_manifest and (
+            manifest is None or scanned or not manifest.is_unchanged_root(root_mtime)
+        ):
+            try:
+                new_manifest.save(manifest_path)
 
-                    category_data = self.get_y_type().convert_to_expected_format(
-                        category_name
-                    )
+            except OSError as err:
+                LOGGER.warning("Can't write the manifest %s: %s", manifest_path, err)
 
-                    image_full_path = os.path.join(dataset_dir, image_filename)
+        return dataset
 
-                    x.append(
-                        self.get_x_type().convert_to_expected_format(image_full_path)
-                    )
-                    y.append(category_data)
+    def load_from_file(self, description_file_path: str) -> Optional["Dataset"]:
+        """Loads the dataset from the file system. Its manifest is stored beside the
+        description file (see `manifest_path`)."""
+        self._description_file_path = description_file_path
+
+        try:
+            return super().load_from_file(description_file_path)
+
+        finally:
+            self._description_file_path = None
+
+    def manifest_path(self, dataset_dir: str) -> str:
+        """Returns the path of the FolderManifest of `dataset_dir`. It's stored beside
+        the description of the dataset.
+
+        On TTVSets the description file is beside the dataset directories, so the
+        manifest is stored there too, named after the directory. When loaded with
+        `load_from_file`, the description file is inside the dataset directory, so the
+        manifest is named after it, and stored on the `ManifestDirname` subdirectory:
+        this way, writing it doesn't modify the dataset directory (which would make
+        the next load list it again).
+        """
+        if self._description_file_path is not None:
+            description_dir, description_filename = os.path.split(
+                os.path.abspath(self._description_file_path)
+            )
+
+            return os.path.join(
+                description_dir,
+                self.ManifestDirname,
+                f"{os.path.splitext(description_filename)[0]}.manifest.npz",
+            )
+
+        dataset_dir = os.path.abspath(dataset_dir)
+
+        return os.path.join(
+            os.path.dirname(dataset_dir),
+            f"{os.path.basename(dataset_dir)}.manifest.npz",
+        )
 
-                except Exception as err:
-                    print(err)
+    def _scan_category_folders(
+        self,
+        dataset_dir: str,
+        category_dirs: List[str],
+        y_type: "Categorical",
+        manifest: Optional["FolderManifest"],
+        new_manifest: "FolderManifest",
+    ) -> int:
+        """Records the files of each category folder on `new_manifest`. Only the
+        folders modified since `manifest` was written are listed again.
 
-        else:
-            raise ValueError(f"Invalid organization value: {self.get_organization()}")
+        Returns:
+            The number of folders that were listed.
+        """
+        categories = [y_type.convert_to_expected_format(d) for d in category_dirs]
+        directories = [os.path.join(dataset_dir, d) for d in category_dirs]
+
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            mtimes = list(executor.map(FolderManifest.directory_mtime, directories))
+
+            modified = [
+                i
+                for i, (category_dir, mtime) in enumerate(zip(category_dirs, mtimes))
+                if manifest is None or not manifest.is_unchanged(category_dir, mtime)
+            ]
+
+            filenames = dict(
+                zip(
+                    modified,
+                    executor.map(_list_entries, [directories[i] for i in modified]),
+                )
+            )
+
+        for i, category_dir in enumerate(category_dirs):
+            if i in filenames:
+                new_manifest.add_files(
+                    category_dir,
+                    mtimes[i],
+                    filenames[i],
+                    np.full(len(filenames[i]), categories[i], dtype=np.int64),
+                )
+            else:
+                new_manifest.add_from(manifest, category_dir)
 
-        dataset.x = np.array(x)
-        dataset.y = np.array(y)
+        return len(modified)
+
+    def _scan_filenames(
+        self, dataset_dir: str, y_type: "Categorical"
+    ) -> Tuple[List[str], "np.ndarray"]:
+        """Returns the files of `dataset_dir` with a valid category on their name, and
+        their categories."""
+        category_extractor_regex = re.compile(self.get_filename_category_regex())
+
+        filenames = []
+        category_names = []
+
+        for filename in _list_entries(dataset_dir):
+            try:
+                category_names.append(category_extractor_regex.match(filename).group(1))
+                filenames.append(filename)
+
+            except (AttributeError, IndexError):
+                LOGGER.warning("Can't find the category of %s", filename)
+
+        # All the labels are converted at once. Files with an invalid category are
+        # skipped.
+        y = y_type.convert_column(np.array(category_names, dtype=str), invalid_value=-1)
+
+        for i in np.flatnonzero(y < 0):
+            LOGGER.warning(
+                "Invalid category %s for %s", category_names[i], filenames[i]
+            )
+
+        return (
+            [name for name, label in zip(filenames, y.tolist()) if label >= 0],
+            y[y >= 0],
+        )
+
+
+def _as_storable_array(column: str, data: Any) -> "np.ndarray":
+    """Returns the `column` array as an array without Python objects.
+
+    Raises:
+        ValueError: If the array holds Python objects that aren't strings.
+    """
+    array = np.asarray(data)
+
+    if array.dtype != object:
+        return array
+
+    # Columns of strings (like a PathTable of image paths) are stored with a fixed
+    # width
+    if all(isinstance(value, str) for value in array.flat):
+        return array.astype(str)
+
+    raise ValueError(f"The {column} array has Python objects, can't be stored")
 
-        return dataset
+
+def _as_object_array(data: Any) -> "np.ndarray":
+    """Returns an array of objects with a sample of `data` on each element (NumPy
+    can't build it directly from samples of different shapes)."""
+    if isinstance(data, np.ndarray) and data.dtype == object:
+        return data
+
+    array = np.empty(len(data), dtype=object)
+
+    for i, sample in enumerate(data):
+        array[i] = sample
+
+    return array
+
+
+def _check_array(
+    filepath: str, array: Any, shape: Optional[list], dtype: Optional[str]
+):
+    """Checks that the `array` loaded from `filepath` has the shape and dtype of the
+    dataset description (if they're described).
+
+    Raises:
+        ValueError: If the shape or the dtype doesn't match.
+    """
+    if (shape is not None and tuple(shape) != tuple(array.shape)) or (
+        dtype is not None and np.dtype(dtype) != array.dtype
+    ):
+        raise ValueError(
+            f"{filepath} stores an array of {array.dtype} {tuple(array.shape)}, but"
+            f" the description expects {dtype} {tuple(shape or ())}"
+        )
+
+
+def _list_entries(directory: str, directories: bool = False) -> List[str]:
+    """Returns the sorted names of the files (or the subdirectories, if
+    `directories` is True) on `directory`.
+
+    `os.scandir` gets the type of each entry while listing the directory, so no
+    `stat` call is done per file on most file systems.
+    """
+    with os.scandir(directory) as entries:
+        if directories:
+            return sorted(entry.name for entry in entries if entry.is_dir())
+
+        return sorted(entry.name for entry in entries if entry.is_file())
 
 
 DatasetIORegistry = containers.DynamicContainer()
 setattr(DatasetIORegistry, NpzDatasetIO.Label, providers.Factory(NpzDatasetIO))
 setattr(DatasetIORegistry, TxtDatasetIO.Label, providers.Factory(TxtDatasetIO))
+setattr(DatasetIORegistry, NpyDatasetIO.Label, providers.Factory(NpyDatasetIO))
+setattr(DatasetIORegistry, ChunkedDatasetIO.Label, providers.Factory(ChunkedDatasetIO))
+setattr(
+    DatasetIORegistry,
+    ShardedRecordDatasetIO.Label,
+    providers.Factory(ShardedRecordDatasetIO),
+)
 setattr(
     DatasetIORegistry,
     CategoricalImgDatasetIO.Label,
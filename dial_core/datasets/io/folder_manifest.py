@@ -0,0 +1,223 @@
+# vim: ft=python fileencoding=utf-8 sts=4 sw=4 et:
+
+import json
+import os
+import time
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+from dial_core.datasets.path_table import PathTable
+from dial_core.utils import log
+
+LOGGER = log.get_logger(__name__)
+
+
+class FolderManifest:
+    """The FolderManifest class records the files found on the directories of a
+    dataset, so they can be loaded again without listing the directories.
+
+    For each directory, the manifest stores its modification time, its filenames and
+    the label of each file. A directory whose modification time hasn't changed still
+    has the same files (adding, removing or renaming files changes the modification
+    time of their directory), so only its `stat` is needed to reuse its entries.
+
+    Directories modified less than `RacyInterval` seconds before being scanned may
+    still be changing within the resolution of the file system timestamps, so they're
+    recorded as modified and scanned again on the next load.
+
+    Attributes:
+        key: Description of how the files were labelled (organization, categories...).
+            A manifest is only valid for the same key.
+        root_mtime: Modification time (in ns) of the dataset directory.
+    """
+
+    Version = 1
+
+    RacyInterval = 2.0
+
+    def __init__(self, key: str = "", root_mtime: int = -1):
+        self.key = key
+        self.root_mtime = root_mtime
+
+        self._directories: List[str] = []
+        self._mtimes: List[int] = []
+        self._counts: List[int] = []
+        self._names: List[bytes] = []
+        self._name_lengths: List["np.ndarray"] = []
+        self._labels: List["np.ndarray"] = []
+
+        self._index: Dict[str, int] = {}
+
+    @property
+    def directories(self) -> List[str]:
+        """Returns the recorded directories, relative to the dataset directory."""
+        return list(self._directories)
+
+    def is_unchanged(self, directory: str, mtime: int) -> bool:
+        """Checks if the entries of `directory` can be reused, given its current
+        modification time."""
+        index = self._index.get(directory)
+
+        return index is not None and self._mtimes[index] == mtime and mtime >= 0
+
+    def is_unchanged_root(self, root_mtime: int) -> bool:
+        """Checks if the list of directories can be reused, given the current
+        modification time of the dataset directory."""
+        return self.root_mtime == root_mtime and root_mtime >= 0
+
+    def add_files(
+        self,
+        directory: str,
+        mtime: int,
+        filenames: Sequence[str],
+        labels: "np.ndarray",
+    ):
+        """Records the files found on `directory` (relative to the dataset
+        directory), and their labels."""
+        encoded = [
+            filename.encode("utf-8", "surrogateescape") for filename in filenames
+        ]
+
+        self._add(
+            directory,
+            mtime,
+            b"".join(encoded),
+            np.fromiter(map(len, encoded), dtype=np.int64, count=len(encoded)),
+            labels,
+        )
+
+    def add_from(self, manifest: "FolderManifest", directory: str):
+        """Records the entries of `directory` stored on another manifest."""
+        index = manifest._index[directory]
+
+        self._add(
+            directory,
+            manifest._mtimes[index],
+            manifest._names[index],
+            manifest._name_lengths[index],
+            manifest._labels[index],
+        )
+
+    def path_table(self, dataset_dir: str) -> PathTable:
+        """Returns the recorded files as a PathTable of paths on `dataset_dir`."""
+        return PathTable.from_buffers(
+            [os.path.join(dataset_dir, directory) for directory in self._directories],
+            self._counts,
+            b"".join(self._names),
+            self._concatenate(self._name_lengths),
+        )
+
+    def labels(self) -> "np.ndarray":
+        """Returns the labels of all the recorded files."""
+        return self._concatenate(self._labels)
+
+    @staticmethod
+    def directory_mtime(path: str) -> int:
+        """Returns the modification time of `path`, or -1 if it was modified too
+        recently to be trusted."""
+        stat = os.stat(path)
+
+        # time.time_ns isn't available on Python 3.6
+        if time.time() - stat.st_mtime < FolderManifest.RacyInterval:
+            return -1
+
+        return stat.st_mtime_ns
+
+    @classmethod
+    def load(cls, manifest_path: str) -> Optional["FolderManifest"]:
+        """Returns the manifest stored on `manifest_path`, or None if it doesn't exist
+        or can't be read."""
+        if not os.path.isfile(manifest_path):
+            return None
+
+        try:
+            with np.load(manifest_path, allow_pickle=False) as data:
+                header = json.loads(str(data["header"]))
+
+                if header["version"] != cls.Version:
+                    return None
+
+                counts = data["counts"]
+                name_lengths = data["name_lengths"]
+                names = data["names"].tobytes()
+                labels = data["labels"]
+
+                manifest = cls(header["key"], header["root_mtime"])
+
+                row_starts = np.concatenate(([0], np.cumsum(counts)))
+                byte_starts = np.concatenate(([0], np.cumsum(name_lengths)))
+
+                for i, (directory, mtime) in enumerate(
+                    zip(header["directories"], header["mtimes"])
+                ):
+                    start, end = row_starts[i], row_starts[i + 1]
+
+                    manifest._add(
+                        directory,
+                        mtime,
+                        names[byte_starts[start] : byte_starts[end]],
+                        name_lengths[start:end],
+                        labels[start:end],
+                    )
+
+                return manifest
+
+        except (OSError, ValueError, KeyError, IndexError) as err:
+            LOGGER.warning("Ignoring invalid manifest %s: %s", manifest_path, err)
+
+            return None
+
+    def save(self, manifest_path: str):
+        """Writes the manifest on `manifest_path`. The file is replaced atomically, so
+        an interrupted write never leaves a corrupted manifest."""
+        header = {
+            "version": self.Version,
+            "key": self.key,
+            "root_mtime": self.root_mtime,
+            "directories": self._directories,
+            "mtimes": self._mtimes,
+        }
+
+        temp_path = f"{manifest_path}.{os.getpid()}.tmp"
+
+        with open(temp_path, "wb") as manifest_file:
+            np.savez(
+                manifest_file,
+                header=np.array(json.dumps(header)),
+                counts=np.array(self._counts, dtype=np.int64),
+                names=np.frombuffer(b"".join(self._names), dtype=np.uint8),
+                name_lengths=self._concatenate(self._name_lengths),
+                labels=self.labels(),
+            )
+
+        os.replace(temp_path, manifest_path)
+
+    def _add(
+        self,
+        directory: str,
+        mtime: int,
+        names: bytes,
+        name_lengths: "np.ndarray",
+        labels: "np.ndarray",
+    ):
+        self._index[directory] = len(self._directories)
+
+        self._directories.append(directory)
+        self._mtimes.append(int(mtime))
+        self._counts.append(len(name_lengths))
+        self._names.append(names)
+        self._name_lengths.append(name_lengths)
+        self._labels.append(np.asarray(labels, dtype=np.int64))
+
+    @staticmethod
+    def _concatenate(arrays: List["np.ndarray"]) -> "np.ndarray":
+        return np.concatenate(arrays) if arrays else np.empty(0, dtype=np.int64)
+
+    def __len__(self) -> int:
+        return sum(self._counts)
+
+    def __repr__(self) -> str:
+        return (
+            f"FolderManifest({len(self._directories)} directories, {len(self)} files)"
+        )
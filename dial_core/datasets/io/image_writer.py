@@ -0,0 +1,161 @@
+# vim: ft=python fileencoding=utf-8 sts=4 sw=4 et:
+
+import os
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Callable, Deque, List, Optional, Sequence
+
+import numpy as np
+from PIL import Image
+
+ImageFormats = {"png": ".png", "jpeg": ".jpg", "npy": ".npy"}
+
+
+def write_image(
+    path: str,
+    image: "np.ndarray",
+    image_format: str = "png",
+    png_compress_level: int = 6,
+    jpeg_quality: int = 90,
+):
+    """Encodes `image` on `image_format` and writes it on `path`.
+
+    Raises:
+        ValueError: If `image_format` isn't valid.
+    """
+    if image_format == "npy":
+        np.save(path, np.asarray(image), allow_pickle=False)
+
+    elif image_format == "png":
+        Image.fromarray(image).save(
+            path, format="PNG", compress_level=png_compress_level
+        )
+
+    elif image_format == "jpeg":
+        Image.fromarray(image).save(path, format="JPEG", quality=jpeg_quality)
+
+    else:
+        raise ValueError(
+            f"Invalid image format {image_format!r} ({list(ImageFormats)})"
+        )
+
+
+def _write_chunk(paths: List[str], images: "np.ndarray", options: dict) -> int:
+    for path, image in zip(paths, images):
+        write_image(path, image, **options)
+
+    return len(paths)
+
+
+class ImageWriter:
+    """The ImageWriter class encodes and writes a big number of images on a pool of
+    worker processes, so exporting a dataset isn't limited to a single core.
+
+    Images are sent to the workers in chunks, and only a few chunks are pending at the
+    same time, so memory usage doesn't depend on the number of images.
+
+    Attributes:
+        image_format: Format of the written files ("png", "jpeg" or "npy").
+        png_compress_level: zlib compression level (0-9) of PNG files. Lower levels
+            are much faster to encode, at the cost of bigger files.
+        jpeg_quality: Quality (1-95) of JPEG files.
+        workers: Number of worker processes. If 1, images are written on the calling
+            process.
+        chunk_size: Number of images sent to a worker on each task.
+    """
+
+    def __init__(
+        self,
+        image_format: str = "png",
+        png_compress_level: int = 6,
+        jpeg_quality: int = 90,
+        workers: int = None,
+        chunk_size: int = 256,
+    ):
+        if image_format not in ImageFormats:
+            raise ValueError(
+                f"Invalid image format {image_format!r} ({list(ImageFormats)})"
+            )
+
+        self.image_format = image_format
+        self.png_compress_level = png_compress_level
+        self.jpeg_quality = jpeg_quality
+        self.workers = workers if workers else (os.cpu_count() or 1)
+        self.chunk_size = max(chunk_size, 1)
+
+    @property
+    def extension(self) -> str:
+        """Returns the file extension of the written images (".png", ".jpg"...)."""
+        return ImageFormats[self.image_format]
+
+    def write(
+        self,
+        paths: Sequence[str],
+        images: Sequence["np.ndarray"],
+        progress_callback: Optional[Callable[[int, int], None]] = None,
+    ):
+        """Writes each image of `images` on the file of the same position on `paths`.
+
+        Args:
+            paths: Destination file of each image. Their directories must exist.
+            images: Images to write (an array, or any sequence of arrays).
+            progress_callback: Called as `progress_callback(written, total)` each time
+                a chunk of images is written.
+        """
+        total = len(paths)
+        written = 0
+
+        chunks = (
+            (
+                paths[start : start + self.chunk_size],
+                images[start : start + self.chunk_size],
+            )
+            for start in range(0, total, self.chunk_size)
+        )
+
+        if self.workers <= 1:
+            for chunk_paths, chunk_images in chunks:
+                written += _write_chunk(chunk_paths, chunk_images, self._options())
+
+                if progress_callback:
+                    progress_callback(written, total)
+
+            return
+
+        pending: Deque["Future"] = deque()
+
+        with ProcessPoolExecutor(max_workers=self.workers) as executor:
+            try:
+                for chunk_paths, chunk_images in chunks:
+                    # Limit the number of chunks (and images) waiting on memory
+                    if len(pending) >= 2 * self.workers:
+                        written += pending.popleft().result()
+
+                        if progress_callback:
+                            progress_callback(written, total)
+
+                    pending.append(
+                        executor.submit(
+                            _write_chunk,
+                            list(chunk_paths),
+                            chunk_images,
+                            self._options(),
+                        )
+                    )
+
+                while pending:
+                    written += pending.popleft().result()
+
+                    if progress_callback:
+                        progress_callback(written, total)
+
+            finally:
+                for future in pending:
+                    future.cancel()
+
+    def _options(self) -> dict:
+        return {
+            "image_format": self.image_format,
+            "png_compress_level": self.png_compress_level,
+            "jpeg_quality": self.jpeg_quality,
+        }
@@ -0,0 +1,372 @@
+# vim: ft=python fileencoding=utf-8 sts=4 sw=4 et:
+
+"""Columns of samples of any size stored as records on a few shard files.
+
+Each sample (an array of any shape and dtype) is stored as a length-prefixed record:
+
+    record length (u64) | dtype length (u8) | ndim (u8) | padding (u8) | dtype |
+    dimensions (u64 each) | padding | raw data
+
+Records are written on consecutive ranges of rows on each shard:
+
+    {prefix}-00000-of-00004.records, {prefix}-00001-of-00004.records, ...
+
+An index file ({prefix}.index.npz) stores the offset of each record, so any row can
+be read with a single lookup. The raw data of each record is aligned to 16 bytes, so
+samples are read as arrays directly from the memory-mapped shards.
+"""
+
+import json
+import mmap
+import os
+import struct
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Any, Deque, Iterator, List, Sequence, Union
+
+import numpy as np
+
+Magic = b"DIALREC1"
+
+Alignment = 16
+
+_Length = struct.Struct("<Q")
+_Header = struct.Struct("<BBB")
+
+
+def shard_filename(prefix: str, shard: int, shards: int) -> str:
+    return f"{prefix}-{shard:05d}-of-{shards:05d}.records"
+
+
+def index_filename(prefix: str) -> str:
+    return f"{prefix}.index.npz"
+
+
+def encode_record(sample: Any, position: int) -> bytes:
+    """Returns the record of `sample` (length prefix included), to be written at
+    `position` of a shard file. Bytes are stored as arrays of uint8.
+
+    Raises:
+        ValueError: If `sample` holds Python objects.
+    """
+    if isinstance(sample, (bytes, bytearray, memoryview)):
+        sample = np.frombuffer(sample, dtype=np.uint8)
+
+    # Not np.ascontiguousarray, that turns scalars into 1-D arrays
+    array = np.asarray(sample)
+
+    if array.dtype.hasobject:
+        raise ValueError("Samples of Python objects can't be stored as records")
+
+    dtype = array.dtype.str.encode("ascii")
+    header_size = _Length.size + _Header.size + len(dtype) + 8 * array.ndim
+    padding = -(position + header_size) % Alignment
+
+    header = (
+        _Header.pack(len(dtype), array.ndim, padding)
+        + dtype
+        + struct.pack(f"<{array.ndim}Q", *array.shape)
+        + bytes(padding)
+    )
+
+    return _Length.pack(len(header) + array.nbytes) + header + array.tobytes()
+
+
+def decode_record(buffer: Union[bytes, "mmap.mmap"], position: int) -> "np.ndarray":
+    """Returns the sample stored on the record at `position` of `buffer`. The array
+    shares the memory of `buffer` (no data is copied)."""
+    position += _Length.size
+
+    dtype_size, ndim, padding = _Header.unpack_from(buffer, position)
+    position += _Header.size
+
+    dtype = np.dtype(bytes(buffer[position : position + dtype_size]).decode("ascii"))
+    position += dtype_size
+
+    shape = struct.unpack_from(f"<{ndim}Q", buffer, position)
+    position += 8 * ndim + padding
+
+    count = int(np.prod(shape, dtype=np.int64))
+
+    return np.frombuffer(buffer, dtype=dtype, count=count, offset=position).reshape(
+        shape
+    )
+
+
+def _write_shard(path: str, samples: Sequence[Any]) -> "np.ndarray":
+    """Writes `samples` on a new shard file, and returns the offset of each
+    record."""
+    offsets = np.empty(len(samples), dtype=np.int64)
+
+    with open(path, "wb") as shard_file:
+        shard_file.write(Magic)
+        position = len(Magic)
+
+        for i, sample in enumerate(samples):
+            record = encode_record(sample, position)
+            shard_file.write(record)
+
+            offsets[i] = position
+            position += len(record)
+
+    return offsets
+
+
+def write_records(
+    directory: str,
+    prefix: str,
+    column: Sequence[Any],
+    shards: int = 8,
+    workers: int = None,
+):
+    """Writes each row of `column` as a record, on `shards` shard files on
+    `directory`, and the index of the records.
+
+    Each shard holds a consecutive range of rows, and is written by its own worker
+    process. Only `workers` shards are being written at the same time, so at most
+    `workers` ranges of rows are copied to the workers.
+
+    Shards and index are written on temporary files, which replace the previous ones
+    only when all of them have been written. This way `column` can be a RecordArray
+    (or hold views of one) opened from the same files.
+
+    Raises:
+        ValueError: If any sample holds Python objects.
+    """
+    shards = max(min(int(shards), len(column)), 1)
+    workers = workers if workers else (os.cpu_count() or 1)
+
+    shard_rows = np.linspace(0, len(column), shards + 1).astype(np.int64)
+    paths = [
+        os.path.join(directory, shard_filename(prefix, shard, shards))
+        for shard in range(shards)
+    ]
+    temp_paths = [f"{path}.{os.getpid()}.tmp" for path in paths]
+
+    def shard_samples(shard: int) -> Sequence[Any]:
+        return column[shard_rows[shard] : shard_rows[shard + 1]]
+
+    if workers <= 1 or shards == 1:
+        offsets = [
+            _write_shard(path, shard_samples(i)) for i, path in enumerate(temp_paths)
+        ]
+
+    else:
+        offsets = []
+        pending: Deque["Future"] = deque()
+
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            try:
+                for i, path in enumerate(temp_paths):
+                    if len(pending) >= workers:
+                        offsets.append(pending.popleft().result())
+
+                    pending.append(
+                        executor.submit(_write_shard, path, shard_samples(i))
+                    )
+
+                while pending:
+                    offsets.append(pending.popleft().result())
+
+            finally:
+                for future in pending:
+                    future.cancel()
+
+    dtype = np.dtype(getattr(column, "dtype", object))
+
+    header = {
+        "shards": shards,
+        "dtype": dtype.str,
+        "row_shape": list(np.shape(column)[1:]) if not dtype.hasobject else None,
+    }
+
+    index_path = os.path.join(directory, index_filename(prefix))
+    temp_index_path = f"{index_path}.{os.getpid()}.tmp"
+
+    with open(temp_index_path, "wb") as index_file:
+        np.savez(
+            index_file,
+            header=np.array(json.dumps(header)),
+            shard_rows=shard_rows,
+            offsets=np.concatenate(offsets),
+        )
+
+    for temp_path, path in zip(temp_paths, paths):
+        os.replace(temp_path, path)
+
+    os.replace(temp_index_path, index_path)
+
+
+class RecordArray:
+    """The RecordArray class is a read-only, array-like column of the records written
+    by `write_records`.
+
+    Shards are memory-mapped, so reading a row is a lookup on the index and a view of
+    the shard: samples aren't copied, and the operating system caches the most used
+    pages. Iterating the array reads the shards sequentially instead.
+
+    Columns of arrays of a single shape are returned as regular arrays, like the
+    original column. Columns of samples of different shapes (images of mixed
+    resolutions, encoded files...) are returned as arrays of objects, one array per
+    sample.
+
+    Attributes:
+        directory: Directory of the shard files.
+        prefix: Prefix of the names of the shard files.
+    """
+
+    def __init__(self, directory: str, prefix: str):
+        """Opens the records written on `directory` with `prefix`.
+
+        Raises:
+            ValueError: If the index or any shard isn't valid.
+        """
+        self.directory = directory
+        self.prefix = prefix
+
+        with np.load(
+            os.path.join(directory, index_filename(prefix)), allow_pickle=False
+        ) as index:
+            header = json.loads(str(index["header"]))
+
+            self._shard_rows = index["shard_rows"]
+            self._offsets = index["offsets"]
+
+        self.shards: int = header["shards"]
+        self.dtype = np.dtype(header["dtype"])
+        self.row_shape = (
+            tuple(header["row_shape"]) if header["row_shape"] is not None else None
+        )
+
+        self._paths = [
+            os.path.join(directory, shard_filename(prefix, shard, self.shards))
+            for shard in range(self.shards)
+        ]
+
+        if len(self._offsets) != self._shard_rows[-1]:
+            raise ValueError(f"The index of {prefix} doesn't match its shards")
+
+        # All the shards are mapped now, so the array keeps reading the same files
+        # (matching its index) even if they're replaced by a new save
+        self._buffers: List["mmap.mmap"] = [
+            self._map_shard(path) for path in self._paths
+        ]
+
+    @property
+    def shape(self) -> tuple:
+        return (len(self),) + (self.row_shape or ())
+
+    @property
+    def ndim(self) -> int:
+        return len(self.shape)
+
+    def record(self, row: int) -> "np.ndarray":
+        """Returns the (read-only) sample of `row`."""
+        shard = int(np.searchsorted(self._shard_rows, row, side="right")) - 1
+        sample = decode_record(self._buffers[shard], int(self._offsets[row]))
+
+        # Rows of 1-D columns are scalars, like on the original array
+        return sample[()] if self.row_shape == () else sample
+
+    def stream(self, start: int = 0, end: int = None) -> Iterator["np.ndarray"]:
+        """Yields the samples of the rows between `start` and `end`, reading the
+        shards sequentially (each record is found from the length of the previous
+        one, without lookups on the index)."""
+        end = len(self) if end is None else min(end, len(self))
+
+        for shard in range(self.shards):
+            shard_start = max(start, int(self._shard_rows[shard]))
+            shard_end = min(end, int(self._shard_rows[shard + 1]))
+
+            if shard_start >= shard_end:
+                continue
+
+            buffer = self._buffers[shard]
+            position = int(self._offsets[shard_start])
+
+            for _ in range(shard_start, shard_end):
+                sample = decode_record(buffer, position)
+                position += _Length.size + _Length.unpack_from(buffer, position)[0]
+
+                yield sample[()] if self.row_shape == () else sample
+
+    def tolist(self) -> list:
+        return self[:].tolist()
+
+    @staticmethod
+    def _map_shard(path: str) -> "mmap.mmap":
+        with open(path, "rb") as shard_file:
+            buffer = mmap.mmap(shard_file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        if buffer[: len(Magic)] != Magic:
+            raise ValueError(f"{path} isn't a records file")
+
+        return buffer
+
+    def _rows(self, rows: List[int]) -> "np.ndarray":
+        samples = [self.record(row) for row in rows]
+
+        if self.row_shape is not None:
+            taken = np.empty((len(samples),) + self.row_shape, dtype=self.dtype)
+        else:
+            taken = np.empty(len(samples), dtype=object)
+
+        # Assigned one by one, so samples of the same shape aren't broadcast
+        for i, sample in enumerate(samples):
+            taken[i] = sample
+
+        return taken
+
+    def __getitem__(
+        self, key: Union[int, slice, Sequence[int], "np.ndarray", tuple]
+    ) -> "np.ndarray":
+        if isinstance(key, tuple):
+            return self[key[0]][(slice(None),) + key[1:]]
+
+        if isinstance(key, (int, np.integer)):
+            if not -len(self) <= key < len(self):
+                raise IndexError(f"Index {key} out of bounds for {len(self)} rows")
+
+            return self.record(int(key) % len(self))
+
+        if isinstance(key, slice):
+            return self._rows(range(*key.indices(len(self))))
+
+        key = np.asarray(key)
+
+        if key.dtype == bool:
+            if key.shape != (len(self),):
+                raise IndexError(f"Boolean index of shape {key.shape} for {len(self)}")
+
+            return self._rows(np.flatnonzero(key).tolist())
+
+        rows = key.astype(np.int64, copy=False).reshape(-1)
+
+        if len(rows) and (rows.min() < -len(self) or rows.max() >= len(self)):
+            raise IndexError(f"Index out of bounds for {len(self)} rows")
+
+        return self._rows(np.where(rows < 0, rows + len(self), rows).tolist())
+
+    def __array__(self, dtype=None, copy=None) -> "np.ndarray":
+        array = self[:]
+
+        return array if dtype is None else array.astype(dtype)
+
+    def __iter__(self) -> Iterator["np.ndarray"]:
+        return self.stream()
+
+    def __len__(self) -> int:
+        return len(self._offsets)
+
+    def __getstate__(self) -> dict:
+        # Shards are mapped again when unpickled
+        return {"directory": self.directory, "prefix": self.prefix}
+
+    def __setstate__(self, state: dict):
+        self.__init__(state["directory"], state["prefix"])
+
+    def __repr__(self) -> str:
+        return (
+            f"RecordArray({self.prefix!r}, {len(self)} rows, {self.shards} shards, "
+            f"dtype={self.dtype})"
+        )
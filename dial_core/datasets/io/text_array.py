@@ -0,0 +1,275 @@
+# vim: ft=python fileencoding=utf-8 sts=4 sw=4 et:
+
+"""Fast reading and writing of numeric arrays as plain text, one row per line.
+
+Arrays with more than two dimensions are written flattened (one sample per line), so
+their shape must be passed again when they're read.
+
+Big files are split on ranges of lines which are parsed on a pool of processes, and
+big arrays are formatted by chunks of rows, also on a pool of processes.
+"""
+
+import math
+import os
+import warnings
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Deque, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+# Files smaller than this are parsed on the calling process
+ParallelReadBytes = 16 * 1024 ** 2
+
+# Maximum number of values formatted at once (each one is a Python object while it's
+# being formatted)
+ChunkValues = 1024 ** 2
+
+
+def text_format(dtype: "np.dtype") -> str:
+    """Returns the format used to write the values of `dtype`. Floating point values
+    are written with enough digits to be read back exactly.
+
+    Raises:
+        ValueError: If `dtype` isn't numeric.
+    """
+    dtype = np.dtype(dtype)
+
+    if dtype.kind in "biu":
+        return "%d"
+
+    if dtype.kind == "f":
+        digits = {2: 5, 4: 9}.get(dtype.itemsize, 17)
+
+        return f"%.{digits}g"
+
+    raise ValueError(f"Arrays of {dtype} can't be stored as text")
+
+
+def format_rows(rows: "np.ndarray", fmt: str, delimiter: str = " ") -> str:
+    """Returns the text of `rows` (a 2-D array), formatted with a single operation
+    instead of row by row."""
+    if len(rows) == 0:
+        return ""
+
+    row_format = delimiter.join([fmt] * rows.shape[1]) + "\n"
+
+    return (row_format * len(rows)) % tuple(rows.ravel().tolist())
+
+
+def write_text(
+    path: str,
+    array: "np.ndarray",
+    delimiter: str = " ",
+    chunk_rows: int = 65536,
+    workers: int = None,
+):
+    """Writes `array` on `path`, one row per line.
+
+    The array is written by chunks of up to `chunk_rows` rows (and `ChunkValues`
+    values), so it can be any array-like object that can be sliced (a memory-mapped
+    array, for example) and it's never copied as a whole. Chunks are formatted in
+    parallel if `workers` > 1.
+
+    Raises:
+        ValueError: If `array` isn't numeric.
+    """
+    fmt = text_format(array.dtype)
+
+    row_values = int(np.prod(array.shape[1:], dtype=np.int64))
+    chunk_rows = max(min(int(chunk_rows), ChunkValues // max(row_values, 1)), 1)
+    workers = workers if workers else (os.cpu_count() or 1)
+
+    def chunks():
+        for start in range(0, len(array), chunk_rows):
+            chunk = np.asarray(array[start : start + chunk_rows])
+
+            yield chunk.reshape(len(chunk), -1)
+
+    with open(path, "w") as text_file:
+        if workers <= 1 or len(array) <= chunk_rows:
+            for chunk in chunks():
+                text_file.write(format_rows(chunk, fmt, delimiter))
+
+            return
+
+        pending: Deque["Future"] = deque()
+
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            try:
+                for chunk in chunks():
+                    # Limit the number of chunks waiting on memory
+                    if len(pending) >= 2 * workers:
+                        text_file.write(pending.popleft().result())
+
+                    pending.append(
+                        executor.submit(format_rows, chunk, fmt, delimiter)
+                    )
+
+                while pending:
+                    text_file.write(pending.popleft().result())
+
+            finally:
+                for future in pending:
+                    future.cancel()
+
+
+def read_text(
+    path: str,
+    shape: Optional[Sequence[int]] = None,
+    dtype: "np.dtype" = np.float64,
+    delimiter: str = " ",
+    workers: int = None,
+) -> "np.ndarray":
+    """Reads an array written by `write_text` (or any text file with a row of
+    numbers on each line).
+
+    Big files are split on byte ranges (cut at line ends), parsed in parallel, and
+    copied on an array allocated with the final `shape`.
+
+    Args:
+        path: Path of the text file.
+        shape: Shape of the array. If None, the shape is (lines, values per line), or
+            (lines,) if there is a single value per line (like `np.loadtxt`).
+        dtype: Type of the values.
+        delimiter: Separator of the values of a line. Spaces and tabs are always
+            accepted.
+        workers: Number of processes used to parse big files.
+
+    Raises:
+        ValueError: If the file can't be parsed, or its values don't fit on `shape`
+            (or on the same number of values per line, if `shape` is None).
+    """
+    dtype = np.dtype(dtype)
+    workers = workers if workers else (os.cpu_count() or 1)
+
+    file_size = os.path.getsize(path)
+
+    if workers <= 1 or file_size < ParallelReadBytes:
+        parts = [_parse_range(path, 0, file_size, dtype.str, delimiter)]
+
+        return _assemble(path, parts, shape, dtype, delimiter)
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        ranges = _line_ranges(path, file_size, 4 * workers)
+
+        parts = executor.map(
+            _parse_range,
+            [path] * len(ranges),
+            *zip(*ranges),
+            [dtype.str] * len(ranges),
+            [delimiter] * len(ranges),
+        )
+
+        # Parts are copied as they're parsed
+        return _assemble(path, parts, shape, dtype, delimiter)
+
+
+def _assemble(
+    path: str,
+    parts: Iterable[Tuple["np.ndarray", int]],
+    shape: Optional[Sequence[int]],
+    dtype: "np.dtype",
+    delimiter: str,
+) -> "np.ndarray":
+    """Joins the parsed `parts` of the file (values and number of lines of each one)
+    on a single array."""
+    if shape is None:
+        parts = list(parts)
+        values = np.concatenate([part for part, _ in parts])
+        lines = sum(part_lines for _, part_lines in parts)
+        columns = _first_line_columns(path, delimiter)
+
+        if lines * max(columns, 1) != len(values):
+            raise ValueError(f"{path} doesn't have {columns} values on every line")
+
+        if columns <= 1:
+            return values
+
+        return values.reshape(-1, columns)
+
+    array = np.empty(shape, dtype=dtype)
+    flat_array = array.reshape(-1)
+    position = 0
+
+    for part, _ in parts:
+        if position + len(part) > len(flat_array):
+            break
+
+        flat_array[position : position + len(part)] = part
+        position += len(part)
+
+    if position != len(flat_array):
+        raise ValueError(f"The values of {path} don't fit on an array of {shape}")
+
+    return array
+
+
+def _parse_range(
+    path: str, start: int, end: int, dtype: str, delimiter: str
+) -> Tuple["np.ndarray", int]:
+    """Parses the values on the bytes [`start`, `end`) of the file. Returns them,
+    and the number of (not empty) lines they're on."""
+    with open(path, "rb") as text_file:
+        text_file.seek(start)
+        text = text_file.read(end - start).decode("utf-8")
+
+    if delimiter.strip():
+        text = text.replace(delimiter, " ")
+
+    if not text.strip():
+        return np.empty(0, dtype=dtype), 0
+
+    lines = sum(1 for line in text.splitlines() if line.strip())
+
+    # Booleans are written as integers
+    parse_dtype = np.int64 if np.dtype(dtype).kind == "b" else dtype
+
+    try:
+        with warnings.catch_warnings():
+            # Older NumPy versions only warn about invalid values
+            warnings.simplefilter("error", DeprecationWarning)
+
+            values = np.fromstring(text, dtype=parse_dtype, sep=" ").astype(
+                dtype, copy=False
+            )
+
+    except (ValueError, DeprecationWarning) as err:
+        raise ValueError(f"Can't parse the bytes {start}-{end} of {path}: {err}")
+
+    return values, lines
+
+
+def _line_ranges(path: str, file_size: int, parts: int) -> List[Tuple[int, int]]:
+    """Splits the file on up to `parts` byte ranges, each one ending on a line end."""
+    boundaries = [0]
+
+    with open(path, "rb") as text_file:
+        for i in range(1, parts):
+            position = max(math.ceil(file_size * i / parts), boundaries[-1] + 1)
+
+            if position >= file_size:
+                break
+
+            # Move to the start of the next line
+            text_file.seek(position - 1)
+            text_file.readline()
+
+            if text_file.tell() < file_size and text_file.tell() > boundaries[-1]:
+                boundaries.append(text_file.tell())
+
+    boundaries.append(file_size)
+
+    return list(zip(boundaries[:-1], boundaries[1:]))
+
+
+def _first_line_columns(path: str, delimiter: str) -> int:
+    with open(path, "r") as text_file:
+        for line in text_file:
+            if delimiter.strip():
+                line = line.replace(delimiter, " ")
+
+            if line.strip():
+                return len(line.split())
+
+    return 0
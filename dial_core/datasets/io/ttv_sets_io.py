@@ -74,7 +74,7 @@ class TTVSetsIO:
         dataset_io_providers=DatasetIORegistry,
     ) -> "TTVSets":
 
-        dataset_io = getattr(dataset_io_providers, ttv_description["format"])
+        dataset_io = getattr(dataset_io_providers, ttv_description["format"])()
 
         def load_dataset(dataset_dir, dataset_description):
             return (
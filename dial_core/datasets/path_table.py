@@ -0,0 +1,219 @@
+# vim: ft=python fileencoding=utf-8 sts=4 sw=4 et:
+
+import os
+from typing import Iterator, List, Sequence, Tuple, Union
+
+import numpy as np
+
+
+class PathTable:
+    """The PathTable class is a read-only, array-like column of file paths, used to
+    store big lists of image paths with little memory.
+
+    Paths are stored grouped by their directory. Each directory is stored once, and
+    the filenames are concatenated on a single bytes table indexed by an array of
+    offsets, instead of keeping a Python string (or a fixed-width NumPy string) for
+    each full path. Paths are only built when rows are accessed.
+
+    Indexing works like on a 1-D NumPy array: an integer returns a single path, and a
+    slice, an array of indices or a boolean mask return an array of paths.
+
+    The table can be stored on a Dataset as it is. The ColumnStore copies it to a
+    regular array the first time rows are inserted or deleted.
+    """
+
+    dtype = np.dtype(object)
+    ndim = 1
+
+    def __init__(
+        self,
+        directories: Sequence[str] = (),
+        filenames: Sequence[Sequence[str]] = (),
+    ):
+        """Creates a table with the files `filenames[i]` of each directory
+        `directories[i]`.
+
+        Raises:
+            ValueError: If the number of directories and filename lists don't match.
+        """
+        if len(directories) != len(filenames):
+            raise ValueError(
+                f"{len(directories)} directories with {len(filenames)} filename lists"
+            )
+
+        encoded = [
+            [filename.encode("utf-8", "surrogateescape") for filename in names]
+            for names in filenames
+        ]
+
+        self._set_buffers(
+            directories,
+            [len(names) for names in encoded],
+            b"".join(name for names in encoded for name in names),
+            np.fromiter(
+                (len(name) for names in encoded for name in names),
+                dtype=np.int64,
+                count=sum(len(names) for names in encoded),
+            ),
+        )
+
+    @classmethod
+    def from_buffers(
+        cls,
+        directories: Sequence[str],
+        counts: Sequence[int],
+        names: bytes,
+        name_lengths: "np.ndarray",
+    ) -> "PathTable":
+        """Creates a table from its encoded representation (see `buffers`), without
+        decoding any filename.
+
+        Args:
+            directories: Directory of each group of files.
+            counts: Number of files of each directory.
+            names: UTF-8 encoded filenames, concatenated.
+            name_lengths: Length (in bytes) of each encoded filename.
+
+        Raises:
+            ValueError: If the buffers don't describe the same number of files.
+        """
+        path_table = cls.__new__(cls)
+        path_table._set_buffers(directories, counts, names, name_lengths)
+
+        return path_table
+
+    def buffers(self) -> Tuple["np.ndarray", bytes, "np.ndarray"]:
+        """Returns the number of files of each directory, the concatenated filenames,
+        and the length of each filename. See `from_buffers`."""
+        return (
+            np.diff(self._directory_starts),
+            self._names,
+            np.diff(self._offsets),
+        )
+
+    def _set_buffers(
+        self,
+        directories: Sequence[str],
+        counts: Sequence[int],
+        names: bytes,
+        name_lengths: "np.ndarray",
+    ):
+        if len(directories) != len(counts):
+            raise ValueError(
+                f"{len(directories)} directories with {len(counts)} file counts"
+            )
+
+        self._directories: List[str] = [str(directory) for directory in directories]
+
+        # Row where the files of each directory start
+        self._directory_starts = np.zeros(len(counts) + 1, dtype=np.int64)
+        np.cumsum(np.asarray(counts, dtype=np.int64), out=self._directory_starts[1:])
+
+        self._offsets = np.zeros(len(name_lengths) + 1, dtype=np.int64)
+        np.cumsum(np.asarray(name_lengths, dtype=np.int64), out=self._offsets[1:])
+
+        row_count, names_length = self._directory_starts[-1], self._offsets[-1]
+
+        if row_count != len(name_lengths) or names_length != len(names):
+            raise ValueError("The file counts and name lengths don't match the names")
+
+        self._names = bytes(names)
+
+    @property
+    def directories(self) -> List[str]:
+        """Returns the directories of the table, on the order they were added."""
+        return list(self._directories)
+
+    @property
+    def shape(self) -> tuple:
+        return (len(self),)
+
+    @property
+    def nbytes(self) -> int:
+        """Returns the (approximate) memory used by the table."""
+        return (
+            len(self._names)
+            + self._offsets.nbytes
+            + self._directory_starts.nbytes
+            + sum(len(directory) for directory in self._directories)
+        )
+
+    def filenames(self, directory_index: int) -> List[str]:
+        """Returns the filenames stored for the directory number `directory_index`."""
+        start, end = self._directory_starts[directory_index : directory_index + 2]
+
+        return [self._filename(row) for row in range(start, end)]
+
+    def tolist(self) -> List[str]:
+        return self._paths(np.arange(len(self)))
+
+    def _filename(self, row: int) -> str:
+        start, end = self._offsets[row : row + 2]
+
+        return self._names[start:end].decode("utf-8", "surrogateescape")
+
+    def _paths(self, rows: "np.ndarray") -> List[str]:
+        directory_indices = np.searchsorted(self._directory_starts, rows, "right") - 1
+        directories = self._directories
+        names = self._names
+
+        return [
+            os.path.join(
+                directories[directory_index],
+                names[start:end].decode("utf-8", "surrogateescape"),
+            )
+            for directory_index, start, end in zip(
+                directory_indices.tolist(),
+                self._offsets[rows].tolist(),
+                self._offsets[rows + 1].tolist(),
+            )
+        ]
+
+    def _rows(self, key: Union[slice, Sequence[int], "np.ndarray"]) -> "np.ndarray":
+        if isinstance(key, slice):
+            return np.arange(*key.indices(len(self)))
+
+        key = np.asarray(key)
+
+        if key.dtype == bool:
+            if key.shape != self.shape:
+                raise IndexError(f"Boolean index of shape {key.shape} for {self.shape}")
+
+            return np.flatnonzero(key)
+
+        rows = key.astype(np.int64, copy=False).reshape(-1)
+
+        if len(rows) and (rows.min() < -len(self) or rows.max() >= len(self)):
+            raise IndexError(f"Index out of bounds for a table of {len(self)} paths")
+
+        return np.where(rows < 0, rows + len(self), rows)
+
+    def __getitem__(
+        self, key: Union[int, slice, Sequence[int], "np.ndarray"]
+    ) -> Union[str, "np.ndarray"]:
+        if isinstance(key, (int, np.integer)):
+            if not -len(self) <= key < len(self):
+                raise IndexError(f"Index {key} out of bounds for {len(self)} paths")
+
+            return self._paths(np.array([int(key) % len(self)]))[0]
+
+        rows = self._rows(key)
+
+        paths = np.empty(len(rows), dtype=object)
+        paths[:] = self._paths(rows)
+
+        return paths
+
+    def __array__(self, dtype=None, copy=None) -> "np.ndarray":
+        paths = self[:]
+
+        return paths if dtype is None else paths.astype(dtype)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.tolist())
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    def __repr__(self) -> str:
+        return f"PathTable({len(self)} paths, {len(self._directories)} directories)"
@@ -0,0 +1,224 @@
+# vim: ft=python fileencoding=utf-8 sts=4 sw=4 et:
+
+import os
+import sys
+from collections import OrderedDict
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import TYPE_CHECKING, List, Optional, Tuple
+
+from tensorflow import keras
+
+from .dataset import Dataset
+
+if TYPE_CHECKING:
+    import numpy as np
+
+
+# Dataset used by the workers of a process pool. It's sent only once to each worker
+# (when the worker starts) instead of being pickled with every batch request.
+_WORKER_DATASET: Optional["Dataset"] = None
+
+# Process pools can't initialize their workers before Python 3.7, so the dataset is
+# sent with each request there
+_HAS_WORKER_INITIALIZER = sys.version_info >= (3, 7)
+
+
+def _init_worker(dataset: "Dataset"):
+    global _WORKER_DATASET
+    _WORKER_DATASET = dataset
+
+
+def _load_on_worker(request: tuple) -> Tuple["np.array", "np.array"]:
+    return _load(_WORKER_DATASET, request)
+
+
+def _load(dataset: "Dataset", request: tuple) -> Tuple["np.array", "np.array"]:
+    """Executes a `request` on the dataset. A request can be either
+    ("batch", idx, role) or ("items", start, end, role)."""
+    if request[0] == "batch":
+        return dataset.get_batch(*request[1:])
+
+    return dataset.items(*request[1:])
+
+
+class PrefetchedDataset(keras.utils.Sequence):
+    """The PrefetchedDataset class wraps a Dataset and prepares the upcoming batches on
+    a pool of background workers while the current one is being consumed. This way,
+    the time spent loading and processing the data (decoding images, for example)
+    overlaps with the training step.
+
+    Batches are always returned in the same order they're requested, and never more
+    than `prefetch` batches are being prepared (or waiting to be consumed) at the same
+    time. Prefetched batches are discarded (and the workers restarted, so process
+    workers get the new dataset) when the `version` of the dataset changes.
+
+    Attributes:
+        dataset: Wrapped dataset.
+        prefetch: Number of upcoming batches prepared in the background.
+        workers: Number of workers of the pool.
+        use_processes: If True, batches are prepared on a process pool instead of a
+            thread pool. The dataset is sent once to each worker (with each request
+            on Python 3.6), so it must be pickable.
+        role: Role used when returning batches with the `[]` operator.
+
+    Raises:
+        ValueError: If batches are prepared on threads and the dataset has a
+            `buffer_pool` too small to hold all the batches alive at the same time
+            (`prefetch` + 2 buffers are needed).
+    """
+
+    def __init__(
+        self,
+        dataset: "Dataset",
+        prefetch: int = 4,
+        workers: int = None,
+        use_processes: bool = False,
+        role: "Dataset.Role" = Dataset.Role.Raw,
+    ):
+        self.dataset = dataset
+
+        self.prefetch = max(prefetch, 1)
+        self.workers = workers if workers else min(self.prefetch, os.cpu_count() or 1)
+        self.use_processes = use_processes
+        self.role = role
+
+        buffer_pool = getattr(dataset, "buffer_pool", None)
+
+        if (
+            not use_processes
+            and buffer_pool is not None
+            and buffer_pool.size < self.prefetch + 2
+        ):
+            raise ValueError(
+                f"Prefetching {self.prefetch} batches needs a buffer pool of at least"
+                f" {self.prefetch + 2} buffers, but the dataset has {buffer_pool.size}"
+            )
+
+        self._executor: Optional["Executor"] = None
+        self._pending: "OrderedDict[tuple, Future]" = OrderedDict()
+        self._version = dataset.version
+
+    @property
+    def batch_size(self) -> int:
+        return self.dataset.batch_size
+
+    @property
+    def input_shape(self):
+        return self.dataset.input_shape
+
+    @property
+    def output_shape(self):
+        return self.dataset.output_shape
+
+    def head(self, n: int = 10, role: "Dataset.Role" = Dataset.Role.Raw):
+        """Returns the first `n` items on the dataset."""
+        return self.items(0, n, role)
+
+    def items(
+        self,
+        start: int = None,
+        end: int = None,
+        role: "Dataset.Role" = Dataset.Role.Raw,
+    ) -> Tuple["np.array", "np.array"]:
+        """Returns the elements between start and end, like `Dataset.items`.
+
+        The following ranges of the same size are prefetched, so reading the rows of
+        a table in order (while scrolling, for example) doesn't have to wait for them.
+        """
+        if start is None or end is None or start < 0 or end <= start:
+            return self.dataset.items(start, end, role)
+
+        size = end - start
+        row_count = self.dataset.row_count()
+
+        upcoming = [
+            ("items", range_start, range_start + size, role)
+            for range_start in range(end, end + self.prefetch * size, size)
+            if range_start < row_count
+        ]
+
+        return self._request(("items", start, end, role), upcoming)
+
+    def row_count(self) -> int:
+        """Returns the number of rows on the dataset."""
+        return self.dataset.row_count()
+
+    def __len__(self) -> int:
+        """Returns the length of the dataset (in batches)."""
+        return len(self.dataset)
+
+    def __getitem__(self, idx: int) -> Tuple["np.array", "np.array"]:
+        """Returns the batch `idx`, and starts preparing the following ones."""
+        upcoming = [
+            ("batch", next_idx, self.role)
+            for next_idx in range(idx + 1, min(idx + 1 + self.prefetch, len(self)))
+        ]
+
+        return self._request(("batch", idx, self.role), upcoming)
+
+    def on_epoch_end(self):
+        """Stops the workers before the wrapped dataset changes for the next epoch."""
+        self.shutdown()
+
+        self.dataset.on_epoch_end()
+
+    def shutdown(self):
+        """Cancels any pending work and stops the workers. The pool is started again
+        the next time a batch is requested."""
+        for future in self._pending.values():
+            future.cancel()
+
+        self._pending.clear()
+
+        if self._executor:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+    def _request(
+        self, request: tuple, upcoming: List[tuple]
+    ) -> Tuple["np.array", "np.array"]:
+        """Returns the result of `request`, and queues the `upcoming` requests.
+
+        Prefetched requests that aren't on `upcoming` are discarded (random access
+        instead of sequential, for example)."""
+        if self.dataset.version != self._version:
+            # Prefetched results (and the datasets copied to the process workers)
+            # hold the rows of the previous version
+            self.shutdown()
+            self._version = self.dataset.version
+
+        future = self._pending.pop(request, None) or self._submit(request)
+
+        for stale_request in [r for r in self._pending if r not in upcoming]:
+            self._pending.pop(stale_request).cancel()
+
+        for upcoming_request in upcoming:
+            if upcoming_request not in self._pending:
+                self._pending[upcoming_request] = self._submit(upcoming_request)
+
+        return future.result()
+
+    def _submit(self, request: tuple) -> "Future":
+        if not self._executor:
+            self._executor = self._create_executor()
+
+        if self.use_processes and _HAS_WORKER_INITIALIZER:
+            return self._executor.submit(_load_on_worker, request)
+
+        return self._executor.submit(_load, self.dataset, request)
+
+    def _create_executor(self) -> "Executor":
+        if self.use_processes and _HAS_WORKER_INITIALIZER:
+            return ProcessPoolExecutor(
+                max_workers=self.workers,
+                initializer=_init_worker,
+                initargs=(self.dataset,),
+            )
+
+        if self.use_processes:
+            return ProcessPoolExecutor(max_workers=self.workers)
+
+        return ThreadPoolExecutor(max_workers=self.workers)
+
+    def __str__(self):
+        return f"PrefetchedDataset ({self.dataset})"
@@ -0,0 +1,215 @@
+# vim: ft=python fileencoding=utf-8 sts=4 sw=4 et:
+
+"""Functions for splitting a Dataset on train/test/validation sets.
+
+All the generated TTVSets hold DatasetView objects over the source dataset, so no
+data is copied, no matter how many splits or folds are generated. Each split is
+reproducible given the same seed.
+
+Views show their rows in the order of the source dataset (so memory-mapped data is
+read mostly sequentially), but the train views are shuffled on each epoch: datasets
+loaded from folders are grouped by category, and training on them in that order
+would give batches of a single category.
+"""
+
+from typing import Iterator, List, Union
+
+import numpy as np
+
+from .dataset import Dataset
+from .dataset_view import DatasetView
+from .datatype import Categorical
+from .ttv_sets import TTVSets
+
+
+def random_split(
+    dataset: "Dataset",
+    test_size: Union[float, int] = 0.2,
+    validation_size: Union[float, int] = 0.0,
+    seed: int = None,
+    name: str = "Dataset",
+) -> "TTVSets":
+    """Randomly splits the rows of `dataset` on train/test/validation sets.
+
+    Sizes can be passed either as a fraction of the dataset rows (float) or as a
+    number of rows (int). The train set gets the remaining rows. If `validation_size`
+    is 0, the validation set will be None.
+    """
+    rng = np.random.default_rng(seed)
+    rows = rng.permutation(dataset.row_count())
+
+    return _split_rows(dataset, [rows], test_size, validation_size, name, rng)
+
+
+def stratified_split(
+    dataset: "Dataset",
+    test_size: Union[float, int] = 0.2,
+    validation_size: Union[float, int] = 0.0,
+    seed: int = None,
+    name: str = "Dataset",
+) -> "TTVSets":
+    """Like `random_split`, but keeping the proportion of each category of the
+    (Categorical) y values on all the sets.
+
+    Raises:
+        ValueError: If the y datatype of `dataset` isn't Categorical.
+    """
+    rng = np.random.default_rng(seed)
+    groups = _shuffled_rows_by_category(dataset, rng)
+
+    return _split_rows(dataset, groups, test_size, validation_size, name, rng)
+
+
+def repeated_random_splits(
+    dataset: "Dataset",
+    repeats: int,
+    test_size: Union[float, int] = 0.2,
+    validation_size: Union[float, int] = 0.0,
+    seed: int = None,
+    stratified: bool = False,
+    name: str = "Dataset",
+) -> Iterator["TTVSets"]:
+    """Generates `repeats` different random splits of `dataset`. The split number `i`
+    is always the same for the same seed."""
+    seed = int(np.random.randint(2 ** 31)) if seed is None else seed
+    split_function = stratified_split if stratified else random_split
+
+    for repeat in range(repeats):
+        yield split_function(
+            dataset,
+            test_size,
+            validation_size,
+            seed=np.random.SeedSequence([seed, repeat]).generate_state(1)[0],
+            name=f"{name} (split {repeat + 1}/{repeats})",
+        )
+
+
+def k_fold(
+    dataset: "Dataset",
+    k: int = 5,
+    validation_size: Union[float, int] = 0.0,
+    seed: int = None,
+    stratified: bool = False,
+    name: str = "Dataset",
+) -> Iterator["TTVSets"]:
+    """Generates the `k` folds of a k-fold cross validation.
+
+    Rows are randomly distributed on `k` folds of (almost) the same size. On each
+    TTVSets, one of the folds is the test set, and the rest are used for training. If
+    `validation_size` is specified, the validation set is taken from the training rows.
+
+    Raises:
+        ValueError: If `k` is lower than 2, or if `stratified` is True and the y
+            datatype of `dataset` isn't Categorical.
+    """
+    if k < 2:
+        raise ValueError(f"At least 2 folds are needed, but k={k}")
+
+    rng = np.random.default_rng(seed)
+
+    if stratified:
+        # Distribute each category between all the folds
+        folds_rows: List[List["np.ndarray"]] = [[] for _ in range(k)]
+        offset = 0
+
+        for category_rows in _shuffled_rows_by_category(dataset, rng):
+            for i, fold_rows in enumerate(np.array_split(category_rows, k)):
+                folds_rows[(i + offset) % k].append(fold_rows)
+
+            offset += len(category_rows) % k
+
+        folds = [np.concatenate(fold_rows) for fold_rows in folds_rows]
+    else:
+        folds = np.array_split(rng.permutation(dataset.row_count()), k)
+
+    for i in range(k):
+        train_rows = np.concatenate(folds[:i] + folds[i + 1 :])
+        rng.shuffle(train_rows)
+
+        validation_count = _count(validation_size, len(train_rows))
+
+        yield TTVSets(
+            f"{name} (fold {i + 1}/{k})",
+            train=_train_view(dataset, train_rows[validation_count:], rng),
+            test=DatasetView(dataset, np.sort(folds[i])),
+            validation=(
+                DatasetView(dataset, np.sort(train_rows[:validation_count]))
+                if validation_count
+                else None
+            ),
+        )
+
+
+def _split_rows(
+    dataset: "Dataset",
+    groups: List["np.ndarray"],
+    test_size: Union[float, int],
+    validation_size: Union[float, int],
+    name: str,
+    rng: "np.random.Generator",
+) -> "TTVSets":
+    """Splits each group of (already shuffled) rows on test/validation/train, and
+    joins the groups of each set."""
+    row_count = sum(len(group) for group in groups)
+
+    test_fraction = _count(test_size, row_count) / max(row_count, 1)
+    validation_fraction = _count(validation_size, row_count) / max(row_count, 1)
+
+    test, validation, train = [], [], []
+
+    for group in groups:
+        test_end = int(round(test_fraction * len(group)))
+        validation_end = test_end + int(round(validation_fraction * len(group)))
+
+        test.append(group[:test_end])
+        validation.append(group[test_end:validation_end])
+        train.append(group[validation_end:])
+
+    def create_view(rows):
+        rows = np.sort(np.concatenate(rows))
+
+        return DatasetView(dataset, rows)
+
+    return TTVSets(
+        name,
+        train=_train_view(dataset, np.concatenate(train), rng),
+        test=create_view(test),
+        validation=create_view(validation) if validation_fraction > 0 else None,
+    )
+
+
+def _train_view(
+    dataset: "Dataset", rows: "np.ndarray", rng: "np.random.Generator"
+) -> "DatasetView":
+    """Returns a view of the (sorted) `rows`, shuffled on each epoch with a seed taken
+    from `rng`."""
+    return DatasetView(
+        dataset, np.sort(rows), shuffle=True, seed=int(rng.integers(2 ** 31))
+    )
+
+
+def _shuffled_rows_by_category(dataset: "Dataset", rng) -> List["np.ndarray"]:
+    """Returns the rows of each category of `dataset`, shuffled."""
+    if not isinstance(dataset.y_type, Categorical):
+        raise ValueError(
+            f"Only Categorical y values can be stratified, not {dataset.y_type}"
+        )
+
+    labels = np.asarray(dataset.y)
+
+    if labels.ndim > 1:
+        # One-hot encoded labels
+        labels = labels.argmax(axis=1)
+
+    return [
+        rng.permutation(np.flatnonzero(labels == category))
+        for category in np.unique(labels)
+    ]
+
+
+def _count(size: Union[float, int], row_count: int) -> int:
+    """Returns `size` as a number of rows. Floats are fractions of `row_count`."""
+    if isinstance(size, float):
+        return int(round(size * row_count))
+
+    return min(int(size), row_count)
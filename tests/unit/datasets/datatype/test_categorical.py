@@ -5,15 +5,50 @@ import pickle
 import numpy as np
 import pytest
 
+from dial_core.datasets.datatype import Categorical
+
 
 @pytest.mark.parametrize("test_input, expected", [(1, [0, 1, 0]), (2, [0, 0, 1])])
 def test_process(categorical_obj, test_input, expected):
     assert categorical_obj.process(test_input).tolist() == expected
 
 
-def test_process_out_of_bounds(categorical_obj):
+@pytest.mark.parametrize("sparse", [False, True])
+@pytest.mark.parametrize("test_input", [100, -1])
+def test_process_out_of_bounds(categorical_obj, test_input, sparse):
+    categorical_obj.sparse = sparse
+
     with pytest.raises(IndexError):
-        categorical_obj.process(100)
+        categorical_obj.process(test_input)
+
+
+def test_process_batch(categorical_obj):
+    assert categorical_obj.process_batch(np.array([2, 0, 1])).tolist() == [
+        [0, 0, 1],
+        [1, 0, 0],
+        [0, 1, 0],
+    ]
+
+
+def test_process_batch_out(categorical_obj):
+    out = np.empty((2, 3), dtype="float32")
+
+    assert categorical_obj.process_batch(np.array([2, 0]), out=out) is out
+    assert out.tolist() == [[0, 0, 1], [1, 0, 0]]
+
+
+@pytest.mark.parametrize("sparse", [False, True])
+@pytest.mark.parametrize("test_input", [[0, 100], [0, -1]])
+def test_process_batch_out_of_bounds(categorical_obj, test_input, sparse):
+    categorical_obj.sparse = sparse
+
+    with pytest.raises(IndexError):
+        categorical_obj.process_batch(np.array(test_input))
+
+    with pytest.raises(IndexError):
+        categorical_obj.process_batch(
+            np.array(test_input), out=np.empty((2, 3), dtype="float32")
+        )
 
 
 @pytest.mark.parametrize(
@@ -58,21 +93,184 @@ def test_str(categorical_obj):
 def test_to_dict(categorical_obj):
     assert categorical_obj.to_dict() == {
         "class": "Categorical",
+        "output_dtype": "float32",
+        "transformations": [],
         "categories": ["t-shirt", "jeans", "glasses"],
+        "sparse": False,
     }
 
 
 def test_from_dict(categorical_obj):
-    categorical_obj.from_dict({"categories": ["a", "b"]})
+    categorical_obj.from_dict({"categories": ["a", "b"], "output_dtype": "float16"})
 
     assert categorical_obj.to_dict() == {
         "class": "Categorical",
+        "output_dtype": "float16",
+        "transformations": [],
         "categories": ["a", "b"],
+        "sparse": False,
     }
 
 
+def test_output_dtype(categorical_obj):
+    categorical_obj.output_dtype = "float16"
+
+    assert categorical_obj.process(1).dtype == np.float16
+    assert categorical_obj.process_batch(np.array([0, 1])).dtype == np.float16
+
+
 def test_pickable(categorical_obj):
     obj = pickle.dumps(categorical_obj)
     pickled_categorical_obj = pickle.loads(obj)
 
     assert categorical_obj.categories == pickled_categorical_obj.categories
+
+
+def test_categories_index_updated(categorical_obj):
+    assert categorical_obj.convert_to_expected_format("jeans") == 1
+
+    categorical_obj.categories = ["jeans", "t-shirt"]
+
+    assert categorical_obj.convert_to_expected_format("jeans") == 0
+
+    with pytest.raises(ValueError):
+        categorical_obj.convert_to_expected_format("glasses")
+
+
+def test_categories_edited_in_place(categorical_obj):
+    assert categorical_obj.convert_to_expected_format("glasses") == 2
+
+    categorical_obj.categories.append("hat")
+    categorical_obj.categories[0] = "shirt"
+
+    assert categorical_obj.convert_to_expected_format("hat") == 3
+    assert categorical_obj.convert_to_expected_format("shirt") == 0
+
+    with pytest.raises(ValueError):
+        categorical_obj.convert_to_expected_format("t-shirt")
+
+
+@pytest.mark.parametrize(
+    "edit, expected",
+    [
+        (lambda categories: categories.__setitem__(0, "hat"), ["hat", "b", "c"]),
+        (lambda categories: categories.__delitem__(0), ["b", "c"]),
+        (lambda categories: categories.__iadd__(["hat"]), ["a", "b", "c", "hat"]),
+        (lambda categories: categories.append("hat"), ["a", "b", "c", "hat"]),
+        (lambda categories: categories.extend(["hat"]), ["a", "b", "c", "hat"]),
+        (lambda categories: categories.insert(0, "hat"), ["hat", "a", "b", "c"]),
+        (lambda categories: categories.pop(0), ["b", "c"]),
+        (lambda categories: categories.remove("a"), ["b", "c"]),
+        (lambda categories: categories.clear(), []),
+        (lambda categories: categories.sort(reverse=True), ["c", "b", "a"]),
+        (lambda categories: categories.reverse(), ["c", "b", "a"]),
+    ],
+)
+def test_category_lookups_cleared_on_edit(edit, expected):
+    categorical = Categorical(["a", "b", "c"])
+
+    categorical.category_index("a")
+    categorical.display_batch(np.array([0]))
+
+    edit(categorical.categories)
+
+    assert categorical.categories == expected
+    assert [categorical.category_index(name) for name in expected] == list(
+        range(len(expected))
+    )
+    assert categorical.display_batch(np.arange(len(expected))).tolist() == expected
+
+
+def test_category_lookups_not_rebuilt():
+    categorical = Categorical(["a", "b", "c"])
+    categorical.category_index("a")
+
+    category_index = categorical._category_index
+
+    assert categorical.category_index("c") == 2
+    assert categorical._category_index is category_index
+
+
+def test_categories_pickled_as_list():
+    categorical = pickle.loads(pickle.dumps(Categorical(["a", "b"])))
+    categorical.category_index("a")
+
+    categorical.categories.append("c")
+
+    assert categorical.category_index("c") == 2
+    assert type(categorical.to_dict()["categories"]) is list
+
+
+def test_categories_copied():
+    categories = ["a", "b"]
+    categorical = Categorical(categories)
+
+    categories.append("c")
+
+    assert categorical.categories == ["a", "b"]
+
+
+@pytest.mark.parametrize(
+    "column, expected",
+    [
+        (np.array(["jeans", "2", "jeans", "t-shirt"]), [1, 2, 1, 0]),
+        (np.array([2, 0, 1]), [2, 0, 1]),
+        (np.array([[2], [0]], dtype="uint8"), [2, 0]),
+        (np.array([[0, 1, 0], [0, 0, 1]]), [1, 2]),
+        (np.array([1.0, 2.0]), [1, 2]),
+        ([[1], "glasses", 0], [1, 2, 0]),
+    ],
+)
+def test_convert_column(categorical_obj, column, expected):
+    assert categorical_obj.convert_column(column).tolist() == expected
+
+
+@pytest.mark.parametrize(
+    "column", [np.array(["jeans", "hats"]), np.array([0, 3]), np.array([0.5])]
+)
+def test_convert_column_invalid(categorical_obj, column):
+    with pytest.raises(ValueError):
+        categorical_obj.convert_column(column)
+
+    assert categorical_obj.convert_column(column, invalid_value=-1).min() == -1
+
+
+def test_sparse(categorical_obj):
+    categorical_obj.sparse = True
+
+    assert categorical_obj.process(2) == 2
+    assert categorical_obj.process_batch(np.array([2, 0, 1])).tolist() == [2, 0, 1]
+    assert categorical_obj.process_batch(np.array([[2], [0]])).dtype == np.int64
+
+    with pytest.raises(IndexError):
+        categorical_obj.process_batch(np.array([0, 3]))
+
+
+def test_sparse_saved(categorical_obj):
+    categorical_obj.sparse = True
+
+    assert categorical_obj.to_dict()["sparse"]
+    assert pickle.loads(pickle.dumps(categorical_obj)).sparse
+    assert Categorical().from_dict(categorical_obj.to_dict()).sparse
+
+
+def test_display_batch(categorical_obj):
+    assert categorical_obj.display_batch(np.array([2, 0])).tolist() == [
+        "glasses",
+        "t-shirt",
+    ]
+
+    with pytest.raises(IndexError):
+        categorical_obj.display_batch(np.array([0, 3]))
+
+
+def test_display_batch_edited_in_place(categorical_obj):
+    assert categorical_obj.display_batch(np.array([0])).tolist() == ["t-shirt"]
+
+    categorical_obj.categories[0] = "shirt"
+    categorical_obj.categories.append("hat")
+
+    assert categorical_obj.display_batch(np.array([3, 0])).tolist() == [
+        "hat",
+        "shirt",
+    ]
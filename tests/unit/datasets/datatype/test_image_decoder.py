@@ -0,0 +1,151 @@
+# vim: ft=python fileencoding=utf-8 sts=4 sw=4 et:
+
+import os
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from dial_core.datasets.datatype import (
+    DataType,
+    ImageDecoder,
+    ImageDecodingError,
+    ImagePath,
+    SampleCache,
+)
+from dial_core.datasets.datatype.image_decoder import read_image
+
+MAIN_PROCESS_PID = os.getpid()
+
+
+def crash_worker(path):
+    """Reads the image on the main process, but crashes on the workers."""
+    if os.getpid() != MAIN_PROCESS_PID:
+        os._exit(1)
+
+    return np.zeros((4, 3), dtype=np.uint8)
+
+
+@pytest.fixture
+def image_paths(tmp_path):
+    paths = []
+    for i in range(5):
+        path = str(tmp_path / f"{i}.png")
+        Image.fromarray(np.full((4, 3), i * 10, dtype=np.uint8)).save(path)
+        paths.append(path)
+
+    return paths
+
+
+@pytest.fixture
+def image_decoder():
+    image_decoder = ImageDecoder(workers=2)
+    yield image_decoder
+    image_decoder.shutdown()
+
+
+def test_decode(image_decoder, image_paths):
+    batch = image_decoder.decode(image_paths)
+
+    assert batch.shape == (5, 4, 3)
+    assert batch.dtype == np.uint8
+    assert batch[:, 0, 0].tolist() == [0, 10, 20, 30, 40]
+
+
+def test_decode_empty(image_decoder):
+    assert len(image_decoder.decode([])) == 0
+
+
+def test_decode_different_shapes(image_decoder, image_paths, tmp_path):
+    path = str(tmp_path / "big.png")
+    Image.fromarray(np.zeros((8, 8), dtype=np.uint8)).save(path)
+
+    with pytest.raises(ImageDecodingError):
+        image_decoder.decode(image_paths + [path])
+
+
+def test_decode_missing_file(image_decoder, image_paths):
+    with pytest.raises(ImageDecodingError):
+        image_decoder.decode(image_paths + ["not-exists.png"])
+
+
+def test_worker_crash(image_paths):
+    image_decoder = ImageDecoder(workers=1, read_function=crash_worker)
+
+    with pytest.raises(ImageDecodingError):
+        image_decoder.decode(image_paths)
+
+
+def test_imagepath_with_decoder(image_decoder, image_paths):
+    imagepath = ImagePath()
+    imagepath.decoder = image_decoder
+
+    batch = imagepath.process_batch(np.array(image_paths))
+
+    assert batch.shape == (5, 4, 3)
+    assert np.allclose(batch[:, 0, 0], [0, 10 / 255, 20 / 255, 30 / 255, 40 / 255])
+
+
+def test_imagepath_with_decoder_and_cache(image_decoder, image_paths):
+    imagepath = ImagePath()
+    imagepath.decoder = image_decoder
+    imagepath.cache = SampleCache()
+
+    imagepath.display(image_paths[2])
+
+    batch = imagepath.display_batch(np.array(image_paths))
+
+    assert batch[:, 0, 0].tolist() == [0, 10, 20, 30, 40]
+    assert imagepath.cache.hits == 1
+    assert len(imagepath.cache) == 5
+
+
+@pytest.fixture
+def jpeg_path(tmp_path):
+    path = str(tmp_path / "wide.jpg")
+    Image.fromarray(np.full((400, 800, 3), 200, dtype=np.uint8)).save(path)
+
+    return path
+
+
+@pytest.mark.parametrize("resize_mode", ["stretch", "crop", "pad"])
+def test_read_image_resized(jpeg_path, resize_mode):
+    image = read_image(jpeg_path, target_size=(50, 60), resize_mode=resize_mode)
+
+    assert image.shape == (50, 60, 3)
+
+
+def test_read_image_pad(jpeg_path):
+    image = read_image(jpeg_path, target_size=(60, 60), resize_mode="pad")
+
+    # The 2:1 image is fitted on the middle rows
+    assert image[0, 30].tolist() == [0, 0, 0]
+    assert abs(int(image[30, 30, 0]) - 200) <= 2
+
+
+def test_read_image_invalid_options(jpeg_path):
+    with pytest.raises(ValueError):
+        read_image(jpeg_path, target_size=(10, 10), resize_mode="fill")
+
+    with pytest.raises(ValueError):
+        read_image(jpeg_path, target_size=(10, 10), interpolation="magic")
+
+
+def test_imagepath_target_size(image_decoder, image_paths, jpeg_path):
+    imagepath = ImagePath(target_size=(8, 8), resize_mode="crop")
+    imagepath.decoder = image_decoder
+
+    assert imagepath.display(jpeg_path).shape == (8, 8, 3)
+    assert imagepath.process_batch(np.array(image_paths)).shape == (5, 8, 8)
+
+
+def test_imagepath_target_size_saved():
+    imagepath = ImagePath(
+        target_size=(8, 6), resize_mode="pad", interpolation="nearest"
+    )
+
+    new_imagepath = DataType.create(imagepath.to_dict())
+
+    assert new_imagepath.target_size == (8, 6)
+    assert new_imagepath.resize_mode == "pad"
+    assert new_imagepath.interpolation == "nearest"
@@ -11,7 +11,38 @@ import pytest
     [(np.array([1, 2, 3]), np.array([1 / 255, 2 / 255, 3 / 255]))],
 )
 def test_process(imagearray_obj, test_input, expected):
-    assert np.alltrue(imagearray_obj.process(test_input) == expected)
+    processed = imagearray_obj.process(test_input)
+
+    assert processed.dtype == np.float32
+    assert np.allclose(processed, expected)
+
+
+def test_process_batch(imagearray_obj):
+    batch = np.array([[[0, 255], [255, 0]], [[51, 51], [51, 51]]], dtype=np.uint8)
+
+    processed_batch = imagearray_obj.process_batch(batch)
+
+    assert processed_batch.shape == (2, 2, 2, 1)
+    assert np.allclose(processed_batch[..., 0], batch / 255.0)
+
+
+def test_process_batch_out(imagearray_obj):
+    batch = np.array([[[0, 255], [255, 0]]], dtype=np.uint8)
+    out = np.empty((1, 2, 2, 1), dtype="float32")
+
+    assert imagearray_obj.process_batch(batch, out=out) is out
+    assert out[..., 0].tolist() == [[[0, 1], [1, 0]]]
+
+
+def test_process_batch_irregular_shapes(imagearray_obj):
+    batch = np.empty(2, dtype=object)
+    batch[0] = np.zeros((2, 2))
+    batch[1] = np.zeros((3, 3))
+
+    processed_batch = imagearray_obj.process_batch(batch)
+
+    assert processed_batch[0].shape == (2, 2, 1)
+    assert processed_batch[1].shape == (3, 3, 1)
 
 
 @pytest.mark.parametrize("input_output", [(np.array([1, 2, 3]))])
@@ -26,3 +57,20 @@ def test_convert_to_expected_format(imagearray_obj):
 def test_pickable(imagearray_obj):
     obj = pickle.dumps(imagearray_obj)
     pickle.loads(obj)
+
+
+def test_output_dtype_uint8(imagearray_obj):
+    imagearray_obj.output_dtype = "uint8"
+
+    batch = np.array([[[0, 255]]], dtype=np.uint8)
+
+    assert imagearray_obj.process_batch(batch).tolist() == [[[[0], [255]]]]
+
+
+def test_output_dtype_saved(imagearray_obj):
+    imagearray_obj.output_dtype = "float16"
+
+    pickled_imagearray_obj = pickle.loads(pickle.dumps(imagearray_obj))
+
+    assert imagearray_obj.to_dict()["output_dtype"] == "float16"
+    assert pickled_imagearray_obj.output_dtype == "float16"
@@ -0,0 +1,114 @@
+# vim: ft=python fileencoding=utf-8 sts=4 sw=4 et:
+
+import os
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from dial_core.datasets.datatype import ImagePath, MemmapImageCache
+
+
+@pytest.fixture
+def image_paths(tmp_path):
+    """Returns a list of images with different shapes and modes."""
+    images = [
+        np.full((2, 3), 1, dtype=np.uint8),
+        np.full((4, 4, 3), 2, dtype=np.uint8),
+        np.full((1, 5), 3, dtype=np.uint8),
+    ]
+
+    paths = []
+    for i, image in enumerate(images):
+        path = str(tmp_path / f"{i}.png")
+        Image.fromarray(image).save(path)
+        paths.append(path)
+
+    return paths
+
+
+@pytest.fixture
+def memmap_cache(tmp_path):
+    return MemmapImageCache(str(tmp_path / "cache"))
+
+
+def test_build_and_open(memmap_cache, image_paths):
+    assert not memmap_cache.is_built(image_paths)
+    assert memmap_cache.open(image_paths) is None
+
+    memmap_cache.build(image_paths)
+
+    assert memmap_cache.is_built(image_paths)
+
+    packed_images = memmap_cache.open(image_paths)
+
+    assert len(packed_images) == 3
+    assert packed_images[0].tolist() == np.full((2, 3), 1).tolist()
+    assert packed_images.get(image_paths[1]).shape == (4, 4, 3)
+    assert packed_images.get(image_paths[2]).tolist() == [[3, 3, 3, 3, 3]]
+    assert packed_images.get("not-cached.png") is None
+
+
+def test_images_are_views_of_the_memmap(memmap_cache, image_paths):
+    memmap_cache.build(image_paths)
+    packed_images = memmap_cache.open(image_paths)
+
+    assert np.shares_memory(packed_images[1], packed_images.data)
+    assert not packed_images[1].flags.writeable
+
+
+def test_build_with_workers(memmap_cache, image_paths):
+    memmap_cache.build(image_paths, workers=2)
+
+    assert memmap_cache.open(image_paths)[1].tolist() == np.full((4, 4, 3), 2).tolist()
+
+
+def test_build_twice(memmap_cache, image_paths):
+    memmap_cache.build(image_paths)
+    memmap_cache.build(image_paths)
+
+    assert len(os.listdir(memmap_cache.cache_dir)) == 1
+
+
+def test_cache_invalidated_on_file_change(memmap_cache, image_paths):
+    memmap_cache.build(image_paths)
+
+    stat = os.stat(image_paths[0])
+    os.utime(image_paths[0], ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+
+    assert not memmap_cache.is_built(image_paths)
+    assert memmap_cache.open(image_paths) is None
+
+
+def test_outdated_caches_removed(memmap_cache, image_paths):
+    memmap_cache.build(image_paths)
+    old_images = memmap_cache.open(image_paths)
+
+    # Other directories on the cache root aren't caches
+    os.makedirs(os.path.join(memmap_cache.cache_dir, "32x32-fit-bilinear"))
+
+    Image.fromarray(np.full((3, 3), 7, dtype=np.uint8)).save(image_paths[0])
+    stat = os.stat(image_paths[0])
+    os.utime(image_paths[0], ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+
+    memmap_cache.build(image_paths)
+
+    assert sorted(os.listdir(memmap_cache.cache_dir)) == sorted(
+        ["32x32-fit-bilinear", memmap_cache.fingerprint(image_paths)]
+    )
+    assert memmap_cache.open(image_paths)[0].tolist() == np.full((3, 3), 7).tolist()
+
+    # Already opened caches can still be read
+    assert old_images[0].tolist() == np.full((2, 3), 1).tolist()
+
+
+def test_imagepath_load_memmap_cache(memmap_cache, image_paths):
+    imagepath = ImagePath()
+    imagepath.load_memmap_cache(image_paths, memmap_cache.cache_dir)
+
+    assert memmap_cache.is_built(image_paths)
+
+    image = imagepath.display(image_paths[0])
+
+    assert np.shares_memory(image, imagepath.packed_images.data)
+    assert np.allclose(imagepath.process(image_paths[0]), np.full((2, 3), 1 / 255))
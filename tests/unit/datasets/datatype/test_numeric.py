@@ -2,6 +2,7 @@
 
 import pickle
 
+import numpy as np
 import pytest
 
 
@@ -10,6 +11,13 @@ def test_process(numeric_obj, test_input, expected):
     assert numeric_obj.process(test_input) == expected
 
 
+def test_process_batch(numeric_obj):
+    batch = numeric_obj.process_batch(np.array([1, 2, 3]))
+
+    assert batch.tolist() == [1, 2, 3]
+    assert batch.dtype == np.float32
+
+
 @pytest.mark.parametrize("test_input, expected", [(0, "0"), (1, "1")])
 def test_display(numeric_obj, test_input, expected):
     assert numeric_obj.display(test_input) == expected
@@ -13,6 +13,12 @@ def test_process(numericarray_obj, test_input, expected):
     assert np.alltrue(numericarray_obj.process(test_input) == expected)
 
 
+def test_process_batch(numericarray_obj):
+    batch = np.array([[1, 2], [3, 4]])
+
+    assert numericarray_obj.process_batch(batch).tolist() == [[1, 2], [3, 4]]
+
+
 @pytest.mark.parametrize("test_input, expected", [(np.array([1, 2]), "[1, 2]")])
 def test_display(numericarray_obj, test_input, expected):
     assert numericarray_obj.display(test_input) == expected
@@ -25,3 +31,32 @@ def test_convert_to_expected_format(numericarray_obj):
 def test_pickable(numericarray_obj):
     obj = pickle.dumps(numericarray_obj)
     pickle.loads(obj)
+
+
+def test_process_batch_out(numericarray_obj):
+    out = np.empty((2, 2), dtype="float32")
+
+    result = numericarray_obj.process_batch(np.array([[1, 2], [3, 4]]), out=out)
+
+    assert result is out
+    assert out.tolist() == [[1, 2], [3, 4]]
+
+
+def test_process_batch_out_wrong_shape(numericarray_obj):
+    with pytest.raises(ValueError):
+        numericarray_obj.process_batch(
+            np.array([[1, 2], [3, 4]]), out=np.empty((2, 3), dtype="float32")
+        )
+
+
+def test_display_batch(numericarray_obj):
+    batch = np.array([[1.5, 2.0], [-2.123456, 3], [1e-9, 12]])
+
+    assert numericarray_obj.display_batch(batch).tolist() == [
+        "[1.5, 2. ]",
+        "[-2.1235,  3.    ]",
+        "[ 0., 12.]",
+    ]
+
+    # Long arrays are summarized
+    assert ", ..., " in numericarray_obj.display(np.arange(2000))
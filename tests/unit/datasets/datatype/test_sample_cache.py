@@ -0,0 +1,111 @@
+# vim: ft=python fileencoding=utf-8 sts=4 sw=4 et:
+
+import os
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from dial_core.datasets import Dataset
+from dial_core.datasets.datatype import ImagePath, Numeric, SampleCache
+
+
+@pytest.fixture
+def sample_cache():
+    """Returns a cache with room for 3 samples of 10 bytes."""
+    return SampleCache(max_bytes=30)
+
+
+def sample(value):
+    return np.full(10, value, dtype=np.uint8)
+
+
+def test_get_and_put(sample_cache):
+    assert sample_cache.get("a") is None
+
+    sample_cache.put("a", sample(1))
+
+    assert sample_cache.get("a").tolist() == sample(1).tolist()
+    assert sample_cache.hits == 1
+    assert sample_cache.misses == 1
+    assert sample_cache.nbytes == 10
+
+
+def test_cached_samples_are_read_only(sample_cache):
+    sample_cache.put("a", sample(1))
+
+    with pytest.raises(ValueError):
+        sample_cache.get("a")[0] = 5
+
+
+def test_lru_eviction(sample_cache):
+    for key in ["a", "b", "c"]:
+        sample_cache.put(key, sample(1))
+
+    # "a" is now the most recently used
+    sample_cache.get("a")
+
+    sample_cache.put("d", sample(1))
+
+    assert "b" not in sample_cache
+    assert "a" in sample_cache
+    assert sample_cache.evictions == 1
+    assert sample_cache.nbytes == 30
+
+
+def test_samples_bigger_than_budget_are_ignored(sample_cache):
+    sample_cache.put("a", np.zeros(100, dtype=np.uint8))
+
+    assert len(sample_cache) == 0
+
+
+def test_get_or_load(sample_cache):
+    assert sample_cache.get_or_load("a", lambda: sample(2)).tolist() == [2] * 10
+    assert sample_cache.get_or_load("a", lambda: sample(3)).tolist() == [2] * 10
+
+    assert sample_cache.hits == 1
+    assert sample_cache.misses == 1
+
+
+def test_clear(sample_cache):
+    sample_cache.put("a", sample(1))
+    sample_cache.clear()
+
+    assert len(sample_cache) == 0
+    assert sample_cache.nbytes == 0
+
+
+def test_imagepath_cache_shared_between_roles(tmp_path):
+    path = str(tmp_path / "image.png")
+    Image.fromarray(np.full((2, 2), 255, dtype=np.uint8)).save(path)
+
+    imagepath = ImagePath()
+    imagepath.cache = SampleCache()
+
+    dataset = Dataset(np.array([path]), np.array([0]), imagepath, Numeric())
+
+    x, _ = dataset.head(1, Dataset.Role.Display)
+    assert x.tolist() == [[[255, 255], [255, 255]]]
+
+    x, _ = dataset.head(1, Dataset.Role.Raw)
+    assert x.tolist() == [[[1, 1], [1, 1]]]
+
+    assert imagepath.cache.misses == 1
+    assert imagepath.cache.hits == 1
+
+
+def test_imagepath_cache_modified_file(tmp_path):
+    path = str(tmp_path / "image.png")
+    Image.fromarray(np.zeros((2, 2), dtype=np.uint8)).save(path)
+
+    imagepath = ImagePath()
+    imagepath.cache = SampleCache()
+
+    imagepath.display(path)
+
+    Image.fromarray(np.ones((2, 2), dtype=np.uint8)).save(path)
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+
+    assert imagepath.display(path).tolist() == [[1, 1], [1, 1]]
+    assert imagepath.cache.misses == 2
@@ -0,0 +1,121 @@
+# vim: ft=python fileencoding=utf-8 sts=4 sw=4 et:
+
+import json
+import pickle
+
+import numpy as np
+import pytest
+
+from dial_core.datasets.datatype import (
+    Cast,
+    ChannelScale,
+    Clip,
+    DataType,
+    Normalize,
+    Reshape,
+    Scale,
+    Transformation,
+)
+from dial_core.datasets.datatype.datatype import TransformationPipeline
+
+
+@pytest.mark.parametrize(
+    "transformation, expected",
+    [
+        (Scale(2, offset=1), [[1, 3], [5, 7]]),
+        (Normalize(mean=1, std=2), [[-0.5, 0], [0.5, 1]]),
+        (ChannelScale([1, 10]), [[0, 10], [2, 30]]),
+        (Clip(1, 2), [[1, 1], [2, 2]]),
+        (Reshape((2, 1)), [[[0], [1]], [[2], [3]]]),
+        (Cast("uint8"), [[0, 1], [2, 3]]),
+    ],
+)
+def test_apply_batch(transformation, expected):
+    batch = np.array([[0, 1], [2, 3]], dtype="float32")
+
+    assert transformation.apply_batch(batch).tolist() == expected
+
+    # The batch isn't modified
+    assert batch.tolist() == [[0, 1], [2, 3]]
+
+
+def test_call_single_sample():
+    assert Normalize(mean=[0, 1], std=2)(np.array([4, 5])).tolist() == [2, 2]
+    assert Scale(3)(2) == 6
+
+
+def test_integer_batch_to_float():
+    result = Scale(1 / 255).apply_batch(np.array([[0, 255]], dtype="uint8"))
+
+    assert result.dtype == np.float32
+    assert result.tolist() == [[0, 1]]
+
+
+def test_pipeline_fuses_affine_transformations():
+    pipeline = TransformationPipeline([Scale(2), Normalize(mean=1, std=2), Clip(0)])
+
+    assert len(pipeline._steps) == 2
+
+    batch = np.array([0.0, 1.0, 2.0])
+
+    assert pipeline(batch).tolist() == [0, 0.5, 1.5]
+    assert batch.tolist() == [0, 1, 2]
+
+
+def test_pipeline_with_callables():
+    pipeline = TransformationPipeline([Scale(2), lambda x: x + 1, Clip(max_value=4)])
+
+    assert pipeline(np.array([0, 1, 2])).tolist() == [1, 3, 4]
+
+
+def test_datatype_transformations(numericarray_obj):
+    numericarray_obj.transformations = [Normalize(mean=[1, 2], std=[1, 2])]
+
+    batch = numericarray_obj.process_batch(np.array([[1, 2], [3, 6]]))
+
+    assert batch.dtype == np.float32
+    assert batch.tolist() == [[0, 0], [2, 2]]
+    assert numericarray_obj.process(np.array([2, 4])).tolist() == [1, 1]
+
+
+@pytest.mark.parametrize(
+    "transformation",
+    [
+        Scale(2, offset=1),
+        Normalize(mean=[1, 2], std=[3, 4]),
+        ChannelScale([1, 10]),
+        Clip(max_value=3),
+        Reshape((2, -1)),
+        Cast("uint8"),
+    ],
+)
+def test_to_dict_round_trip(transformation):
+    dc = json.loads(json.dumps(transformation.to_dict()))
+
+    assert Transformation.create(dc) == transformation
+
+
+def test_create_unknown_transformation():
+    with pytest.raises(ValueError):
+        Transformation.create({"class": "Foo"})
+
+
+def test_datatype_saves_transformations(numericarray_obj):
+    numericarray_obj.transformations = [Scale(2), Clip(0, 3), lambda x: x]
+
+    dc = numericarray_obj.to_dict()
+
+    assert dc["transformations"] == [Scale(2).to_dict(), Clip(0, 3).to_dict()]
+
+    new_obj = DataType.create(dc)
+
+    assert new_obj.transformations == [Scale(2), Clip(0, 3)]
+    assert new_obj.process_batch(np.array([[1, 2]])).tolist() == [[2, 3]]
+
+
+def test_pickled_transformations(numericarray_obj):
+    numericarray_obj.transformations = [Normalize(mean=1)]
+
+    new_obj = pickle.loads(pickle.dumps(numericarray_obj))
+
+    assert new_obj.process_batch(np.array([[1, 2]])).tolist() == [[0, 1]]
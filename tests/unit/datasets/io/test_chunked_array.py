@@ -0,0 +1,106 @@
+# vim: ft=python fileencoding=utf-8 sts=4 sw=4 et:
+
+import os
+import pickle
+
+import numpy as np
+import pytest
+
+from dial_core.datasets import Dataset
+from dial_core.datasets.datatype import NumericArray
+from dial_core.datasets.io import ChunkedArray
+from dial_core.datasets.io.chunked_array import write_chunked
+
+
+@pytest.fixture
+def array():
+    return np.arange(50 * 3, dtype=np.float32).reshape(50, 3)
+
+
+@pytest.fixture(params=["zlib", "lzma", "none"])
+def chunked_array(request, tmp_path, array):
+    path = str(tmp_path / "array.chunks")
+    write_chunked(path, array, chunk_rows=8, compression=request.param, workers=2)
+
+    return ChunkedArray(path, workers=2)
+
+
+def test_metadata(chunked_array, array):
+    assert len(chunked_array) == 50
+    assert chunked_array.shape == array.shape
+    assert chunked_array.dtype == array.dtype
+    assert chunked_array.chunk_count == 7
+
+
+def test_indexing(chunked_array, array):
+    assert np.array_equal(chunked_array[9], array[9])
+    assert np.array_equal(chunked_array[-1], array[-1])
+
+    assert np.array_equal(chunked_array[:], array)
+    assert np.array_equal(chunked_array[10:12], array[10:12])
+    assert np.array_equal(chunked_array[5:30], array[5:30])
+    assert np.array_equal(chunked_array[::7], array[::7])
+    assert np.array_equal(chunked_array[[40, 1, 40, 17]], array[[40, 1, 40, 17]])
+    assert np.array_equal(chunked_array[array[:, 0] > 100], array[array[:, 0] > 100])
+    assert np.array_equal(chunked_array[3:5, 1], array[3:5, 1])
+    assert np.array_equal(np.asarray(chunked_array), array)
+
+    with pytest.raises(IndexError):
+        chunked_array[50]
+
+
+def test_chunks_cached(chunked_array):
+    chunked_array[0:4]
+    chunked_array[4:8]
+
+    assert chunked_array.cache.misses == 1
+    assert chunked_array.cache.hits == 1
+
+    with pytest.raises(ValueError):
+        chunked_array[0:4][0, 0] = 1
+
+
+def test_dataset_column(chunked_array, array):
+    dataset = Dataset(chunked_array, np.zeros(50), x_type=NumericArray(), batch_size=8)
+
+    assert np.array_equal(dataset[2][0], array[16:24])
+
+    unpickled_dataset = pickle.loads(pickle.dumps(dataset))
+
+    assert isinstance(unpickled_dataset.x, ChunkedArray)
+    assert len(unpickled_dataset.x.cache) == 0
+    assert np.array_equal(unpickled_dataset[6][0], array[48:])
+
+    dataset.delete_rows(0, 10)
+
+    assert np.array_equal(dataset.x, array[10:])
+
+
+def test_compression(tmp_path):
+    array = np.tile(np.arange(256, dtype=np.uint8), (1000, 4))
+
+    write_chunked(str(tmp_path / "array.chunks"), array, chunk_rows=100)
+
+    assert ChunkedArray(str(tmp_path / "array.chunks")).compressed_nbytes < (
+        array.nbytes / 10
+    )
+
+
+def test_invalid_file(tmp_path):
+    (tmp_path / "array.chunks").write_bytes(b"not an array")
+
+    with pytest.raises(ValueError):
+        ChunkedArray(str(tmp_path / "array.chunks"))
+
+
+def test_rewrite_while_open(tmp_path, array):
+    path = str(tmp_path / "array.chunks")
+    write_chunked(path, array, chunk_rows=8)
+
+    old_array = ChunkedArray(path)
+
+    write_chunked(path, array[::-1] * 2, chunk_rows=5)
+
+    assert np.array_equal(old_array[40], array[40])
+    assert np.array_equal(ChunkedArray(path)[40], array[9] * 2)
+    assert sorted(os.listdir(tmp_path)) == ["array.chunks"]
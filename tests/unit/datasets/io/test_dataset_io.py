@@ -1,9 +1,22 @@
 # vim: ft=python fileencoding=utf-8 sts=4 sw=4 et:
 
 import os
+import pickle
 from unittest.mock import patch
 
-from dial_core.datasets.io import NpzDatasetIO, TxtDatasetIO
+import numpy as np
+import pytest
+
+from dial_core.datasets import TTVSets
+from dial_core.datasets.datatype import Categorical, Numeric
+from dial_core.datasets.io import (
+    ChunkedArray,
+    ChunkedDatasetIO,
+    NpyDatasetIO,
+    NpzDatasetIO,
+    TTVSetsIO,
+    TxtDatasetIO,
+)
 
 
 @patch("dial_core.datasets.io.dataset_io.np")
@@ -48,8 +61,8 @@ def test_npz_load(mock_np, train_dataset):
     assert loaded_dataset.y.tolist() == train_dataset.y.tolist()
 
 
-@patch("dial_core.datasets.io.dataset_io.np")
-def test_txt_save(mock_np, train_dataset):
+@patch("dial_core.datasets.io.dataset_io.write_text")
+def test_txt_save(mock_write_text, train_dataset):
     x_filename = "x_train.txt"
     y_filename = "y_train.txt"
     parent_dir = "foo"
@@ -61,19 +74,21 @@ def test_txt_save(mock_np, train_dataset):
         .save(parent_dir, train_dataset)
     )
 
-    calls_list = mock_np.savetxt.call_args_list
+    calls_list = mock_write_text.call_args_list
 
     assert calls_list[0][0] == (os.path.join(parent_dir, x_filename), train_dataset.x,)
     assert calls_list[1][0] == (os.path.join(parent_dir, y_filename), train_dataset.y,)
 
     assert dataset_description["x_filename"] == x_filename
     assert dataset_description["y_filename"] == y_filename
+    assert dataset_description["x_shape"] == list(train_dataset.x.shape)
+    assert dataset_description["y_dtype"] == train_dataset.y.dtype.str
     assert dataset_description["x_type"] == train_dataset.x_type.to_dict()
     assert dataset_description["y_type"] == train_dataset.y_type.to_dict()
 
 
-@patch("dial_core.datasets.io.dataset_io.np")
-def test_txt_load(mock_np, train_dataset):
+@patch("dial_core.datasets.io.dataset_io.read_text")
+def test_txt_load(mock_read_text, train_dataset):
     parent_dir = "foo"
 
     dataset_description = {
@@ -83,13 +98,13 @@ def test_txt_load(mock_np, train_dataset):
         "y_type": train_dataset.y_type.to_dict(),
     }
 
-    mock_np.loadtxt.side_effect = [train_dataset.x, train_dataset.y]
+    mock_read_text.side_effect = [train_dataset.x, train_dataset.y]
 
     loaded_dataset = (
         TxtDatasetIO().set_description(dataset_description).load(parent_dir)
     )
 
-    calls_list = mock_np.loadtxt.call_args_list
+    calls_list = mock_read_text.call_args_list
     assert calls_list[0][0] == (
         os.path.join(parent_dir, dataset_description["x_filename"]),
     )
@@ -99,3 +114,140 @@ def test_txt_load(mock_np, train_dataset):
 
     assert loaded_dataset.x.tolist() == train_dataset.x.tolist()
     assert loaded_dataset.y.tolist() == train_dataset.y.tolist()
+
+
+def test_datatypes_memoized(train_dataset):
+    dataset_io = NpzDatasetIO().set_description(
+        {
+            "filename": "filename.npz",
+            "x_type": train_dataset.x_type.to_dict(),
+            "y_type": train_dataset.y_type.to_dict(),
+        }
+    )
+
+    x_type = dataset_io.get_x_type()
+    y_type = dataset_io.get_y_type()
+
+    assert dataset_io.get_x_type() is x_type
+    assert dataset_io.get_y_type() is y_type
+
+    # Only the changed datatype is built again
+    dataset_io.set_x_type(Numeric())
+
+    assert dataset_io.get_x_type() is not x_type
+    assert str(dataset_io.get_x_type()) == "Numeric"
+    assert dataset_io.get_y_type() is y_type
+
+    dataset_io.set_description(dataset_io.get_description())
+
+    assert dataset_io.get_y_type() is not y_type
+
+
+def test_loaded_datatypes_not_shared(tmp_path, train_dataset):
+    train_dataset.y_type = Categorical(["a", "b", "c", "d"])
+
+    dataset_io = NpzDatasetIO()
+    dataset_io.save(str(tmp_path), train_dataset)
+
+    dataset_a = dataset_io.load(str(tmp_path))
+    dataset_b = dataset_io.load(str(tmp_path))
+
+    assert dataset_a.y_type is not dataset_b.y_type
+    assert dataset_a.x_type is not dataset_b.x_type
+
+    dataset_a.y_type.categories.append("e")
+    dataset_a.y_type.sparse = True
+
+    dataset_c = dataset_io.load(str(tmp_path))
+
+    assert dataset_c.y_type.categories == ["a", "b", "c", "d"]
+    assert not dataset_c.y_type.sparse
+    assert dataset_io.get_description()["y_type"] == dataset_c.y_type.to_dict()
+
+
+def test_npy_save_load(tmp_path, train_dataset):
+    dataset_description = NpyDatasetIO().save(str(tmp_path), train_dataset)
+
+    assert dataset_description["x_shape"] == [3, 3]
+    assert dataset_description["y_shape"] == [3]
+    assert np.dtype(dataset_description["x_dtype"]) == train_dataset.x.dtype
+
+    loaded_dataset = (
+        NpyDatasetIO().set_description(dataset_description).load(str(tmp_path))
+    )
+
+    assert isinstance(loaded_dataset.x, np.memmap)
+    assert loaded_dataset.x.tolist() == train_dataset.x.tolist()
+    assert loaded_dataset.y.tolist() == train_dataset.y.tolist()
+    assert str(loaded_dataset.x_type) == str(train_dataset.x_type)
+
+    # Workers receive the location of the files, not their data
+    unpickled_dataset = pickle.loads(pickle.dumps(loaded_dataset))
+
+    assert isinstance(unpickled_dataset.x, np.memmap)
+    assert unpickled_dataset.x.tolist() == train_dataset.x.tolist()
+
+    # Modifying the rows doesn't write on the mapped files
+    loaded_dataset.delete_rows(0)
+    assert np.load(os.path.join(tmp_path, "x.npy")).tolist() == train_dataset.x.tolist()
+
+
+def test_npy_description_mismatch(tmp_path, train_dataset):
+    dataset_io = NpyDatasetIO()
+    dataset_io.save(str(tmp_path), train_dataset)
+
+    np.save(os.path.join(tmp_path, "y.npy"), np.array([1.0, 2.0]))
+
+    with pytest.raises(ValueError):
+        dataset_io.load(str(tmp_path))
+
+
+def test_npy_ttv_sets(tmp_path, train_dataset):
+    description_path = os.path.join(tmp_path, "description.json")
+
+    TTVSetsIO.save_to_file(
+        description_path, NpyDatasetIO(), TTVSets("foo", train_dataset)
+    )
+
+    ttv_sets = TTVSetsIO.load_from_file(description_path)
+
+    assert ttv_sets.train.y.tolist() == train_dataset.y.tolist()
+    assert isinstance(ttv_sets.train.y, np.memmap)
+
+
+def test_chunked_save_load(tmp_path, train_dataset):
+    dataset_io = ChunkedDatasetIO().set_compression("lzma").set_chunk_rows(2)
+    dataset_description = dataset_io.save(str(tmp_path), train_dataset)
+
+    assert dataset_description["x_shape"] == [3, 3]
+
+    loaded_dataset = (
+        ChunkedDatasetIO().set_description(dataset_description).load(str(tmp_path))
+    )
+
+    assert isinstance(loaded_dataset.x, ChunkedArray)
+    assert loaded_dataset.x.compression == "lzma"
+    assert loaded_dataset.x.tolist() == train_dataset.x.tolist()
+    assert loaded_dataset.y.tolist() == train_dataset.y.tolist()
+
+    dataset_description["y_dtype"] = np.dtype(np.float16).str
+
+    with pytest.raises(ValueError):
+        ChunkedDatasetIO().set_description(dataset_description).load(str(tmp_path))
+
+
+def test_txt_save_load(tmp_path, train_dataset):
+    train_dataset.x = np.arange(24, dtype=np.float32).reshape(3, 2, 4) / 7
+
+    dataset_description = (
+        TxtDatasetIO().set_delimiter(",").save(str(tmp_path), train_dataset)
+    )
+
+    loaded_dataset = (
+        TxtDatasetIO().set_description(dataset_description).load(str(tmp_path))
+    )
+
+    assert loaded_dataset.x.shape == (3, 2, 4)
+    assert loaded_dataset.x.dtype == np.float32
+    assert np.array_equal(loaded_dataset.x, train_dataset.x)
+    assert loaded_dataset.y.tolist() == train_dataset.y.tolist()
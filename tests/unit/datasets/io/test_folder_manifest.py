@@ -0,0 +1,168 @@
+# vim: ft=python fileencoding=utf-8 sts=4 sw=4 et:
+
+import json
+import os
+from unittest.mock import patch
+
+import pytest
+
+from dial_core.datasets.datatype import Categorical, ImagePath
+from dial_core.datasets.io import CategoricalImgDatasetIO, NpzDatasetIO
+from dial_core.datasets.io import dataset_io as dataset_io_module
+from dial_core.datasets.io.folder_manifest import FolderManifest
+
+
+@pytest.fixture(autouse=True)
+def trust_recent_mtimes(monkeypatch):
+    # The test directories have just been created
+    monkeypatch.setattr(FolderManifest, "RacyInterval", 0)
+
+
+@pytest.fixture
+def dataset_dir(tmp_path):
+    dataset_dir = tmp_path / "train"
+
+    for category, count in (("cat", 3), ("dog", 2)):
+        (dataset_dir / category).mkdir(parents=True)
+
+        for i in range(count):
+            (dataset_dir / category / f"{i}.png").touch()
+
+    return dataset_dir
+
+
+def load(dataset_dir, categories=["cat", "dog"]):
+    dataset_io = CategoricalImgDatasetIO()
+    dataset_io.set_x_type(ImagePath()).set_y_type(Categorical(categories))
+
+    with patch.object(
+        dataset_io_module, "_list_entries", wraps=dataset_io_module._list_entries
+    ) as list_entries:
+        dataset = dataset_io.load(str(dataset_dir))
+
+    listed = [os.path.basename(call[0][0]) for call in list_entries.call_args_list]
+
+    return dataset, listed
+
+
+def test_manifest_reused(dataset_dir):
+    dataset, listed = load(dataset_dir)
+
+    assert sorted(listed) == ["cat", "dog", "train"]
+    assert os.path.isfile(CategoricalImgDatasetIO().manifest_path(str(dataset_dir)))
+
+    reloaded, listed = load(dataset_dir)
+
+    assert listed == []
+    assert reloaded.x.tolist() == dataset.x.tolist()
+    assert reloaded.y.tolist() == [0, 0, 0, 1, 1]
+
+
+def test_only_modified_directories_scanned(dataset_dir):
+    load(dataset_dir)
+
+    (dataset_dir / "dog" / "2.png").touch()
+
+    dataset, listed = load(dataset_dir)
+
+    assert listed == ["dog"]
+    assert dataset.x[-1] == str(dataset_dir / "dog" / "2.png")
+    assert dataset.y.tolist() == [0, 0, 0, 1, 1, 1]
+
+
+def test_new_categories_scanned(dataset_dir):
+    load(dataset_dir)
+
+    (dataset_dir / "bird").mkdir()
+    (dataset_dir / "bird" / "0.png").touch()
+
+    dataset, listed = load(dataset_dir, ["bird", "cat", "dog"])
+
+    assert sorted(listed) == ["bird", "cat", "dog", "train"]
+    assert dataset.y.tolist() == [0, 1, 1, 1, 2, 2]
+
+
+def test_manifest_beside_description_file(tmp_path, dataset_dir):
+    dataset_io = CategoricalImgDatasetIO()
+    dataset_io.set_x_type(ImagePath()).set_y_type(Categorical(["cat", "dog"]))
+
+    description_path = str(dataset_dir / "description.json")
+
+    with open(description_path, "w") as description_file:
+        json.dump(dataset_io.get_description(), description_file)
+
+    def load_from_file():
+        with patch.object(
+            dataset_io_module, "_list_entries", wraps=dataset_io_module._list_entries
+        ) as list_entries:
+            dataset = CategoricalImgDatasetIO().load_from_file(description_path)
+
+        return dataset, [call[0][0] for call in list_entries.call_args_list]
+
+    dataset, listed = load_from_file()
+
+    assert dataset.y.tolist() == [0, 0, 0, 1, 1]
+    assert os.listdir(str(tmp_path)) == ["train"]
+    assert os.listdir(str(dataset_dir / ".manifest")) == ["description.manifest.npz"]
+
+    # Writing the manifest doesn't modify the dataset directory
+    reloaded, listed = load_from_file()
+
+    assert listed == []
+    assert reloaded.x.tolist() == dataset.x.tolist()
+
+
+def test_invalid_manifest_ignored(dataset_dir):
+    manifest_path = CategoricalImgDatasetIO().manifest_path(str(dataset_dir))
+
+    with open(manifest_path, "wb") as manifest_file:
+        manifest_file.write(b"not a manifest")
+
+    dataset, listed = load(dataset_dir)
+
+    assert len(listed) == 3
+    assert dataset.row_count() == 5
+    assert FolderManifest.load(manifest_path) is not None
+
+
+def test_category_on_filename(tmp_path):
+    for filename in ("0__a.png", "1__b.png", "5__c.png", "other.png"):
+        (tmp_path / filename).touch()
+
+    def load_filenames():
+        dataset_io = (
+            CategoricalImgDatasetIO()
+            .set_organization(CategoricalImgDatasetIO.Organization.CategoryOnFilename)
+            .set_filename_category_regex(r"(\d+)__")
+            .set_x_type(ImagePath())
+            .set_y_type(Categorical(["a", "b"]))
+        )
+
+        return dataset_io.load(str(tmp_path))
+
+    dataset = load_filenames()
+
+    with patch.object(dataset_io_module, "_list_entries") as list_entries:
+        reloaded = load_filenames()
+
+    list_entries.assert_not_called()
+
+    assert reloaded.x.tolist() == dataset.x.tolist()
+    assert reloaded.x.tolist() == [
+        str(tmp_path / "0__a.png"),
+        str(tmp_path / "1__b.png"),
+    ]
+    assert reloaded.y.tolist() == [0, 1]
+
+
+def test_save_as_npz(dataset_dir, tmp_path):
+    dataset, _ = load(dataset_dir)
+
+    dataset_io = NpzDatasetIO()
+    dataset_io.save(str(tmp_path), dataset)
+
+    loaded = dataset_io.load(str(tmp_path))
+
+    assert loaded.x.dtype.kind == "U"
+    assert loaded.x.tolist() == dataset.x.tolist()
+    assert loaded.y.tolist() == [0, 0, 0, 1, 1]
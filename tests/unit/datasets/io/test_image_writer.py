@@ -0,0 +1,99 @@
+# vim: ft=python fileencoding=utf-8 sts=4 sw=4 et:
+
+import os
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from dial_core.datasets import Dataset
+from dial_core.datasets.datatype import Categorical, ImagePath
+from dial_core.datasets.io import CategoricalImgDatasetIO, ImageWriter
+
+
+@pytest.fixture
+def images():
+    return np.random.randint(0, 256, size=(10, 8, 6, 3), dtype=np.uint8)
+
+
+@pytest.mark.parametrize("image_format", ["png", "npy"])
+def test_write_lossless(tmp_path, images, image_format):
+    writer = ImageWriter(image_format=image_format, workers=1, chunk_size=3)
+
+    paths = [str(tmp_path / f"{i}{writer.extension}") for i in range(len(images))]
+
+    progress = []
+    writer.write(paths, images, lambda written, total: progress.append(written))
+
+    assert progress == [3, 6, 9, 10]
+
+    for path, image in zip(paths, images):
+        if image_format == "npy":
+            assert np.array_equal(np.load(path), image)
+        else:
+            assert np.array_equal(np.array(Image.open(path)), image)
+
+
+def test_write_jpeg(tmp_path, images):
+    writer = ImageWriter(image_format="jpeg", jpeg_quality=80, workers=1)
+
+    paths = [str(tmp_path / f"{i}.jpg") for i in range(len(images))]
+    writer.write(paths, images)
+
+    assert writer.extension == ".jpg"
+    assert all(Image.open(path).format == "JPEG" for path in paths)
+
+
+def test_write_on_processes(tmp_path, images):
+    writer = ImageWriter(image_format="png", png_compress_level=1, workers=2)
+    writer.chunk_size = 2
+
+    paths = [str(tmp_path / f"{i}.png") for i in range(len(images))]
+
+    progress = []
+    writer.write(paths, images, lambda written, total: progress.append(written))
+
+    assert progress[-1] == len(images)
+
+    for path, image in zip(paths, images):
+        assert np.array_equal(np.array(Image.open(path)), image)
+
+
+def test_invalid_format():
+    with pytest.raises(ValueError):
+        ImageWriter(image_format="bmp")
+
+
+@pytest.mark.parametrize(
+    "organization",
+    [
+        CategoricalImgDatasetIO.Organization.CategoryOnFolders,
+        CategoricalImgDatasetIO.Organization.CategoryOnFilename,
+    ],
+)
+def test_save_load_categorical_images(tmp_path, images, organization):
+    y = np.array([0, 1] * 5)
+    dataset = Dataset(images, y, x_type=ImagePath(), y_type=Categorical(["0", "1"]))
+
+    dataset_io = (
+        CategoricalImgDatasetIO()
+        .set_organization(organization)
+        .set_filename_category_regex(r"(\d+)__")
+        .set_image_format("npy")
+    )
+    dataset_io.workers = 1
+
+    dataset_io.save(str(tmp_path), dataset)
+
+    loaded = CategoricalImgDatasetIO().set_description(dataset_io.get_description())
+    loaded_dataset = loaded.load(str(tmp_path))
+
+    assert loaded.get_image_format() == "npy"
+    assert loaded_dataset.row_count() == len(images)
+
+    for path, category in zip(loaded_dataset.x, loaded_dataset.y):
+        assert path.endswith(".npy")
+
+        index = int(os.path.basename(path).split("__")[-1][:-4])
+        assert category == y[index]
+        assert np.array_equal(loaded_dataset.x_type.display(path), images[index])
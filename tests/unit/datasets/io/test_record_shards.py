@@ -0,0 +1,189 @@
+# vim: ft=python fileencoding=utf-8 sts=4 sw=4 et:
+
+import os
+import pickle
+
+import numpy as np
+import pytest
+
+from dial_core.datasets import Dataset
+from dial_core.datasets.datatype import ImageArray, Numeric
+from dial_core.datasets.io import RecordArray, ShardedRecordDatasetIO, TTVSetsIO
+from dial_core.datasets.io.record_shards import Alignment, write_records
+
+
+@pytest.fixture
+def images():
+    # Images of mixed resolutions
+    images = np.empty(10, dtype=object)
+
+    for i in range(len(images)):
+        images[i] = np.full((4 + i, 6 + 2 * i, 3), i, dtype=np.uint8)
+
+    return images
+
+
+@pytest.fixture(params=[1, 2])
+def record_array(request, tmp_path, images):
+    write_records(str(tmp_path), "x", images, shards=3, workers=request.param)
+
+    return RecordArray(str(tmp_path), "x")
+
+
+def test_metadata(record_array):
+    assert len(record_array) == 10
+    assert record_array.shards == 3
+    assert record_array.shape == (10,)
+    assert record_array.dtype == object
+
+    assert sorted(os.listdir(record_array.directory)) == [
+        "x-00000-of-00003.records",
+        "x-00001-of-00003.records",
+        "x-00002-of-00003.records",
+        "x.index.npz",
+    ]
+
+
+def test_random_access(record_array, images):
+    for row in (7, 0, 9, -1, 4):
+        assert np.array_equal(record_array[row], images[row])
+
+    sample = record_array[5]
+
+    assert sample.shape == (9, 16, 3)
+    assert sample.ctypes.data % Alignment == 0
+
+    with pytest.raises(ValueError):
+        sample[0, 0, 0] = 1
+
+    with pytest.raises(IndexError):
+        record_array[10]
+
+
+def test_batches(record_array, images):
+    batch = record_array[[8, 1, 3]]
+
+    assert batch.dtype == object
+    assert [sample.shape for sample in batch] == [images[i].shape for i in (8, 1, 3)]
+
+    assert len(record_array[2:6]) == 4
+    assert len(record_array[np.arange(10) % 3 == 0]) == 4
+
+
+def test_stream(record_array, images):
+    assert all(np.array_equal(a, b) for a, b in zip(record_array, images))
+    assert len(list(record_array)) == 10
+
+    streamed = list(record_array.stream(2, 5))
+
+    assert [sample.shape for sample in streamed] == [images[i].shape for i in (2, 3, 4)]
+
+
+def test_uniform_column(tmp_path):
+    array = np.arange(30, dtype=np.float32).reshape(10, 3)
+    labels = np.arange(10)
+
+    write_records(str(tmp_path), "x", array, shards=4)
+    write_records(str(tmp_path), "y", labels, shards=4)
+
+    x, y = RecordArray(str(tmp_path), "x"), RecordArray(str(tmp_path), "y")
+
+    assert x.shape == (10, 3)
+    assert x.dtype == np.float32
+    assert np.array_equal(x[3:7], array[3:7])
+    assert np.array_equal(np.asarray(x), array)
+
+    assert y[4] == 4
+    assert y[[1, 2]].tolist() == [1, 2]
+
+
+def test_bytes_samples(tmp_path):
+    samples = np.array([b"\x89PNG", b"", b"encoded"], dtype=object)
+
+    write_records(str(tmp_path), "x", samples, shards=2)
+
+    array = RecordArray(str(tmp_path), "x")
+
+    assert [sample.tobytes() for sample in array] == list(samples)
+
+
+def test_pickle(record_array, images):
+    unpickled_array = pickle.loads(pickle.dumps(record_array))
+
+    assert np.array_equal(unpickled_array[6], images[6])
+
+
+def test_dataset_io(tmp_path, images):
+    dataset = Dataset(images, np.arange(10), x_type=ImageArray(), y_type=Numeric())
+
+    description = (
+        ShardedRecordDatasetIO().set_shards(2).save(str(tmp_path / "train"), dataset)
+    )
+
+    assert description["x_shape"] == [10]
+    assert description["y_dtype"] == np.dtype(np.int64).str
+
+    ttv_sets = TTVSetsIO.load_from_description(
+        str(tmp_path),
+        {
+            "name": "foo",
+            "format": ShardedRecordDatasetIO.Label,
+            "train": description,
+            "test": {},
+            "validation": {},
+        },
+    )
+    loaded_dataset = ttv_sets.train
+
+    assert isinstance(loaded_dataset.x, RecordArray)
+    assert isinstance(loaded_dataset.y, RecordArray)
+    assert np.array_equal(loaded_dataset.x[9], images[9])
+    assert loaded_dataset.y.tolist() == list(range(10))
+
+
+def test_dataset_io_mismatch(tmp_path, train_dataset):
+    description = ShardedRecordDatasetIO().save(str(tmp_path), train_dataset)
+    description["x_shape"] = [4, 3]
+
+    with pytest.raises(ValueError):
+        ShardedRecordDatasetIO().set_description(description).load(str(tmp_path))
+
+
+def test_python_objects(tmp_path):
+    with pytest.raises(ValueError):
+        write_records(str(tmp_path), "x", np.array([{}, []], dtype=object))
+
+
+@pytest.mark.parametrize("delete", [False, True])
+def test_save_over_loaded_dataset(tmp_path, delete):
+    images = np.empty(40, dtype=object)
+
+    for i in range(len(images)):
+        images[i] = np.full((1 + i % 7, 2 + i % 5), i, dtype=np.int32)
+
+    dataset = Dataset(images, np.arange(40), x_type=ImageArray(), y_type=Numeric())
+    description = ShardedRecordDatasetIO().save(str(tmp_path), dataset)
+
+    loaded_dataset = (
+        ShardedRecordDatasetIO().set_description(description).load(str(tmp_path))
+    )
+    old_x = loaded_dataset.x
+
+    if delete:
+        loaded_dataset.delete_rows(0, 5)
+
+    # The loaded samples are views of the files being replaced
+    description = ShardedRecordDatasetIO().save(str(tmp_path), loaded_dataset)
+
+    reloaded_dataset = (
+        ShardedRecordDatasetIO().set_description(description).load(str(tmp_path))
+    )
+    start = 5 if delete else 0
+
+    assert reloaded_dataset.y.tolist() == list(range(start, 40))
+    assert all(
+        np.array_equal(a, b) for a, b in zip(reloaded_dataset.x, images[start:])
+    )
+
+    # Arrays opened before the save keep reading the previous files
+    assert np.array_equal(old_x[39], images[39])
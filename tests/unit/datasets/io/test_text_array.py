@@ -0,0 +1,109 @@
+# vim: ft=python fileencoding=utf-8 sts=4 sw=4 et:
+
+import numpy as np
+import pytest
+
+from dial_core.datasets.io import text_array
+from dial_core.datasets.io.text_array import read_text, write_text
+
+
+@pytest.mark.parametrize(
+    "array",
+    [
+        np.random.rand(20, 3),
+        np.random.rand(20).astype(np.float32),
+        np.arange(60, dtype=np.int16).reshape(5, 3, 4) - 30,
+        np.array([True, False, True]),
+    ],
+)
+def test_round_trip(tmp_path, array):
+    path = str(tmp_path / "array.txt")
+
+    write_text(path, array, chunk_rows=7, workers=1)
+
+    assert np.array_equal(read_text(path, array.shape, array.dtype), array)
+
+
+def test_parallel(tmp_path, monkeypatch):
+    monkeypatch.setattr(text_array, "ParallelReadBytes", 0)
+
+    array = np.random.rand(500, 4)
+    path = str(tmp_path / "array.txt")
+
+    write_text(path, array, delimiter=",", chunk_rows=64, workers=2)
+
+    assert np.array_equal(read_text(path, array.shape, delimiter=",", workers=2), array)
+    assert np.array_equal(read_text(path, delimiter=",", workers=2), array)
+
+
+def test_chunks_bounded_by_values(tmp_path, monkeypatch):
+    monkeypatch.setattr(text_array, "ChunkValues", 100)
+
+    chunk_sizes = []
+    format_rows = text_array.format_rows
+
+    def counting_format_rows(rows, *args):
+        chunk_sizes.append(rows.size)
+
+        return format_rows(rows, *args)
+
+    monkeypatch.setattr(text_array, "format_rows", counting_format_rows)
+
+    array = np.arange(50 * 30).reshape(50, 30)
+    path = str(tmp_path / "array.txt")
+
+    write_text(path, array, workers=1)
+
+    assert max(chunk_sizes) <= 100
+    assert np.array_equal(read_text(path, array.shape, array.dtype), array)
+
+
+def test_line_ranges(tmp_path):
+    (tmp_path / "array.txt").write_bytes(b"1 2\n3 4\n5 6\n")
+    path = str(tmp_path / "array.txt")
+
+    for parts in (1, 2, 5, 20):
+        ranges = text_array._line_ranges(path, 12, parts)
+
+        assert ranges[0][0] == 0 and ranges[-1][1] == 12
+        assert all(start in (0, 4, 8) for start, _ in ranges)
+
+
+def test_loadtxt_like_shape(tmp_path):
+    (tmp_path / "x.txt").write_text("1 2 3\n4 5 6\n")
+    (tmp_path / "y.txt").write_text("1\n2\n")
+
+    assert read_text(str(tmp_path / "x.txt")).tolist() == [[1, 2, 3], [4, 5, 6]]
+    assert read_text(str(tmp_path / "y.txt")).tolist() == [1, 2]
+
+
+def test_invalid_values(tmp_path):
+    (tmp_path / "array.txt").write_text("1 2\n3 foo\n")
+
+    with pytest.raises(ValueError):
+        read_text(str(tmp_path / "array.txt"))
+
+    with pytest.raises(ValueError):
+        read_text(str(tmp_path / "array.txt"), shape=(3, 2))
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_ragged_lines(tmp_path, monkeypatch, workers):
+    monkeypatch.setattr(text_array, "ParallelReadBytes", 0)
+
+    (tmp_path / "x.txt").write_text("1 2 3 4\n5 6\n7 8\n")
+    (tmp_path / "y.txt").write_text("1\n2 3\n")
+
+    with pytest.raises(ValueError):
+        read_text(str(tmp_path / "x.txt"), workers=workers)
+
+    with pytest.raises(ValueError):
+        read_text(str(tmp_path / "y.txt"), workers=workers)
+
+    # Blank lines are skipped, like np.loadtxt
+    (tmp_path / "x.txt").write_text("1 2\n\n3 4\n")
+
+    assert read_text(str(tmp_path / "x.txt"), workers=workers).tolist() == [
+        [1, 2],
+        [3, 4],
+    ]
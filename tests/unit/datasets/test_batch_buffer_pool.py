@@ -0,0 +1,52 @@
+# vim: ft=python fileencoding=utf-8 sts=4 sw=4 et:
+
+import numpy as np
+import pytest
+
+from dial_core.datasets.batch_buffer_pool import BatchBufferPool
+
+
+def test_acquire_before_fit():
+    assert BatchBufferPool(2).acquire(4) == (None, None)
+
+
+def test_acquire_ring():
+    pool = BatchBufferPool(2)
+    pool.fit(4, np.zeros((4, 3), dtype="float32"), np.zeros(4, dtype="int64"))
+
+    x_0, y_0 = pool.acquire(4)
+    x_1, _ = pool.acquire(2)
+    x_2, _ = pool.acquire(4)
+
+    assert x_0.shape == (4, 3) and x_0.dtype == np.float32
+    assert y_0.shape == (4,) and y_0.dtype == np.int64
+    assert x_1.shape == (2, 3)
+    assert not np.shares_memory(x_0, x_1)
+    assert np.shares_memory(x_0, x_2)
+
+
+def test_acquire_too_many_rows():
+    pool = BatchBufferPool(1)
+    pool.fit(4, np.zeros((4, 3)), np.zeros(4))
+
+    assert pool.acquire(5) == (None, None)
+
+
+def test_fit_new_shape():
+    pool = BatchBufferPool(1)
+    pool.fit(4, np.zeros((4, 3)), np.zeros(4))
+    pool.fit(4, np.zeros((4, 5)), np.zeros(4))
+
+    assert pool.acquire(4)[0].shape == (4, 5)
+
+
+def test_object_batches_not_pooled():
+    pool = BatchBufferPool(1)
+    pool.fit(4, np.empty(4, dtype=object), np.zeros(4))
+
+    assert pool.batch_size == 0
+
+
+def test_invalid_size():
+    with pytest.raises(ValueError):
+        BatchBufferPool(0)
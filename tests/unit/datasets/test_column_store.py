@@ -0,0 +1,158 @@
+# vim: ft=python fileencoding=utf-8 sts=4 sw=4 et:
+
+import pickle
+
+import numpy as np
+import pytest
+
+from dial_core.datasets.column_store import ColumnStore
+
+
+@pytest.fixture
+def column_store():
+    return ColumnStore(np.array([1, 2, 3, 4]))
+
+
+def test_data_is_not_copied():
+    array = np.array([1, 2, 3])
+
+    assert ColumnStore(array).data is array
+
+
+def test_append_grows_capacity(column_store):
+    column_store.append([5])
+
+    assert len(column_store) == 5
+    assert column_store.capacity >= ColumnStore.MinCapacity
+
+    buffer = column_store._buffer
+    column_store.append([6])
+
+    # No reallocation while there's spare capacity
+    assert column_store._buffer is buffer
+    assert column_store.data.tolist() == [1, 2, 3, 4, 5, 6]
+
+
+def test_returned_data_not_modified(column_store):
+    column_store.append([5])
+    data = column_store.data
+
+    column_store.insert(0, [9])
+    assert data.tolist() == [1, 2, 3, 4, 5]
+
+    data = column_store.data
+    capacity = column_store.capacity
+
+    column_store.delete(0, 2)
+    assert data.tolist() == [9, 1, 2, 3, 4, 5]
+    assert column_store.data.tolist() == [2, 3, 4, 5]
+
+    # Copied to a buffer of the same capacity, not a bigger one
+    assert column_store.capacity == capacity
+
+
+def test_take_not_modified(column_store):
+    column_store.append([5])
+    taken = column_store.take(slice(0, 2))
+
+    column_store.insert(0, [9])
+
+    assert taken.tolist() == [1, 2]
+    assert column_store.take(np.array([0, 2])).tolist() == [9, 2]
+
+
+def test_array_not_modified():
+    array = np.array([1, 2, 3, 4])
+
+    column_store = ColumnStore(array)
+    column_store.delete(0)
+
+    assert column_store.data.tolist() == [2, 3, 4]
+    assert array.tolist() == [1, 2, 3, 4]
+
+
+def test_insert_middle(column_store):
+    column_store.insert(1, [8, 9])
+
+    assert column_store.data.tolist() == [1, 8, 9, 2, 3, 4]
+
+
+def test_insert_negative_position(column_store):
+    column_store.insert(-1, [9])
+
+    assert column_store.data.tolist() == [1, 2, 3, 9, 4]
+
+
+def test_insert_on_empty_store():
+    column_store = ColumnStore()
+    column_store.insert(0, [np.array([1, 1]), np.array([2, 2])])
+
+    assert column_store.data.tolist() == [[1, 1], [2, 2]]
+
+
+def test_insert_promotes_dtype():
+    column_store = ColumnStore(np.array(["a", "b"]))
+    column_store.insert(1, ["a_longer_string"])
+
+    assert column_store.data.tolist() == ["a", "a_longer_string", "b"]
+
+
+def test_insert_on_read_only_array():
+    array = np.array([1, 2, 3])
+    array.flags.writeable = False
+
+    column_store = ColumnStore(array)
+    column_store.append([4])
+
+    assert column_store.data.tolist() == [1, 2, 3, 4]
+    assert array.tolist() == [1, 2, 3]
+
+
+def test_delete(column_store):
+    column_store.delete(1, 2)
+
+    assert column_store.data.tolist() == [1, 4]
+    assert len(column_store) == 2
+
+
+def test_delete_out_of_range(column_store):
+    column_store.delete(2, 100)
+
+    assert column_store.data.tolist() == [1, 2]
+
+
+def test_delete_shrinks_capacity():
+    column_store = ColumnStore()
+    column_store.append(np.arange(100))
+
+    column_store.delete(0, 95)
+
+    assert column_store.data.tolist() == [95, 96, 97, 98, 99]
+    assert column_store.capacity == ColumnStore.MinCapacity
+
+
+def test_pickable(column_store):
+    column_store.append([5])
+
+    pickled_column_store = pickle.loads(pickle.dumps(column_store))
+
+    assert pickled_column_store.data.tolist() == [1, 2, 3, 4, 5]
+    assert pickled_column_store.capacity == 5
+
+
+def test_pickle_memory_mapped_file(tmp_path):
+    np.save(tmp_path / "data.npy", np.array([[1, 2], [3, 4]]))
+
+    column_store = ColumnStore(np.load(tmp_path / "data.npy", mmap_mode="r"))
+    pickled_column_store = pickle.loads(pickle.dumps(column_store))
+
+    assert isinstance(pickled_column_store.data, np.memmap)
+    assert pickled_column_store.data.filename == column_store.data.filename
+    assert pickled_column_store.data.tolist() == [[1, 2], [3, 4]]
+
+    # Views of a file are copied
+    column_store.delete(0)
+    pickled_column_store = pickle.loads(pickle.dumps(column_store))
+
+    assert not isinstance(pickled_column_store.data, np.memmap)
+    assert pickled_column_store.data.tolist() == [[3, 4]]
@@ -6,6 +6,7 @@ import numpy as np
 import pytest
 
 from dial_core.datasets import Dataset
+from dial_core.datasets.datatype import Categorical, ImageArray, Numeric
 
 np.random.seed(0)
 
@@ -194,3 +195,207 @@ def test_transformer_functions(simple_numeric_dataset):
 def test_pickable(simple_numeric_dataset):
     obj = pickle.dumps(simple_numeric_dataset)
     pickle.loads(obj)
+
+
+def test_shuffle(simple_numeric_dataset):
+    simple_numeric_dataset.batch_size = 2
+    simple_numeric_dataset.shuffle = True
+
+    bx_0, by_0 = simple_numeric_dataset[0]
+    bx_1, by_1 = simple_numeric_dataset[1]
+
+    assert sorted(bx_0.tolist() + bx_1.tolist()) == [1, 2, 3, 4]
+    assert (by_0 == bx_0 * 10).all()
+    assert (by_1 == bx_1 * 10).all()
+
+    # Data isn't modified
+    assert simple_numeric_dataset.x.tolist() == [1, 2, 3, 4]
+
+
+def test_shuffle_reproducible():
+    dataset_a = Dataset(np.arange(100), np.arange(100), shuffle=True, seed=3)
+    dataset_b = Dataset(np.arange(100), np.arange(100), shuffle=True, seed=3)
+
+    assert dataset_a[0][0].tolist() == dataset_b[0][0].tolist()
+
+    dataset_a.on_epoch_end()
+
+    assert dataset_a[0][0].tolist() != dataset_b[0][0].tolist()
+
+    dataset_b.on_epoch_end()
+
+    assert dataset_a.epoch == dataset_b.epoch == 1
+    assert dataset_a.permutation().tolist() == dataset_b.permutation().tolist()
+
+
+def test_block_shuffle():
+    dataset = Dataset(np.arange(10), np.arange(10), shuffle=True, shuffle_block_size=4)
+
+    permutation = dataset.permutation()
+
+    assert sorted(permutation.tolist()) == list(range(10))
+
+    # Rows of each block are kept together
+    for block in ([0, 1, 2, 3], [4, 5, 6, 7], [8, 9]):
+        position = permutation.tolist().index(block[0])
+        assert permutation[position : position + len(block)].tolist() == block
+
+
+def test_buffer_pool():
+    dataset = Dataset(
+        np.arange(10), np.arange(10) * 2, batch_size=4, buffer_pool_size=2
+    )
+
+    # The first batch sizes the buffers
+    dataset[0]
+
+    bx_1, by_1 = dataset[1]
+    bx_2, by_2 = dataset[2]
+
+    assert bx_1.tolist() == [4, 5, 6, 7]
+    assert by_1.tolist() == [8, 10, 12, 14]
+    assert bx_2.tolist() == [8, 9]
+
+    bx_0, by_0 = dataset[0]
+
+    # The ring has only 2 buffers, so batch 0 is written on the buffer of batch 1
+    assert np.shares_memory(bx_0, bx_1)
+    assert bx_1.tolist() == [0, 1, 2, 3]
+
+
+def test_buffer_pool_opt_out():
+    dataset = Dataset(np.arange(10), np.arange(10), batch_size=4, buffer_pool_size=1)
+
+    dataset[0]
+    bx_0, _ = dataset.get_batch(0, use_buffer_pool=False)
+    bx_1, _ = dataset[1]
+
+    assert bx_0.tolist() == [0, 1, 2, 3]
+    assert not np.shares_memory(bx_0, bx_1)
+
+
+def test_buffer_pool_pickable():
+    dataset = Dataset(np.arange(10), np.arange(10), buffer_pool_size=3)
+    dataset[0]
+
+    dataset = pickle.loads(pickle.dumps(dataset))
+
+    assert dataset.buffer_pool.size == 3
+    assert dataset[0][0].tolist() == list(range(10))
+
+
+@pytest.fixture
+def cached_categorical_dataset(simple_categorical_dataset):
+    return Dataset(
+        simple_categorical_dataset.x,
+        simple_categorical_dataset.y,
+        simple_categorical_dataset.x_type,
+        simple_categorical_dataset.y_type,
+        display_cache_bytes=1024 ** 2,
+    )
+
+
+def test_display_items_cached(cached_categorical_dataset):
+    x, y = cached_categorical_dataset.items(0, 2, role=Dataset.Role.Display)
+
+    assert x.tolist() == ["0", "1"]
+    assert y.tolist() == ["foo", "bar"]
+
+    cache = cached_categorical_dataset.display_cache
+    hits = cache.hits
+
+    x_again, _ = cached_categorical_dataset.items(0, 2, role=Dataset.Role.Display)
+
+    assert np.shares_memory(x_again, x)
+    assert cache.hits == hits + 2
+
+
+def test_display_items_scrolling():
+    categories = ["foo", "bar", "hue"]
+    dataset = Dataset(
+        np.arange(300),
+        np.arange(300) % 3,
+        x_type=Numeric(),
+        y_type=Categorical(categories),
+        display_cache_bytes=1024 ** 2,
+    )
+
+    for start in range(100):
+        x, y = dataset.items(start, start + 10, role=Dataset.Role.Display)
+
+        assert x.tolist() == [str(row) for row in range(start, start + 10)]
+        assert y.tolist() == [categories[row % 3] for row in range(start, start + 10)]
+
+    # Rows 0-109 are on 2 blocks of each column
+    assert dataset.display_cache.misses == 4
+    assert len(dataset.display_cache._samples) == 4
+
+
+def test_display_items_not_text_not_cached():
+    images = np.zeros((300, 2, 2), dtype=np.uint8)
+    dataset = Dataset(
+        images, np.arange(300), x_type=ImageArray(), display_cache_bytes=1024 ** 2
+    )
+
+    rendered_rows = []
+    display_batch = dataset.x_type.display_batch
+
+    def counting_display_batch(data):
+        rendered_rows.append(len(data))
+        return display_batch(data)
+
+    dataset.x_type.display_batch = counting_display_batch
+
+    for start in range(3):
+        x, y = dataset.items(start, start + 10, role=Dataset.Role.Display)
+
+        assert x.shape == (10, 2, 2)
+        assert y.tolist() == [str(row) for row in range(start, start + 10)]
+
+    # Only the first block is rendered, to find out that it isn't text
+    assert rendered_rows == [Dataset.DisplayBlockRows, 10, 10, 10]
+
+
+def test_display_items_invalidated(cached_categorical_dataset):
+    version = cached_categorical_dataset.version
+    cached_categorical_dataset.items(0, 2, role=Dataset.Role.Display)
+
+    cached_categorical_dataset.insert(0, [7], [2])
+
+    assert cached_categorical_dataset.version > version
+
+    x, y = cached_categorical_dataset.items(0, 2, role=Dataset.Role.Display)
+
+    assert x.tolist() == ["7", "0"]
+    assert y.tolist() == ["hue", "foo"]
+
+
+def test_display_items_not_cached_by_default(simple_categorical_dataset):
+    assert simple_categorical_dataset.display_cache is None
+
+    simple_categorical_dataset.items(0, 2, role=Dataset.Role.Display)
+
+    # Modified in place, without calling `touch`
+    simple_categorical_dataset.x[0] = 5
+    simple_categorical_dataset.y_type.categories[0] = "baz"
+
+    x, y = simple_categorical_dataset.items(0, 2, role=Dataset.Role.Display)
+
+    assert x.tolist() == ["5", "1"]
+    assert y.tolist() == ["baz", "bar"]
+
+
+def test_returned_arrays_not_modified():
+    dataset = Dataset(np.arange(4), np.arange(4))
+
+    dataset.insert(4, [4], [4])
+    old_x, old_y = dataset.x, dataset.y
+
+    dataset.insert(0, [99], [99])
+    assert old_x.tolist() == [0, 1, 2, 3, 4]
+
+    dataset.delete_rows(0, 2)
+    assert old_x.tolist() == [0, 1, 2, 3, 4]
+    assert old_y.tolist() == [0, 1, 2, 3, 4]
+
+    assert dataset.x.tolist() == [1, 2, 3, 4]
@@ -0,0 +1,98 @@
+# vim: ft=python fileencoding=utf-8 sts=4 sw=4 et:
+
+import numpy as np
+import pytest
+
+from dial_core.datasets import Dataset, DatasetView
+
+
+@pytest.fixture
+def parent_dataset():
+    return Dataset(np.arange(10), np.arange(10) * 10, batch_size=2)
+
+
+def test_slice_view(parent_dataset):
+    view = DatasetView(parent_dataset, slice(2, 8))
+
+    assert view.row_count() == 6
+    assert len(view) == 3
+
+    x, y = view.head(3)
+
+    assert x.tolist() == [2, 3, 4]
+    assert y.tolist() == [20, 30, 40]
+
+
+def test_slice_view_shares_storage(parent_dataset):
+    view = DatasetView(parent_dataset, slice(2, 8))
+
+    assert np.shares_memory(view.x, parent_dataset.x)
+
+
+def test_index_view(parent_dataset):
+    view = DatasetView(parent_dataset, [9, 0, 5])
+
+    assert view.x.tolist() == [9, 0, 5]
+
+    bx, by = view[0]
+    assert bx.tolist() == [9, 0]
+    assert by.tolist() == [90, 0]
+
+    bx, by = view[1]
+    assert bx.tolist() == [5]
+
+
+def test_items_backwards(parent_dataset):
+    view = DatasetView(parent_dataset, slice(0, 5))
+
+    x, _ = view.items(start=-2)
+
+    assert x.tolist() == [3, 4]
+
+
+def test_nested_views(parent_dataset):
+    view = DatasetView(DatasetView(parent_dataset, slice(1, 9, 2)), [3, 0])
+
+    assert view.x.tolist() == [7, 1]
+
+
+def test_view_shuffle(parent_dataset):
+    view = DatasetView(parent_dataset, slice(0, 6), shuffle=True, seed=1)
+
+    rows = [row for i in range(len(view)) for row in view[i][0].tolist()]
+
+    assert sorted(rows) == [0, 1, 2, 3, 4, 5]
+
+
+def test_view_display_role():
+    parent_dataset = Dataset(np.array([1, 2, 3]), np.array([10, 20, 30]))
+    view = DatasetView(parent_dataset, [2])
+
+    x, y = view.head(1, Dataset.Role.Display)
+
+    assert x.tolist() == ["3"]
+    assert y.tolist() == ["30"]
+
+
+def test_materialize(parent_dataset):
+    dataset = DatasetView(parent_dataset, slice(0, 3)).materialize()
+
+    assert type(dataset) is Dataset
+    assert dataset.x.tolist() == [0, 1, 2]
+    assert not np.shares_memory(dataset.x, parent_dataset.x)
+
+
+def test_views_are_read_only(parent_dataset):
+    view = DatasetView(parent_dataset, slice(0, 3))
+
+    with pytest.raises(TypeError):
+        view.insert(0, [1], [1])
+
+    with pytest.raises(TypeError):
+        view.delete_rows(0)
+
+    with pytest.raises(TypeError):
+        view.x = np.arange(3)
+
+    with pytest.raises(TypeError):
+        view.y = np.arange(3)
@@ -0,0 +1,71 @@
+# vim: ft=python fileencoding=utf-8 sts=4 sw=4 et:
+
+import os
+import pickle
+
+import numpy as np
+import pytest
+
+from dial_core.datasets import Dataset
+from dial_core.datasets.path_table import PathTable
+
+
+@pytest.fixture
+def path_table():
+    return PathTable(["/data/a", "/data/b"], [["1.png", "2.png"], ["3.png"]])
+
+
+@pytest.fixture
+def paths():
+    return [
+        os.path.join("/data/a", "1.png"),
+        os.path.join("/data/a", "2.png"),
+        os.path.join("/data/b", "3.png"),
+    ]
+
+
+def test_indexing(path_table, paths):
+    assert len(path_table) == 3
+    assert path_table[0] == paths[0]
+    assert path_table[-1] == paths[2]
+
+    assert path_table[1:].tolist() == paths[1:]
+    assert path_table[[2, 0]].tolist() == [paths[2], paths[0]]
+    assert path_table[np.array([False, True, True])].tolist() == paths[1:]
+
+    assert path_table.tolist() == paths
+    assert np.asarray(path_table).tolist() == paths
+    assert path_table.filenames(1) == ["3.png"]
+
+
+def test_out_of_bounds(path_table):
+    with pytest.raises(IndexError):
+        path_table[3]
+
+    with pytest.raises(IndexError):
+        path_table[[0, 5]]
+
+
+def test_non_ascii_names():
+    path_table = PathTable(["/data"], [["ñandú.png", "猫.jpg"]])
+
+    assert path_table.tolist() == [
+        os.path.join("/data", "ñandú.png"),
+        os.path.join("/data", "猫.jpg"),
+    ]
+
+
+def test_dataset_column(path_table, paths):
+    dataset = Dataset(path_table, np.array([0, 0, 1]), batch_size=2)
+
+    assert dataset.x[1:3].tolist() == paths[1:]
+
+    # Modifying the rows copies the table to a regular array
+    dataset.insert(0, ["/data/c/4.png"], [1])
+    dataset.delete_rows(1)
+
+    assert dataset.x.tolist() == ["/data/c/4.png"] + paths[1:]
+
+    unpickled = pickle.loads(pickle.dumps(Dataset(path_table)))
+
+    assert unpickled.x.tolist() == paths
@@ -0,0 +1,132 @@
+# vim: ft=python fileencoding=utf-8 sts=4 sw=4 et:
+
+import pytest
+
+from dial_core.datasets import Dataset, PrefetchedDataset
+from dial_core.datasets import prefetched_dataset as prefetched_dataset_module
+
+
+@pytest.fixture
+def prefetched_dataset(simple_numeric_dataset):
+    simple_numeric_dataset.batch_size = 1
+
+    prefetched_dataset = PrefetchedDataset(simple_numeric_dataset, prefetch=2)
+    yield prefetched_dataset
+    prefetched_dataset.shutdown()
+
+
+def test_len(prefetched_dataset):
+    assert len(prefetched_dataset) == 4
+
+
+def test_batches_in_order(prefetched_dataset):
+    batches = [prefetched_dataset[i] for i in range(len(prefetched_dataset))]
+
+    assert [bx.tolist() for bx, _ in batches] == [[1], [2], [3], [4]]
+    assert [by.tolist() for _, by in batches] == [[10], [20], [30], [40]]
+
+
+def test_prefetch_is_bounded(prefetched_dataset):
+    prefetched_dataset[0]
+
+    assert len(prefetched_dataset._pending) == 2
+
+
+def test_random_access(prefetched_dataset):
+    bx, _ = prefetched_dataset[3]
+    assert bx.tolist() == [4]
+
+    bx, _ = prefetched_dataset[1]
+    assert bx.tolist() == [2]
+
+
+def test_items_display_role(simple_categorical_dataset):
+    prefetched_dataset = PrefetchedDataset(simple_categorical_dataset, prefetch=2)
+
+    x, y = prefetched_dataset.items(0, 1, Dataset.Role.Display)
+    assert x.tolist() == ["0"]
+    assert y.tolist() == ["foo"]
+
+    x, y = prefetched_dataset.items(1, 2, Dataset.Role.Display)
+    assert x.tolist() == ["1"]
+    assert y.tolist() == ["bar"]
+
+    prefetched_dataset.shutdown()
+
+
+def test_on_epoch_end_stops_workers(prefetched_dataset):
+    prefetched_dataset[0]
+
+    prefetched_dataset.on_epoch_end()
+
+    assert prefetched_dataset._executor is None
+    assert not prefetched_dataset._pending
+
+
+def test_errors_are_raised_on_batch(prefetched_dataset):
+    def fail(_):
+        raise RuntimeError("Failed transformation")
+
+    prefetched_dataset.dataset.x_type.transformations = [fail]
+
+    with pytest.raises(RuntimeError):
+        prefetched_dataset[0]
+
+
+@pytest.mark.parametrize("has_worker_initializer", [True, False])
+def test_process_pool(monkeypatch, simple_numeric_dataset, has_worker_initializer):
+    # Python 3.6 process pools can't initialize their workers
+    monkeypatch.setattr(
+        prefetched_dataset_module, "_HAS_WORKER_INITIALIZER", has_worker_initializer
+    )
+
+    simple_numeric_dataset.batch_size = 2
+
+    prefetched_dataset = PrefetchedDataset(
+        simple_numeric_dataset, prefetch=1, workers=1, use_processes=True
+    )
+
+    assert prefetched_dataset[0][0].tolist() == [1, 2]
+    assert prefetched_dataset[1][0].tolist() == [3, 4]
+
+    prefetched_dataset.shutdown()
+
+
+def test_small_buffer_pool():
+    dataset = Dataset(buffer_pool_size=2)
+
+    with pytest.raises(ValueError):
+        PrefetchedDataset(dataset, prefetch=1)
+
+    PrefetchedDataset(Dataset(buffer_pool_size=3), prefetch=1)
+
+
+@pytest.mark.parametrize("use_processes", [False, True])
+def test_dataset_edited(simple_numeric_dataset, use_processes):
+    simple_numeric_dataset.batch_size = 1
+
+    prefetched_dataset = PrefetchedDataset(
+        simple_numeric_dataset, prefetch=2, workers=1, use_processes=use_processes
+    )
+
+    def wait_prefetched():
+        for future in prefetched_dataset._pending.values():
+            future.result()
+
+    assert prefetched_dataset[0][0].tolist() == [1]
+    wait_prefetched()
+
+    simple_numeric_dataset.insert(0, [100, 101, 102], [0, 0, 0])
+
+    assert prefetched_dataset[1][0].tolist() == [101]
+
+    x, _ = prefetched_dataset.items(0, 2, Dataset.Role.Display)
+    assert x.tolist() == ["100", "101"]
+    wait_prefetched()
+
+    simple_numeric_dataset.delete_rows(0, 1)
+
+    x, _ = prefetched_dataset.items(2, 4, Dataset.Role.Display)
+    assert x.tolist() == ["1", "2"]
+
+    prefetched_dataset.shutdown()
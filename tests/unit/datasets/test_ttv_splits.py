@@ -0,0 +1,127 @@
+# vim: ft=python fileencoding=utf-8 sts=4 sw=4 et:
+
+import numpy as np
+import pytest
+
+from dial_core.datasets import Dataset, DatasetView
+from dial_core.datasets.datatype import Categorical
+from dial_core.datasets.ttv_splits import (
+    k_fold,
+    random_split,
+    repeated_random_splits,
+    stratified_split,
+)
+
+
+@pytest.fixture
+def categorical_dataset():
+    """Returns a dataset with 80 rows of category 0 and 20 rows of category 1."""
+    return Dataset(
+        np.arange(100),
+        np.array([0] * 80 + [1] * 20),
+        y_type=Categorical(["foo", "bar"]),
+    )
+
+
+def rows_of(dataset):
+    return dataset.x.tolist() if dataset else []
+
+
+def test_random_split(categorical_dataset):
+    ttv_sets = random_split(categorical_dataset, 0.2, 0.1, seed=0, name="Split")
+
+    assert ttv_sets.name == "Split"
+    assert isinstance(ttv_sets.train, DatasetView)
+    assert ttv_sets.train.parent is categorical_dataset
+
+    assert ttv_sets.train.row_count() == 70
+    assert ttv_sets.test.row_count() == 20
+    assert ttv_sets.validation.row_count() == 10
+
+    all_rows = rows_of(ttv_sets.train) + rows_of(ttv_sets.test)
+    all_rows += rows_of(ttv_sets.validation)
+
+    assert sorted(all_rows) == list(range(100))
+
+
+def test_random_split_reproducible(categorical_dataset):
+    ttv_sets_a = random_split(categorical_dataset, seed=5)
+    ttv_sets_b = random_split(categorical_dataset, seed=5)
+
+    assert rows_of(ttv_sets_a.test) == rows_of(ttv_sets_b.test)
+    assert ttv_sets_a.validation is None
+
+
+def test_train_view_shuffled(categorical_dataset):
+    ttv_sets = stratified_split(categorical_dataset, seed=0)
+    train = ttv_sets.train
+
+    assert train.shuffle and not ttv_sets.test.shuffle
+
+    # Rows are sorted by category, but the batches mix them
+    assert set(train[0][1].argmax(axis=1).tolist()) == {0, 1}
+
+    first_epoch = train[0][0].tolist()
+    train.on_epoch_end()
+
+    assert train[0][0].tolist() != first_epoch
+    assert stratified_split(categorical_dataset, seed=0).train.seed == train.seed
+
+
+def test_random_split_absolute_sizes(categorical_dataset):
+    ttv_sets = random_split(categorical_dataset, test_size=7, seed=0)
+
+    assert ttv_sets.test.row_count() == 7
+    assert ttv_sets.train.row_count() == 93
+
+
+def test_stratified_split(categorical_dataset):
+    ttv_sets = stratified_split(categorical_dataset, 0.25, seed=0)
+
+    assert ttv_sets.test.y.tolist().count(0) == 20
+    assert ttv_sets.test.y.tolist().count(1) == 5
+
+
+def test_stratified_split_not_categorical(simple_numeric_dataset):
+    with pytest.raises(ValueError):
+        stratified_split(simple_numeric_dataset)
+
+
+def test_repeated_random_splits(categorical_dataset):
+    splits = list(repeated_random_splits(categorical_dataset, 3, seed=1))
+    splits_again = list(repeated_random_splits(categorical_dataset, 3, seed=1))
+
+    assert len(splits) == 3
+    assert rows_of(splits[0].test) != rows_of(splits[1].test)
+    assert [rows_of(s.test) for s in splits] == [rows_of(s.test) for s in splits_again]
+
+
+@pytest.mark.parametrize("stratified", [False, True])
+def test_k_fold(categorical_dataset, stratified):
+    folds = list(k_fold(categorical_dataset, k=5, seed=0, stratified=stratified))
+
+    assert len(folds) == 5
+
+    test_rows = [row for fold in folds for row in rows_of(fold.test)]
+    assert sorted(test_rows) == list(range(100))
+
+    for fold in folds:
+        assert fold.test.row_count() == 20
+        assert fold.train.row_count() == 80
+        assert not set(rows_of(fold.test)) & set(rows_of(fold.train))
+
+    if stratified:
+        assert all(fold.test.y.tolist().count(1) == 4 for fold in folds)
+
+
+def test_k_fold_validation(categorical_dataset):
+    fold = next(k_fold(categorical_dataset, k=4, validation_size=0.2, seed=0))
+
+    assert fold.test.row_count() == 25
+    assert fold.validation.row_count() == 15
+    assert fold.train.row_count() == 60
+
+
+def test_k_fold_invalid_k(categorical_dataset):
+    with pytest.raises(ValueError):
+        next(k_fold(categorical_dataset, k=1))